@@ -8,70 +8,9 @@ Driver for the ILI9225 chip TFT LCD displays.
 import os
 
 from utils.compatibility import Compatibility
-from utils.common import (Boards, CommonMethods, TFTException,
-                          CompatibilityException, RGB16BitColor as Colors)
-
-
-class CurrentFont:
-    """
-    Stores the currently used standard font.
-    """
-
-    def __init__(self, font=((), 0, 0, 0, 0, 0, False)):
-        self.set_font(font)
-
-    def set_font(self, font):
-        """
-        Set a standard font.
-
-        .. note::
-
-          Tuple definition: font = Full data object
-                            width = 1st byte in full data object
-                            height = 2nd byte in full data object
-                            offset = 3rd byte in full data object
-                            numchars = 4th byte in full data object
-                            nbrows = 2nd byte / 8 in full data object
-                            mono_sp = Boolean indicating if mono spaced
-
-        :param font: A parsed font object.
-        :type font: tuple
-        """
-        self.font = font[0]
-        self.width = font[1]
-        self.height = font[2]
-        self.offset = font[3]
-        self.numchars = font[4]
-        # Set number of bytes used by height of font in multiples of 8
-        self.nbrows = font[5] + 1 if self.height % 8 else font[5]
-        self.mono_sp = font[6]
-
-
-class GFXGlyph:
-    """
-    Glyph structure data.
-    """
-
-    def __init__(self, glyph):
-        self.bitmap_offset = glyph[0] # GFXFont.bitmap
-        self.width = glyph[1]         # Bitmap dimensions in pixels
-        self.height = glyph[2]
-        self.x_advance = glyph[3]     # Distance to advance cursor (x axis)
-        self.x_offset = glyph[4]      # Distance from cursor pos to UL corner
-        self.y_offset = glyph[5]
-
-
-class GFXFont:
-    """
-    Font meta data for the font bitmaps and glyphs.
-    """
-
-    def __init__(self, font):
-        self.bitmap = font[0]    # Bitmaps
-        self.glyph = font[1]     # Glyphs
-        self.first = font[2]     # ASCII extents
-        self.last = font[3]
-        self.y_advance = font[4] # Newline distance (y axis)
+from utils.common import (Boards, CommonMethods, CommandBatch, TFTException,
+                          CompatibilityException, RGB16BitColor as Colors,
+                          CurrentFont, GFXGlyph, GFXFont, pack_be16)
 
 
 class ILI9225(Compatibility, CommonMethods):
@@ -128,9 +67,6 @@ class ILI9225(Compatibility, CommonMethods):
     CMD_GAMMA_CTRL9             = 0x58  # Gamma Control 9
     CMD_GAMMA_CTRL10            = 0x59  # Gamma Control 10
 
-    # 1: pixel width of 1 font character, 2: pixel height
-    _CFONT_HEADER_SIZE = 4
-
     # Orientation modes
     MODE_R2L_BOTTOM_UP = 0
     MODE_BOTTOM_UP_R2L = 1
@@ -157,8 +93,10 @@ class ILI9225(Compatibility, CommonMethods):
          MODE_BOTTOM_UP_L2R, MODE_L2R_BOTTOM_UP) # 270°
         )
 
-    # Is bit out-of-range for value.
-    _BIT_READ = lambda self, value, bit: ((value) >> (bit)) & 0x01
+    # Shortest run of pixels that is drawn with a window instead of setting
+    # the address of each pixel. A window costs about as much as three
+    # single pixels.
+    _MIN_RUN = 3
 
     def __init__(self, rst, rs, spi_port, cs=-1, mosi=-1, sck=-1, led=-1,
                  board=None, *, brightness=MAX_BRIGHTNESS, rpi_mode=None):
@@ -203,12 +141,16 @@ class ILI9225(Compatibility, CommonMethods):
         self._led = led
         self.brightness = brightness # Default it maximum brightness.
         self._bl_state = True
-        self._current_font = None
-        self._cfont = CurrentFont()
-        self._gfx_font = None
+        # The last value written to the window and entry mode registers.
+        self._registers = {}
+        self._register_cache = True
         self.set_board(board)
 
     def begin(self):
+        # The reset below puts the registers back to their defaults.
+        self._invalidate_registers()
+        self._clear_scroll()
+        self._clear_partial()
         # Setup MCU specific pins
         self._spi_port_device()
 
@@ -241,482 +183,152 @@ class ILI9225(Compatibility, CommonMethods):
         if self.DEBUG: # pragma: no cover
             print("begin: Finished setting up pins.")
 
-        # Power-on sequence
-        self._start_write()
-        self.spi_close_override = True
-        # Set APON,PON,AON,VCI1EN,VC
-        self._write_register(self.CMD_POWER_CTRL2, 0x0018)
-        # Set BT,DC1,DC2,DC3
-        self._write_register(self.CMD_POWER_CTRL3, 0x6121)
-        # Set GVDD (007F 0088)
-        self._write_register(self.CMD_POWER_CTRL4, 0x006F)
-        # Set VCOMH/VCOML voltage
-        self._write_register(self.CMD_POWER_CTRL5, 0x495F)
-        # Set SAP,DSTB,STB
-        self._write_register(self.CMD_POWER_CTRL1, 0x0800)
-        self.delay(10)
-        # Set APON,PON,AON,VCI1EN,VC
-        self._write_register(self.CMD_POWER_CTRL2, 0x103B)
-        self.delay(50)
-
-        # Set the display line number and display direction
-        self._write_register(self.CMD_DRIVER_OUTPUT_CTRL, 0x011C) # 0x001C
-        # Set 1 line inversion
-        self._write_register(self.CMD_LCD_AC_DRIVING_CTRL, 0x0100)
-        # Set GRAM write direction and BGR=1.
-        self._write_register(self.CMD_ENTRY_MODE, 0x1038) # 0x0038
-        # Display off
-        self._write_register(self.CMD_DISP_CTRL1, 0x0000)
-        # Set the back porch and front porch
-        self._write_register(self.CMD_BLANK_PERIOD_CTRL1, 0x0808)
-        # Set the clocks number per line
-        self._write_register(self.CMD_FRAME_CYCLE_CTRL, 0x1100)
-        # CPU interface
-        self._write_register(self.CMD_INTERFACE_CTRL, 0x0000)
-        # 0e01
-        self._write_register(self.CMD_OSC_CTRL, 0x0D01)
-        # Set VCI recycling
-        self._write_register(self.CMD_VCI_RECYCLING, 0x0020)
-        # RAM Address
-        self._write_register(self.CMD_RAM_ADDR_SET1, 0x0000)
-        self._write_register(self.CMD_RAM_ADDR_SET2, 0x0000)
-
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished power-on sequence.")
-
-        # Set GRAM area
-        self._write_register(self.CMD_GATE_SCAN_CTRL, 0x0000)
-        self._write_register(self.CMD_VERTICAL_SCROLL_CTRL1, 0x00DB)
-        self._write_register(self.CMD_VERTICAL_SCROLL_CTRL2, 0x0000)
-        self._write_register(self.CMD_VERTICAL_SCROLL_CTRL3, 0x0000)
-        self._write_register(self.CMD_PARTIAL_DRIVING_POS1, 0x00DB)
-        self._write_register(self.CMD_PARTIAL_DRIVING_POS2, 0x0000)
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR1, 0x00AF)
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR2, 0x0000)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR1, 0x00DB)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR2, 0x0000)
-
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished set GRAM area.")
-
-        # Adjust GAMMA curve
-        self._write_register(self.CMD_GAMMA_CTRL1, 0x0000)
-        self._write_register(self.CMD_GAMMA_CTRL2, 0x060B)
-        self._write_register(self.CMD_GAMMA_CTRL3, 0x0C0A)
-        self._write_register(self.CMD_GAMMA_CTRL4, 0x0105)
-        self._write_register(self.CMD_GAMMA_CTRL5, 0x0A0C)
-        self._write_register(self.CMD_GAMMA_CTRL6, 0x0B06)
-        self._write_register(self.CMD_GAMMA_CTRL7, 0x0004)
-        self._write_register(self.CMD_GAMMA_CTRL8, 0x0501)
-        self._write_register(self.CMD_GAMMA_CTRL9, 0x0E00)
-        self._write_register(self.CMD_GAMMA_CTRL10, 0x000E)
-
-        self._write_register(self.CMD_DISP_CTRL1, 0x0012)
-        self.delay(50)
-        self._write_register(self.CMD_DISP_CTRL1, 0x1017)
+        # The SPI port stays open until pin_cleanup() is called.
+        self._open_session()
 
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished set GAMMA curve.")
-
-        # Turn on backlight
-        self.set_backlight(True)
-        self.orientation = 0
-
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished turning on backlight.")
-
-        self.clear()
-        self.spi_close_override = False
-        self._end_write(reuse=False)
-
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished initialize background color.")
-
-    def set_display(self, flag):
-        """
-        Set the display on or off.
-
-        :param flag: True = display on and False = display off.
-        :type flag: bool
-        """
-        self._start_write()
-
-        if flag:
-            self._write_register(0x00ff, 0x0000)
-            self._write_register(self.CMD_POWER_CTRL1, 0x0000)
+        # Power-on sequence
+        with self.transaction():
+            batch = CommandBatch()
+            # Set APON,PON,AON,VCI1EN,VC
+            batch.register(self.CMD_POWER_CTRL2, 0x0018)
+            # Set BT,DC1,DC2,DC3
+            batch.register(self.CMD_POWER_CTRL3, 0x6121)
+            # Set GVDD (007F 0088)
+            batch.register(self.CMD_POWER_CTRL4, 0x006F)
+            # Set VCOMH/VCOML voltage
+            batch.register(self.CMD_POWER_CTRL5, 0x495F)
+            # Set SAP,DSTB,STB
+            batch.register(self.CMD_POWER_CTRL1, 0x0800)
+            self._write_batch(batch)
+            self.delay(10)
+            batch.clear()
+            # Set APON,PON,AON,VCI1EN,VC
+            batch.register(self.CMD_POWER_CTRL2, 0x103B)
+            self._write_batch(batch)
             self.delay(50)
-            self._write_register(self.CMD_DISP_CTRL1, 0x1017)
-        else:
-            self._write_register(0x00ff, 0x0000)
-            self._write_register(self.CMD_DISP_CTRL1, 0x0000)
+            batch.clear()
+
+            # Set the display line number and display direction
+            batch.register(self.CMD_DRIVER_OUTPUT_CTRL, 0x011C) # 0x001C
+            # Set 1 line inversion
+            batch.register(self.CMD_LCD_AC_DRIVING_CTRL, 0x0100)
+            # Set GRAM write direction and BGR=1.
+            batch.register(self.CMD_ENTRY_MODE, 0x1038) # 0x0038
+            # Display off
+            batch.register(self.CMD_DISP_CTRL1, 0x0000)
+            # Set the back porch and front porch
+            batch.register(self.CMD_BLANK_PERIOD_CTRL1, 0x0808)
+            # Set the clocks number per line
+            batch.register(self.CMD_FRAME_CYCLE_CTRL, 0x1100)
+            # CPU interface
+            batch.register(self.CMD_INTERFACE_CTRL, 0x0000)
+            # 0e01
+            batch.register(self.CMD_OSC_CTRL, 0x0D01)
+            # Set VCI recycling
+            batch.register(self.CMD_VCI_RECYCLING, 0x0020)
+            # RAM Address
+            batch.register(self.CMD_RAM_ADDR_SET1, 0x0000)
+            batch.register(self.CMD_RAM_ADDR_SET2, 0x0000)
+
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished power-on sequence.")
+
+            # Set GRAM area
+            batch.register(self.CMD_GATE_SCAN_CTRL, 0x0000)
+            batch.register(self.CMD_VERTICAL_SCROLL_CTRL1, 0x00DB)
+            batch.register(self.CMD_VERTICAL_SCROLL_CTRL2, 0x0000)
+            batch.register(self.CMD_VERTICAL_SCROLL_CTRL3, 0x0000)
+            batch.register(self.CMD_PARTIAL_DRIVING_POS1, 0x00DB)
+            batch.register(self.CMD_PARTIAL_DRIVING_POS2, 0x0000)
+            batch.register(self.CMD_HORIZONTAL_WINDOW_ADDR1, 0x00AF)
+            batch.register(self.CMD_HORIZONTAL_WINDOW_ADDR2, 0x0000)
+            batch.register(self.CMD_VERTICAL_WINDOW_ADDR1, 0x00DB)
+            batch.register(self.CMD_VERTICAL_WINDOW_ADDR2, 0x0000)
+
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished set GRAM area.")
+
+            # Adjust GAMMA curve
+            batch.register(self.CMD_GAMMA_CTRL1, 0x0000)
+            batch.register(self.CMD_GAMMA_CTRL2, 0x060B)
+            batch.register(self.CMD_GAMMA_CTRL3, 0x0C0A)
+            batch.register(self.CMD_GAMMA_CTRL4, 0x0105)
+            batch.register(self.CMD_GAMMA_CTRL5, 0x0A0C)
+            batch.register(self.CMD_GAMMA_CTRL6, 0x0B06)
+            batch.register(self.CMD_GAMMA_CTRL7, 0x0004)
+            batch.register(self.CMD_GAMMA_CTRL8, 0x0501)
+            batch.register(self.CMD_GAMMA_CTRL9, 0x0E00)
+            batch.register(self.CMD_GAMMA_CTRL10, 0x000E)
+
+            batch.register(self.CMD_DISP_CTRL1, 0x0012)
+            self._write_batch(batch)
             self.delay(50)
-            self._write_register(self.CMD_POWER_CTRL1, 0x0003)
+            batch.clear()
+            batch.register(self.CMD_DISP_CTRL1, 0x1017)
+            self._write_batch(batch)
 
-        self._end_write(reuse=False)
-        self.delay(200)
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished set GAMMA curve.")
 
-    #
-    # Beginning of standard font methods.
-    #
-    def set_font(self, font, mono_sp=False):
-        """
-        Set the current font.
+            # Turn on backlight
+            self.set_backlight(True)
+            self.orientation = 0
 
-        :param font: The name of the font.
-        :type font: str
-        :param mono_sp: True = Mono spaced, False = Proportional
-        :type mono_sp: bool
-        """
-        #       font, width,   height,  offset,  numchars, height / 8
-        args = (font, font[0], font[1], font[2], font[3], font[1] // 8,
-                mono_sp)
-        self._cfont.set_font(args)
-
-    def get_font(self):
-        """
-        Get the current font.
-
-        :return: The current font.
-        :rtype: CurrentFont
-        """
-        return self._cfont
-
-    def draw_char(self, x, y, ch, color=Colors.WHITE, bg_color=Colors.BLACK):
-        """
-        Draw a character.
-
-        :param x: Point coordinate (x-axis).
-        :type x: int
-        :param y: Point coordinate (y-axis).
-        :type y: int
-        :param ch: The character to draw on the display.
-        :type ch: str
-        :param color: A 16-bit RGB color (default=white).
-        :type color: int
-        :param bg_color: Set the character background color (default = black).
-        :type bg_color: int
-        :return: Width of the character in display pixels.
-        :rtype: int
-        :raises TFTException: If the a standard font is not set.
-        """
-        self._is_font_set()
-        char_offset = self.__get_offset(ch)
-
-        # Monospaced: Get char width from font.
-        if self._cfont.mono_sp:
-            char_width = self._cfont.width
-        else:
-            char_width = self._cfont.font[char_offset]
-
-        char_offset += 1
-        # Use autoincrement/decrement feature, if character fits
-        # completely on the screen.
-        fast_mode = ((x + char_width + 1) < self.max_x
-                     and (y + self._cfont.height - 1) < self.max_y)
-
-        # Set character window.
-        if fast_mode:
-            self._set_window(x, y, x + char_width + 1,
-                             y + self._cfont.height - 1)
-            array = bytearray()
-        else:
-            pixels = []
-
-        self._start_write()
-
-        # Each font "column" (+1 blank column for spacing).
-        for i in range(char_width + 1):
-            h = 0  # Keep track of char height.
-
-            for j in range(self._cfont.nbrows): # Each column byte.
-                if i == char_width:
-                    chr_data = 0x00  # Insert blank column
-                else:
-                    chr_data = self._cfont.font[char_offset]
-
-                char_offset += 1
-
-                for k in range(8): # Process every row in font character.
-                    if h >= self._cfont.height: break
-                    x0 = x + i
-                    y0 = y + (j * 8) + k
-                    clr = color if self._BIT_READ(chr_data, k) else bg_color
-
-                    if fast_mode:
-                        if (hasattr(self, '_need_chunking')
-                            and self._need_chunking(array)): # pragma: no cover
-                            self._write_data(array)
-                            array = bytearray()
-
-                        array.append(clr >> 8)
-                        array.append(clr & 0xFF)
-                    else:
-                        pixels.append((x0, y0, clr))
-
-                    h += 1
-
-        if fast_mode:
-            self._write_data(array)
-            self._reset_window()
-        else:
-            self.draw_pixels(pixels)
-
-        self._end_write(reuse=False)
-        return char_width
-
-    def draw_text(self, x, y, s, color=Colors.WHITE, bg_color=Colors.BLACK):
-        """
-        Draw a text string to the display.
-
-        :param x: Point coordinate (x-axis).
-        :type x: int
-        :param y: Point coordinate (y-axis).
-        :type y: int
-        :param s: The string to draw on the display.
-        :type s: str
-        :param color: A 16-bit RGB color (default=white).
-        :type color: int
-        :param bg_color: Set the character background color (default = black).
-        :type bg_color: int
-        :return: The position of x after the text is displayed.
-        :rtype: int
-        """
-        currx = x
-        self.spi_close_override = True
-        self._start_write()
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished turning on backlight.")
 
-        for k in range(len(s)):
-            currx += self.draw_char(currx, y, s[k], color, bg_color) + 1
-
-        self.spi_close_override = False
-        self._end_write(reuse=False)
-        return currx
-
-    def get_char_extent(self, ch):
-        """
-        Gets the width and height of a standard font character in pixels.
-
-        .. note:
-
-          The height of a standard character is the same for all characters.
-
-        :param ch: The ASCII character.
-        :type ch: str
-        :return: A tuple consisting of (width, height).
-        :rtype: tuple
-        :raises TFTException: If the a standard font is not set.
-        """
-        self._is_font_set()
-        char_offset = self.__get_offset(ch)
-        # Get font width from 1st byte
-        return self._cfont.font[char_offset], self._cfont.height
-
-    def get_text_extent(self, s):
-        """
-        Gets the width and height of a standard font string in pixels.
-
-        .. note:
-
-          The height of a standard character is the same for all characters.
-
-        :param s: Text to get the width for.
-        :type s: str
-        :return: A tuple consisting of (width, height).
-        :rtype: tuple
-        :raises TFTException: If the a standard font is not set.
-        """
-        width = 0
-        height = 0
-
-        for k in range(len(s)):
-            w, h = self.get_char_extent(s[k])
-            width += w + 1
-            height = h
-
-        return round(width), height
-
-    def __get_offset(self, ch):
-        # Bytes used by each character.
-        char_offset = (self._cfont.width * self._cfont.nbrows) + 1
-        # Char offset (add 4 for font header)
-        return (char_offset * (ord(ch) - self._cfont.offset)
-                ) + self._CFONT_HEADER_SIZE
-
-    def _is_font_set(self):
-        if len(self._cfont.font) <= 0:
-            raise TFTException(self.ERROR_MSGS.get('STD_FONT'))
-
-    #
-    # End of standard font methods.
-    #
-    # Beginning of GFX font methods.
-    #
-
-    def set_gfx_font(self, font):
-        """
-        Set the GFX font.
+            self.clear()
 
-        :param font: GFX font name defined in include file.
-        :type font: str
-        """
-        self._gfx_font = GFXFont(font)
+        if self.DEBUG: # pragma: no cover
+            print("begin: Finished initialize background color.")
 
-    def draw_gfx_char(self, x, y, ch, color=Colors.WHITE):
+    @property
+    def register_cache(self):
         """
-        Draw a single character with the current GFX font.
+        Check if register writes that change nothing are skipped.
 
-        :param x: Point coordinate (x-axis).
-        :type x: int
-        :param y: Point coordinate (y-axis).
-        :type y: int
-        :param ch: A single character to draw on the display.
-        :type ch: str
-        :param color: A 16-bit RGB color (default=white).
-        :type color: int
-        :return: The width of character in display pixels.
-        :rtype: int
-        :raises TFTException: If the a GFX font is not set or a character
-                              is not found in the current font.
+        :return: True if they are skipped else False.
+        :rtype: bool
         """
-        self._is_gfx_font_set()
-        ch = ord(ch) - self._gfx_font.first
+        return self._register_cache
 
-        try:
-            glyph = GFXGlyph(self._gfx_font.glyph[ch])
-        except IndexError as e:
-            ch += self._gfx_font.first
-            msg = self.ERROR_MSGS['GFX_BAD_CH'].format(chr(ch))
-            raise TFTException(msg)
-
-        bitmap = self._gfx_font.bitmap
-        bo = glyph.bitmap_offset
-        w = glyph.width
-        h = glyph.height
-        xa = glyph.x_advance
-        xo = glyph.x_offset
-        yo = glyph.y_offset
-        bits = bit = 0
-        pixels = []
-
-        # Add character clipping here one day.
-        for yy in range(h):
-            for xx in range(w):
-                if not (bit & 7):
-                    bits = bitmap[bo]
-                    bo += 1
-
-                bit += 1
-                x0 = x + xo + xx
-                y0 = y + yo + yy
-
-                if bits & 0x80:
-                    pixels.append((x0, y0, color))
-
-                bits <<= 1
-
-        self.draw_pixels(pixels)
-        return xa
-
-    def draw_gfx_text(self, x, y, s, color=Colors.WHITE, *, add_pixels=0):
-        """
-        Draw a string in the GFX font.
-
-        :param x: Point coordinate (x-axis).
-        :type x: int
-        :param y: Point coordinate (y-axis).
-        :type y: int
-        :param s: The string to draw on the display.
-        :type s: str
-        :param color: A 16-bit RGB color (default=white).
-        :type color: int
-        :param add_pixels: Number of pixels to add between characters
-                           (Default = 0).
-        :type add_pixels: int
-        :return: The position of x after the text is displayed.
-        :rtype: int
-        :raises TFTException: If the a GFX font is not set.
+    @register_cache.setter
+    def register_cache(self, flag):
         """
-        currx = x
-        self.spi_close_override = True
-        self._start_write()
+        Keep the last value written to the window and entry mode registers
+        and skip writing them again with the same value. The full screen
+        window is then only put back when a write needs it.
 
-        # Draw every character in the string.
-        for ch in s:
-            currx += self.draw_gfx_char(currx, y, ch, color) + add_pixels
-
-        self.spi_close_override = False
-        self._end_write(reuse=False)
-        return currx
-
-    def get_gfx_char_extent(self, ch):
-        """
-        Return the width, height, and the distance to advance cursor for
-        the current GFX font.
-
-        .. note::
-
-          If the character does not exist return values gw, gh, and xa
-          will be 0 (zero).
-
-        :param ch: The character to draw on the display.
-        :type ch: str
-        :return: A tuple (gw, gh, xa) where gw is the width in pixels
-                 of the character, gh is the height, and xa is the distance
-                 to advance cursor on the x axis.
-        :rtype: tuple
-        :raises TFTException: If the a GFX font is not set.
+        :param flag: True skip the writes, False write the registers every
+                     time.
+        :type flag: bool
         """
-        self._is_gfx_font_set()
-        ch = ord(ch)
-
-        # Is char present in this font?
-        if self._gfx_font.first <= ch <= self._gfx_font.last:
-            glyph = GFXGlyph(self._gfx_font.glyph[ch - self._gfx_font.first])
-            gw = glyph.width
-            gh = glyph.height
-            xa = glyph.x_advance
-        else:
-            gw = gh = xa = 0
-
-        return gw, gh, xa
+        self._register_cache = bool(flag)
+        self._invalidate_registers()
 
-    def get_gfx_text_extent(self, s, *, add_pixels=0):
+    def set_display(self, flag):
         """
-        Return the width and height of the string in pixels for the
-        current GFX font.
-
-        .. note::
-
-          If any of the chararcters in the provided string are not found
-          in the font the results for that character will be 0 (zero) for
-          both the w and h causing an invalid total for w and h.
+        Set the display on or off.
 
-        :param s: The character to draw on the display.
-        :type s: str
-        :param add_pixels: Number of pixels to add between characters
-                           (Default = 0).
-        :type add_pixels: int
-        :return: A tuple (w, h) where w is the width of the string and
-                 h is the height.
-        :rtype: tuple
-        :raises TFTException: If the a GFX font is not set.
+        :param flag: True = display on and False = display off.
+        :type flag: bool
         """
-        w = h = 0
-
-        for ch in s:
-            gw, gh, xa = self.get_gfx_char_extent(ch)
-            if gh > h: h = gh
-            w += xa + add_pixels
-
-        return w, h
-
-    def _is_gfx_font_set(self):
-        if self._gfx_font is None:
-            raise TFTException(self.ERROR_MSGS.get('GFX_FONT'))
+        self._invalidate_registers()
+
+        with self.transaction():
+            if flag:
+                self._write_register(0x00ff, 0x0000)
+                self._write_register(self.CMD_POWER_CTRL1, 0x0000)
+                self.delay(50)
+                self._write_register(self.CMD_DISP_CTRL1,
+                                     self.__display_control())
+            else:
+                self._write_register(0x00ff, 0x0000)
+                self._write_register(self.CMD_DISP_CTRL1, 0x0000)
+                self.delay(50)
+                self._write_register(self.CMD_POWER_CTRL1, 0x0003)
 
-    #
-    # End of GFX font methods.
-    #
+        self.delay(200)
 
     def draw_pixel(self, x0, y0, color):
         """
@@ -735,20 +347,63 @@ class ILI9225(Compatibility, CommonMethods):
         """
         Draw a sequence of pixels.
 
+        .. note::
+
+          Pixels that are next to each other horizontally or vertically
+          are drawn as a run with one window and one data write, any
+          others have their address set one at a time. If a pixel is
+          given more than once the last color is used.
+
         :param pixels: A list of tuples: [(x, y, color),...].
         :type pixels: list
         """
-        self._start_write()
+        self._run(self._iter_draw_pixels(pixels))
+
+    def _iter_draw_pixels(self, pixels):
+        """
+        Generator version of draw_pixels(), yields after each single pixel
+        and each run.
+        """
+        if self._fb is not None:
+            self._fb_draw_pixels(pixels)
+            return
+
+        points = {}
+        cx0, cy0, cx1, cy1 = self._clip_rect()
 
         for x, y, color in pixels:
-            if not ((x >= self.max_x) or (y >= self.max_y)):
-                x, y = self._orient_coordinates(x, y )
+            x = round(x)
+            y = round(y)
+
+            if cx0 <= x <= cx1 and cy0 <= y <= cy1:
+                points[(x, y)] = color
+
+        # Find the horizontal runs then the vertical runs in what is left.
+        h_runs, singles = self._find_runs(
+            sorted(points, key=lambda p: (p[1], p[0])), 0, self._MIN_RUN)
+        v_runs, singles = self._find_runs(singles, 1, self._MIN_RUN)
+        with self.transaction():
+            # The address of a single pixel can be outside the last window.
+            if singles: self._full_window()
+
+            for x, y in singles:
+                color = points[(x, y)]
+                x, y = self._orient_coordinates(
+                    *self._scroll_coordinates(x, y))
                 self._write_register(self.CMD_RAM_ADDR_SET1, x)
                 self._write_register(self.CMD_RAM_ADDR_SET2, y)
                 array = bytearray((color >> 8, color & 0xFF))
                 self._write_register(self.CMD_GRAM_DATA_REG, array)
+                yield
 
-        self._end_write(reuse=False)
+            for run in self._scroll_runs(h_runs + v_runs):
+                (x0, y0), (x1, y1) = run[0], run[-1]
+                self._set_window(x0, y0, x1, y1)
+                self._write_data(pack_be16([points[point] for point in run]))
+                yield
+
+            if h_runs or v_runs:
+                self._reset_window()
 
     def _set_window(self, x0, y0, x1, y1, mode=MODE_TOP_DOWN_L2R):
         """
@@ -766,13 +421,17 @@ class ILI9225(Compatibility, CommonMethods):
         :type mode: int
         :raises TFTException: If the orientation is out of range.
         """
+        if self._fb is not None:
+            self._fb_set_window(x0, y0, x1, y1, mode)
+            return
+
         # Clip to TFT-Dimensions
         x0 = min(x0, self.max_x - 1)
         x1 = min(x1, self.max_x - 1)
         y0 = min(y0, self.max_y - 1)
         y1 = min(y1, self.max_y - 1)
-        x0, y0 = self._orient_coordinates(x0, y0)
-        x1, y1 = self._orient_coordinates(x1, y1)
+        x0, y0 = self._orient_coordinates(*self._scroll_coordinates(x0, y0))
+        x1, y1 = self._orient_coordinates(*self._scroll_coordinates(x1, y1))
 
         if x1 < x0: x0, x1 = x1, x0
         if y1 < y0: y0, y1 = y1, y0
@@ -781,41 +440,174 @@ class ILI9225(Compatibility, CommonMethods):
         if self.orientation > 0:
             mode = self._MODE_TAB[self.orientation - 1][mode]
 
-        self._start_write()
-        self._write_register(self.CMD_ENTRY_MODE, 0x1000 | (mode << 3))
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR1, x1)
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR2, x0)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR1, y1)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR2, y0)
+        batch = CommandBatch()
+        registers = self._shadow_registers(batch, (
+            (self.CMD_ENTRY_MODE, 0x1000 | (mode << 3)),
+            (self.CMD_HORIZONTAL_WINDOW_ADDR1, x1),
+            (self.CMD_HORIZONTAL_WINDOW_ADDR2, x0),
+            (self.CMD_VERTICAL_WINDOW_ADDR1, y1),
+            (self.CMD_VERTICAL_WINDOW_ADDR2, y0)))
 
         # Starting position within window and increment/decrement direction
         pos = mode >> 1
 
         if pos == 0:
-            self._write_register(self.CMD_RAM_ADDR_SET1, x1)
-            self._write_register(self.CMD_RAM_ADDR_SET2, y1)
+            batch.register(self.CMD_RAM_ADDR_SET1, x1)
+            batch.register(self.CMD_RAM_ADDR_SET2, y1)
         elif pos == 1:
-            self._write_register(self.CMD_RAM_ADDR_SET1, x0)
-            self._write_register(self.CMD_RAM_ADDR_SET2, y1)
+            batch.register(self.CMD_RAM_ADDR_SET1, x0)
+            batch.register(self.CMD_RAM_ADDR_SET2, y1)
         elif pos == 2:
-            self._write_register(self.CMD_RAM_ADDR_SET1, x1)
-            self._write_register(self.CMD_RAM_ADDR_SET2, y0)
+            batch.register(self.CMD_RAM_ADDR_SET1, x1)
+            batch.register(self.CMD_RAM_ADDR_SET2, y0)
         elif pos == 3:
-            self._write_register(self.CMD_RAM_ADDR_SET1, x0)
-            self._write_register(self.CMD_RAM_ADDR_SET2, y0)
+            batch.register(self.CMD_RAM_ADDR_SET1, x0)
+            batch.register(self.CMD_RAM_ADDR_SET2, y0)
+
+        batch.command(self.CMD_GRAM_DATA_REG)
+        with self.transaction():
+            self._write_shadowed(batch, registers)
+
+    def _write_scroll_area(self, top, rows, bottom):
+        """
+        Write the rows that scroll, see set_scroll_area().
+
+        :param top: The first row that scrolls.
+        :type top: int
+        :param rows: The number of rows that scroll.
+        :type rows: int
+        :param bottom: The number of fixed rows below them.
+        :type bottom: int
+        """
+        batch = CommandBatch()
+        batch.register(self.CMD_VERTICAL_SCROLL_CTRL1, top + rows - 1)
+        batch.register(self.CMD_VERTICAL_SCROLL_CTRL2, top)
+        with self.transaction():
+            self._write_batch(batch)
 
-        self._write_command(self.CMD_GRAM_DATA_REG)
-        self._end_write(reuse=False)
+    def _write_scroll_offset(self, offset):
+        """
+        Write the number of rows the scroll area is scrolled by.
+
+        :param offset: The scroll offset.
+        :type offset: int
+        """
+        with self.transaction():
+            self._write_register(self.CMD_VERTICAL_SCROLL_CTRL3, offset)
+
+    def _write_partial_area(self, start, end):
+        """
+        Write the rows that are refreshed, see set_partial_area().
+
+        :param start: The first row or None for the whole display.
+        :type start: int
+        :param end: The last row or None for the whole display.
+        :type end: int
+        """
+        if start is None:
+            start, end = 0, self.LCD_HEIGHT - 1
+
+        batch = CommandBatch()
+        batch.register(self.CMD_PARTIAL_DRIVING_POS1, end)
+        batch.register(self.CMD_PARTIAL_DRIVING_POS2, start)
+        with self.transaction():
+            self._write_batch(batch)
+
+    def _write_idle_mode(self, flag):
+        """
+        Write the 8 color mode bit (CL) of display control 1.
+
+        :param flag: True for 8 colors, False for full color.
+        :type flag: bool
+        """
+        with self.transaction():
+            self._write_register(self.CMD_DISP_CTRL1,
+                                 self.__display_control())
+
+    def __display_control(self):
+        # TEMON, GON, REV and D1-0 are set, CL is set in idle mode.
+        return 0x101F if self.idle_mode else 0x1017
 
     def _reset_window(self):
-        self._start_write()
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR1,
-                             self.LCD_WIDTH - 1)
-        self._write_register(self.CMD_HORIZONTAL_WINDOW_ADDR2, 0)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR1,
-                             self.LCD_HEIGHT - 1)
-        self._write_register(self.CMD_VERTICAL_WINDOW_ADDR2, 0)
-        self._end_write(reuse=False)
+        """
+        End a windowed write.
+
+        .. note::
+
+          When the register cache is on the full screen window is not
+          written here, it is put back by _full_window() when a write that
+          is not windowed needs it.
+        """
+        if self._fb is not None:
+            self._fb_window = None
+        elif not self._register_cache:
+            self.__write_full_window()
+
+    def _full_window(self):
+        """
+        Set the window to the full screen if it is not already.
+
+        .. note::
+
+          When the register cache is off the full screen window was
+          already put back by _reset_window().
+        """
+        if self._register_cache:
+            self.__write_full_window()
+
+    def __write_full_window(self):
+        batch = CommandBatch()
+        registers = self._shadow_registers(batch, (
+            (self.CMD_HORIZONTAL_WINDOW_ADDR1, self.LCD_WIDTH - 1),
+            (self.CMD_HORIZONTAL_WINDOW_ADDR2, 0),
+            (self.CMD_VERTICAL_WINDOW_ADDR1, self.LCD_HEIGHT - 1),
+            (self.CMD_VERTICAL_WINDOW_ADDR2, 0)))
+
+        if registers:
+            with self.transaction():
+                self._write_shadowed(batch, registers)
+
+    def _shadow_registers(self, batch, registers):
+        """
+        Add the registers whose value is not already on the display to a
+        batch.
+
+        :param batch: The batch to add to.
+        :type batch: CommandBatch
+        :param registers: A sequence of (register, value) tuples.
+        :type registers: tuple
+        :return: The registers that were added.
+        :rtype: list
+        """
+        changed = []
+
+        for register, value in registers:
+            if (not self._register_cache
+                or self._registers.get(register) != value):
+                batch.register(register, value)
+                changed.append((register, value))
+
+        return changed
+
+    def _write_shadowed(self, batch, registers):
+        """
+        Write a batch and keep the values of the shadowed registers in it.
+        """
+        try:
+            self._write_batch(batch)
+        except Exception as e: # pragma: no cover
+            self._invalidate_registers()
+            raise e
+
+        for register, value in registers:
+            self._registers[register] = value
+
+    def _invalidate_registers(self):
+        """
+        Forget the register values, they are all written again the next
+        time they are used.
+        """
+        self._registers.clear()
 
     def __repr__(self):
         return "<{} object using the {} platform>".format(
@@ -8,8 +8,9 @@ Driver for the ILI9341 chip TFT LCD displays.
 import os
 
 from utils.compatibility import Compatibility
-from utils.common import (Boards, CommonMethods, TFTException,
-                          CompatibilityException, RGB16BitColor as Colors)
+from utils.common import (Boards, CommonMethods, CommandBatch, TFTException,
+                          CompatibilityException, RGB16BitColor as Colors,
+                          pack_be16)
 
 
 class ILI9341(Compatibility, CommonMethods):
@@ -114,6 +115,25 @@ class ILI9341(Compatibility, CommonMethods):
     CMD_PUMPRATIOCTL = 0xF7 # Pump ratio control
     CMD_UNKNOWN      = 0xEF # This is an undocumented command but must be sent
 
+    # MADCTL bits
+    MADCTL_MY        = 0x80 # Row address order
+    MADCTL_MX        = 0x40 # Column address order
+    MADCTL_MV        = 0x20 # Row/column exchange
+
+    # The MADCTL value for each orientation, all in BGR order. The panel is
+    # mirrored so orientation 0 sets MX.
+    _MADCTL_TAB = (0x48, 0x28, 0x88, 0xE8)
+
+    # Window modes, the same values as the ILI9225 entry modes. Only left
+    # to right and top down are supported, bit 0 set writes a column at a
+    # time by exchanging the rows and columns with MADCTL.
+    MODE_L2R_TOP_DOWN = 6
+    MODE_TOP_DOWN_L2R = 7
+
+    # Shortest run of pixels that is drawn as a run, a window costs the
+    # same as a single pixel so any two pixels next to each other are.
+    _MIN_RUN = 2
+
     def __init__(self, rst, rs, spi_port, cs=-1, mosi=-1, sck=-1, led=-1,
                  board=None, *, brightness=MAX_BRIGHTNESS, rpi_mode=None):
         """
@@ -157,12 +177,22 @@ class ILI9341(Compatibility, CommonMethods):
         self._led = led
         self.brightness = brightness # Default it maximum brightness.
         self._bl_state = True
-        self._current_font = None
-        self._cfont = CurrentFont()
-        self._gfx_font = None
+        # The MADCTL of the orientation and the last value written.
+        self._madctl = self._MADCTL_TAB[0]
+        self._madctl_sent = None
+        # A memory write was started and a command was sent since, the
+        # next data must be sent with WTMEMCONT.
+        self._ram_window = False
+        self._ram_resume = False
         self.set_board(board)
 
     def begin(self):
+        # The reset below puts MADCTL back to its default.
+        self._madctl_sent = None
+        self._ram_window = False
+        self._ram_resume = False
+        self._clear_scroll()
+        self._clear_partial()
         # Setup MCU specific pins
         self._spi_port_device()
 
@@ -195,51 +225,56 @@ class ILI9341(Compatibility, CommonMethods):
         if self.DEBUG: # pragma: no cover
             print("begin: Finished setting up pins.")
 
+        # The SPI port stays open until pin_cleanup() is called.
+        self._open_session()
+
         # Power-on sequence
-        self._start_write()
-        self.spi_close_override = True
-        self._write_register(self.CMD_UNKNOWN, bytearray((0x03, 0x80, 0x02)))
-        self._write_register(self.CMD_PWCTLB, bytearray((0x00, 0xC1, 0x30)))
-        self._write_register(self.CMD_PWONSEQCTL, bytearray(
-            (0x64, 0x03, 0x12, 0x81)))
-        self._write_register(self.CMD_DRTMCTLA, bytearray((0x85, 0x00, 0x78)))
-        self._write_register(self.CMD_PWCTLA, bytearray(
-            (0x39, 0x2C, 0x00, 0x34, 0x02)))
-        self._write_register(self.CMD_PUMPRATIOCTL, bytearray((0x20,)))
-        self._write_register(self.CMD_DRTMCTLB, bytearray((0x00, 0x00)))
-        self._write_register(self.CMD_PWCTR1, bytearray((0x23,)))
-        self._write_register(self.CMD_PWCTR2, bytearray((0x10,)))
-        self._write_register(self.CMD_VMCTR1, bytearray((0x3e, 0x28)))
-        self._write_register(self.CMD_VMCTR2, bytearray((0x86,)))
-        self._write_register(self.CMD_MADCTL, bytearray((0x48,)))
-        self._write_register(self.CMD_PIXFMT, bytearray((0x55,)))
-        self._write_register(self.CMD_FRMCTR1, bytearray((0x00, 0x18)))
-        self._write_register(self.CMD_DFUNCTR, bytearray((0x08, 0x82,0x27 )))
-        self._write_register(self.CMD_EN3GAMMA, bytearray((0x00,)))
-        self._write_register(self.CMD_GAMMASET, bytearray((0x01,)))
-        self._write_register(self.CMD_GMCTRP, bytearray(
-            (0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E, 0xF1,
-             0x37, 0x07, 0x10, 0x03, 0x0E, 0x09, 0x00)))
-        self._write_register(self.CMD_GMCTRN, bytearray(
-            (0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31, 0xC1,
-             0x48, 0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F)))
-        self._write_command(self.CMD_SLPOUT)
-        self.delay(120)
-        self._write_command(self.CMD_DISPON)
+        with self.transaction():
+            self._write_register(self.CMD_UNKNOWN, bytearray(
+                (0x03, 0x80, 0x02)))
+            self._write_register(self.CMD_PWCTLB, bytearray(
+                (0x00, 0xC1, 0x30)))
+            self._write_register(self.CMD_PWONSEQCTL, bytearray(
+                (0x64, 0x03, 0x12, 0x81)))
+            self._write_register(self.CMD_DRTMCTLA, bytearray(
+                (0x85, 0x00, 0x78)))
+            self._write_register(self.CMD_PWCTLA, bytearray(
+                (0x39, 0x2C, 0x00, 0x34, 0x02)))
+            self._write_register(self.CMD_PUMPRATIOCTL, bytearray((0x20,)))
+            self._write_register(self.CMD_DRTMCTLB, bytearray((0x00, 0x00)))
+            self._write_register(self.CMD_PWCTR1, bytearray((0x23,)))
+            self._write_register(self.CMD_PWCTR2, bytearray((0x10,)))
+            self._write_register(self.CMD_VMCTR1, bytearray((0x3e, 0x28)))
+            self._write_register(self.CMD_VMCTR2, bytearray((0x86,)))
+            self._write_register(self.CMD_MADCTL, bytearray((self._madctl,)))
+            self._madctl_sent = self._madctl
+            self._write_register(self.CMD_PIXFMT, bytearray((0x55,)))
+            self._write_register(self.CMD_FRMCTR1, bytearray((0x00, 0x18)))
+            self._write_register(self.CMD_DFUNCTR, bytearray(
+                (0x08, 0x82, 0x27)))
+            self._write_register(self.CMD_EN3GAMMA, bytearray((0x00,)))
+            self._write_register(self.CMD_GAMMASET, bytearray((0x01,)))
+            self._write_register(self.CMD_GMCTRP, bytearray(
+                (0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E, 0xF1,
+                 0x37, 0x07, 0x10, 0x03, 0x0E, 0x09, 0x00)))
+            self._write_register(self.CMD_GMCTRN, bytearray(
+                (0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31, 0xC1,
+                 0x48, 0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F)))
+            self._write_command(self.CMD_SLPOUT)
+            self.delay(120)
+            self._write_command(self.CMD_DISPON)
 
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished power-on sequence.")
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished power-on sequence.")
 
-        # Turn on backlight
-        self.set_backlight(True)
-        self.orientation = 0
+            # Turn on backlight
+            self.set_backlight(True)
+            self.orientation = 0
 
-        if self.DEBUG: # pragma: no cover
-            print("begin: Finished turning on backlight.")
+            if self.DEBUG: # pragma: no cover
+                print("begin: Finished turning on backlight.")
 
-        self.clear()
-        self.spi_close_override = False
-        self._end_write(reuse=False)
+            self.clear()
 
         if self.DEBUG: # pragma: no cover
             print("begin: Finished initialize background color.")
@@ -251,95 +286,263 @@ class ILI9341(Compatibility, CommonMethods):
         :param flag: True = display on and False = display off.
         :type flag: bool
         """
-        self._start_write()
+        with self.transaction():
+            if flag:
+                self._write_command(self.CMD_DISPON)
+            else:
+                self._write_command(self.CMD_DISPOFF)
 
-        if flag:
-            self._write_command(self.CMD_DISPON)
-        else:
-            self._write_command(self.CMD_DISPOFF)
-
-        self._end_write(reuse=False)
         self.delay(200)
 
-    def draw_pixel(self, x0, y0, x1, y1, color):
+    def _set_scan_direction(self, orientation):
+        """
+        Set MADCTL so the controller does the rotation, the column and
+        page addresses are then in the coordinates of the orientation.
+        MADCTL is written with the next window.
+
+        :param orientation: The orientation, 0..3.
+        :type orientation: int
+        :return: Always True.
+        :rtype: bool
+        """
+        self._madctl = self._MADCTL_TAB[orientation]
+        return True
+
+    def draw_pixel(self, x0, y0, color):
         """
         Draw a pixel.
 
-        :param x0: Left column (x-axis).
+        :param x0: Point coordinate (x-axis).
         :type x0: int
-        :param y0: Top row (y-axis).
+        :param y0: Point coordinate (y-axis).
         :type y0: int
-        :param x1: Right column (x-axis).
-        :type x1: int
-        :param y1: Bottom row (y-axis).
-        :type y1: int
         :param color: A 16-bit RGB color.
         :type color: int
         """
-        self.draw_pixels(((x0, y0, x1, y1, color),))
+        self.draw_pixels(((x0, y0, color),))
 
     def draw_pixels(self, pixels):
         """
         Draw a sequence of pixels.
 
-        :param pixels: A list of tuples: [(x0, y0, x1, y1, color),...].
-        :type pixels: list
-        """
-        self._start_write()
+        .. note::
 
-        for x0, y0, x1, y1, color in pixels:
-            if not ((x >= self.max_x) or (y >= self.max_y)):
-                x, y = self._orient_coordinates(x, y )
-                self._write_register(self.CMD_CASET, bytearray((x0, x1)))
-                self._write_register(self.CMD_RWSET, bytearray((y0, y1)))
-                array = bytearray((color >> 8, color & 0xFF))
-                self._write_register(self.CMD_RAMWR, array)
+          Pixels that are next to each other horizontally or vertically
+          are drawn as a run, each run and each single pixel is sent as
+          one window and its data with one chip select. If a pixel is
+          given more than once the last color is used.
 
-        self._end_write(reuse=False)
+        :param pixels: A list of tuples: [(x, y, color),...].
+        :type pixels: list
+        """
+        self._run(self._iter_draw_pixels(pixels))
 
-    def _set_window(self, x0, y0, x1, y1): #, mode=MODE_TOP_DOWN_L2R): # 7
+    def _iter_draw_pixels(self, pixels):
+        """
+        Generator version of draw_pixels(), yields after each single pixel
+        and each run.
+        """
+        if self._fb is not None:
+            self._fb_draw_pixels(pixels)
+            return
+
+        points = {}
+        cx0, cy0, cx1, cy1 = self._clip_rect()
+
+        for x, y, color in pixels:
+            x = round(x)
+            y = round(y)
+
+            if cx0 <= x <= cx1 and cy0 <= y <= cy1:
+                points[(x, y)] = color
+
+        # Find the horizontal runs then the vertical runs in what is left.
+        h_runs, singles = self._find_runs(
+            sorted(points, key=lambda p: (p[1], p[0])), 0, self._MIN_RUN)
+        v_runs, singles = self._find_runs(singles, 1, self._MIN_RUN)
+        with self.transaction():
+            for run in self._scroll_runs(
+                h_runs + v_runs + [[point] for point in singles]):
+                (x0, y0), (x1, y1) = run[0], run[-1]
+                batch, madctl = self.__window_batch(x0, y0, x1, y1,
+                                                    self.MODE_L2R_TOP_DOWN)
+                batch.data(pack_be16([points[point] for point in run]))
+                self.__write_window(batch, madctl)
+                yield
+
+            if points:
+                self._reset_window()
+
+    def _set_window(self, x0, y0, x1, y1, mode=MODE_L2R_TOP_DOWN):
         """
         Set the window that will be drawn using the current orientation.
 
         :param x0: Start x coordinate.
         :type x0: int
-        :param y0: Start y continent.
+        :param y0: Start y coordinate.
         :type y0: int
-        :param x1: End x Continent.
+        :param x1: End x coordinate.
         :type x1: int
-        :param y1: End y Continent.
+        :param y1: End y coordinate.
         :type y1: int
-        :param mode: The orientation mode.
+        :param mode: MODE_L2R_TOP_DOWN writes a row at a time and
+                     MODE_TOP_DOWN_L2R a column at a time.
         :type mode: int
-        :raises TFTException: If the orientation is out of range.
+        """
+        if self._fb is not None:
+            self._fb_set_window(x0, y0, x1, y1, mode)
+            return
+
+        self.__write_window(*self.__window_batch(x0, y0, x1, y1, mode))
+
+    def _write_scroll_area(self, top, rows, bottom):
+        """
+        Write the fixed and scrolling rows, see set_scroll_area().
+
+        :param top: The number of fixed rows at the top.
+        :type top: int
+        :param rows: The number of rows that scroll.
+        :type rows: int
+        :param bottom: The number of fixed rows at the bottom.
+        :type bottom: int
+        """
+        with self.transaction():
+            self._write_register(self.CMD_VRSCRL,
+                                 pack_be16((top, rows, bottom)))
+
+    def _write_scroll_offset(self, offset):
+        """
+        Write the row in memory shown at the top of the scroll area.
+
+        :param offset: The scroll offset.
+        :type offset: int
+        """
+        with self.transaction():
+            self._write_register(self.CMD_VRSCRLST,
+                                 pack_be16((self._scroll_top + offset,)))
+
+    def _write_partial_area(self, start, end):
+        """
+        Write the rows that are refreshed, see set_partial_area().
+
+        :param start: The first row or None for the whole display.
+        :type start: int
+        :param end: The last row or None for the whole display.
+        :type end: int
+        """
+        with self.transaction():
+            if start is None:
+                self._write_command(self.CMD_NORON)
+            else:
+                self._write_register(self.CMD_PTLAR, pack_be16((start, end)))
+                self._write_command(self.CMD_PTLON)
+
+    def _write_idle_mode(self, flag):
+        """
+        Turn idle mode on or off.
+
+        :param flag: True for 8 colors, False for full color.
+        :type flag: bool
+        """
+        with self.transaction():
+            self._write_command(self.CMD_IDLEON if flag
+                                else self.CMD_IDLEOFF)
+
+    def _reset_window(self):
+        """
+        End a windowed write, every write sets its own window so nothing
+        needs to be sent.
+        """
+        if self._fb is not None:
+            self._fb_window = None
+        else:
+            self._ram_window = False
+            self._ram_resume = False
+
+    def __window_batch(self, x0, y0, x1, y1, mode):
+        """
+        Get a batch with MADCTL if it changed, the column and page
+        addresses and RAMWR.
+
+        :return: A tuple of the batch and the MADCTL value it sets.
+        :rtype: tuple
         """
         # Clip to TFT-Dimensions
         x0 = min(x0, self.max_x - 1)
         x1 = min(x1, self.max_x - 1)
         y0 = min(y0, self.max_y - 1)
         y1 = min(y1, self.max_y - 1)
-        x0, y0 = self._orient_coordinates(x0, y0)
-        x1, y1 = self._orient_coordinates(x1, y1)
+        x0, y0 = self._orient_coordinates(*self._scroll_coordinates(x0, y0))
+        x1, y1 = self._orient_coordinates(*self._scroll_coordinates(x1, y1))
 
         if x1 < x0: x0, x1 = x1, x0
         if y1 < y0: y0, y1 = y1, y0
 
-        self._start_write()
-        self.command(CMD_CASET)  # Column addr set
-        self.data(x0 >> 8)
-        self.data(x0)            # XSTART
-        self.data(x1 >> 8)
-        self.data(x1)            # XEND
-        self.command(CMD_PASET)  # Row addr set
-        self.data(y0 >> 8)
-        self.data(y0)            # YSTART
-        self.data(y1 >> 8)
-        self.data(y1)            # YEND
-        self.command(CMD_RAMWR)  # write to RAM
-        self._end_write(reuse=False)
+        madctl = self._madctl
 
-    def _reset_window(self):
-        self._set_window(0, 0, self.LCD_WIDTH-1, self.LCD_HEIGHT-1)
+        # Write a column at a time, the columns are then the rows.
+        if mode & 0x01:
+            madctl ^= self.MADCTL_MV
+            x0, y0, x1, y1 = y0, x0, y1, x1
+
+        batch = CommandBatch(size=1)
+
+        if madctl != self._madctl_sent:
+            batch.register(self.CMD_MADCTL, madctl)
+
+        batch.register(self.CMD_CASET, pack_be16((x0, x1)))
+        batch.register(self.CMD_RWSET, pack_be16((y0, y1)))
+        batch.command(self.CMD_WRRAM)
+        return batch, madctl
+
+    def __write_window(self, batch, madctl):
+        with self.transaction():
+            self._write_batch(batch)
+
+        self._madctl_sent = madctl
+        self._ram_window = True
+        self._ram_resume = False
+
+    def _write_register(self, command, data):
+        """
+        Write a command and its parameters with one chip select.
+
+        :param command: The 8-bit command.
+        :type command: int
+        :param data: The parameters.
+        :type data: int, list, tuple, bytearray, or memoryview
+        """
+        batch = CommandBatch(size=1)
+        batch.register(command, data)
+        self._write_batch(batch)
+        if self._ram_window: self._ram_resume = True
+
+    def _write_command(self, command):
+        """
+        Write an 8-bit command.
+
+        :param command: The command.
+        :type command: int
+        """
+        if isinstance(command, int):
+            command = bytearray((command,))
+
+        super()._write_command(command)
+        if self._ram_window: self._ram_resume = True
+
+    def _write_data(self, data):
+        """
+        Write pixel data, if a command was sent since the window was set
+        the memory write is continued with WTMEMCONT.
+
+        :param data: The data.
+        :type data: int, list, tuple, bytearray, or memoryview
+        """
+        if self._ram_resume and self._fb_window is None:
+            super()._write_command(bytearray((self.CMD_WTMEMCONT,)))
+            self._ram_resume = False
+
+        super()._write_data(data)
 
     def __repr__(self):
         return "<{} object using the {} platform>".format(
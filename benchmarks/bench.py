@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+#
+# benchmarks/bench.py
+#
+# Time the drawing primitives, text and begin() and count the SPI and
+# GPIO traffic each one makes.
+#
+# By default the simulator backend is used so no hardware is needed, the
+# SPI counters and the bus time are then exact and repeatable. Use
+# --hardware on a Raspberry Pi to time the real backend, only the GPIO
+# counters are then available.
+#
+# Examples:
+#   benchmarks/bench.py
+#   benchmarks/bench.py -k text --json results.json
+#   benchmarks/bench.py --display ILI9341
+#   benchmarks/bench.py --compare benchmarks/baseline.json
+#
+
+import os
+import sys
+import json
+import time
+import platform
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT_PATH)
+
+
+class Case:
+    """
+    One benchmark, setup and teardown are not timed.
+    """
+
+    def __init__(self, name, func, setup=None, teardown=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.teardown = teardown
+
+
+class Benchmarks:
+    """
+    Run the benchmark cases and compare the results with a baseline.
+    """
+    RST = 17
+    RS = 27
+    PORT = 0
+    CS = 8
+    LED = 22
+    DISPLAYS = ('ILI9225', 'ILI9341')
+    # Counters compared exactly against the baseline.
+    COUNTERS = ('spi_bytes', 'spi_writes', 'spi_transactions', 'gpio_writes')
+    GFX_FONTS = ('FreeSans9pt7b', 'FreeSansBold18pt7b',
+                 'FreeSerifItalic18pt7b', 'FreeMono24pt7b')
+    STD_FONTS = ('Terminal6x8', 'Terminal11x16', 'Terminal12x16',
+                 'Trebuchet_MS16x21')
+    # Trebuchet_MS16x21 only has the characters "./0123456789:".
+    STD_TEXT = "12:34.56/78"
+    GFX_TEXT = "The quick brown fox"
+
+    def __init__(self, options):
+        self._options = options
+
+    def start(self):
+        results = self.run()
+        self.print_results(results)
+        ret = 0
+
+        if self._options.json:
+            data = {
+                'platform': self._tft.PLATFORM,
+                'display': self._options.display,
+                'python': platform.python_version(),
+                'number': self._options.number,
+                'results': results,
+                }
+
+            with open(self._options.json, 'w') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+        if self._options.compare:
+            with open(self._options.compare, 'r') as f:
+                baseline = json.load(f)['results']
+
+            ret = self.compare(results, baseline)
+
+        self._tft.pin_cleanup()
+        return ret
+
+    def run(self):
+        name = self._options.display
+        module = __import__(name, fromlist=[name, 'Boards'])
+        self._tft = getattr(module, name)(self.RST, self.RS, self.PORT,
+                                          self.CS, led=self.LED,
+                                          board=module.Boards.RASPI)
+        self._tft.begin()
+        results = {}
+
+        for case in self.cases():
+            keyword = self._options.keyword
+
+            if keyword and keyword not in case.name:
+                continue
+
+            results[case.name] = self.measure(case)
+
+        return results
+
+    def cases(self):
+        from utils import default_fonts
+        from utils.common import Colors
+
+        tft = self._tft
+        # A 64x64 icon of 8 pixel stripes and an 80x80 RGB565 image.
+        icon = bytes((0xFF, 0x00) * 256)
+        image = bytes(range(256)) * 50
+        cases = [
+            Case('begin', tft.begin),
+            Case('clear', tft.clear),
+            Case('clear_area', lambda: tft.clear(20, 20, 120, 150)),
+            Case('draw_pixel', lambda: tft.draw_pixel(88, 110, Colors.RED)),
+            Case('draw_pixels', lambda: tft.draw_pixels(
+                [(x, 50 + x % 7, Colors.RED) for x in range(0, 160, 2)])),
+            Case('draw_line', lambda: tft.draw_line(
+                0, 0, 175, 219, Colors.RED)),
+            Case('draw_hline', lambda: tft.draw_hline(
+                0, 100, 176, Colors.RED)),
+            Case('draw_vline', lambda: tft.draw_vline(
+                88, 0, 220, Colors.RED)),
+            Case('draw_rectangle', lambda: tft.draw_rectangle(
+                10, 10, 165, 209, Colors.RED)),
+            Case('fill_rectangle', lambda: tft.fill_rectangle(
+                10, 10, 165, 209, Colors.RED)),
+            Case('draw_circle', lambda: tft.draw_circle(
+                88, 110, 80, Colors.RED)),
+            Case('fill_circle', lambda: tft.fill_circle(
+                88, 110, 80, Colors.RED)),
+            Case('draw_triangle', lambda: tft.draw_triangle(
+                10, 200, 88, 10, 165, 200, Colors.RED)),
+            Case('fill_triangle', lambda: tft.fill_triangle(
+                10, 200, 88, 10, 165, 200, Colors.RED)),
+            Case('fill_round_rectangle', lambda: tft.fill_round_rectangle(
+                10, 10, 165, 209, 20, Colors.RED)),
+            Case('fill_polygon', lambda: tft.fill_polygon(
+                [(10, 10), (165, 40), (120, 209), (40, 150)], Colors.RED)),
+            Case('draw_bitmap', lambda: tft.draw_bitmap(
+                20, 20, icon, 64, 64, Colors.RED)),
+            Case('draw_bitmap_transparent', lambda: tft.draw_bitmap(
+                20, 20, icon, 64, 64, Colors.RED, transparent=True)),
+            Case('draw_rgb_bitmap', lambda: tft.draw_rgb_bitmap(
+                20, 20, image, 80, 80)),
+            Case('show', tft.show, setup=self._fb_setup,
+                 teardown=lambda: tft.set_framebuffer(False)),
+            ]
+
+        for name in self.STD_FONTS:
+            font = getattr(default_fonts, name)
+            cases.append(Case(
+                f'draw_text[{name}]',
+                lambda: tft.draw_text(0, 100, self.STD_TEXT, Colors.WHITE),
+                setup=lambda font=font: tft.set_font(font)))
+
+        for name in self.GFX_FONTS:
+            module = __import__(f'fonts.{name}', fromlist=[name])
+            font = getattr(module, name)
+            cases.append(Case(
+                f'draw_gfx_text[{name}]',
+                lambda: tft.draw_gfx_text(0, 100, self.GFX_TEXT,
+                                          Colors.WHITE),
+                setup=lambda font=font: tft.set_gfx_font(font)))
+
+        return cases
+
+    def _fb_setup(self):
+        from utils.common import Colors
+
+        self._tft.set_framebuffer(True)
+        self._tft.fill_rectangle(0, 0, self._tft.max_x - 1,
+                                 self._tft.max_y - 1, Colors.BLUE)
+
+    def measure(self, case):
+        """
+        Run a case once for the counters then time it.
+
+        :return: The results for the case.
+        :rtype: dict
+        """
+        if case.setup: case.setup()
+        before = self._counters()
+        case.func()
+        after = self._counters()
+        if case.teardown: case.teardown()
+        result = {key: (after[key] - before[key]
+                        if after[key] is not None else None)
+                  for key in after}
+
+        if result['bus_ms'] is not None:
+            result['bus_ms'] = round(result['bus_ms'], 4)
+
+        times = []
+
+        for idx in range(self._options.number):
+            if case.setup: case.setup()
+            start = time.perf_counter()
+            case.func()
+            times.append(time.perf_counter() - start)
+            if case.teardown: case.teardown()
+
+        times.sort()
+        result['wall_ms'] = round(times[len(times) // 2] * 1000, 4)
+        return result
+
+    def _counters(self):
+        tft = self._tft
+        spi_stats = getattr(tft, 'spi_stats', {})
+        clock = getattr(tft, 'clock', None)
+        counters = {key: spi_stats.get(key) for key in self.COUNTERS[:3]}
+        counters['gpio_writes'] = tft.gpio_stats['gpio_writes']
+        counters['bus_ms'] = clock.ms if clock else None
+        return counters
+
+    def print_results(self, results):
+        keys = ('wall_ms', 'bus_ms') + self.COUNTERS
+        width = max([len(name) for name in results] + [4])
+        sys.stdout.write(f"{'case': <{width}}"
+                         + ''.join(f"{key: >18}" for key in keys) + '\n')
+
+        for name, result in results.items():
+            values = ''.join(
+                f"{'-' if result[key] is None else result[key]: >18}"
+                for key in keys)
+            sys.stdout.write(f"{name: <{width}}{values}\n")
+
+    def compare(self, results, baseline):
+        """
+        Compare the results with a baseline, the counters must not grow
+        and the wall time must not grow by more than the tolerance.
+
+        :return: 0 if nothing regressed else 1.
+        :rtype: int
+        """
+        tolerance = self._options.tolerance
+        regressions = []
+
+        for name, result in results.items():
+            base = baseline.get(name)
+
+            if base is None:
+                sys.stdout.write(f"New case: {name}\n")
+                continue
+
+            for key in self.COUNTERS + ('bus_ms',):
+                old, new = base.get(key), result.get(key)
+
+                if old is not None and new is not None and new > old:
+                    regressions.append((name, key, old, new))
+
+            old, new = base['wall_ms'], result['wall_ms']
+
+            if new > old * (1 + tolerance):
+                regressions.append((name, 'wall_ms', old, new))
+
+        for name in baseline:
+            if name not in results and not self._options.keyword:
+                sys.stdout.write(f"Missing case: {name}\n")
+
+        for name, key, old, new in regressions:
+            change = (new - old) / old * 100 if old else float('inf')
+            sys.stdout.write(f"REGRESSION {name} {key}: {old} -> {new} "
+                             f"(+{change:.1f}%)\n")
+
+        if not regressions:
+            sys.stdout.write("No regressions.\n")
+
+        return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    import traceback
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description=("Benchmark the drawing methods."))
+    parser.add_argument(
+        '-n', '--number', type=int, default=5, dest='number',
+        help="The number of timed runs of each case (default 5)."
+        )
+    parser.add_argument(
+        '-k', '--keyword', default='', dest='keyword',
+        help="Only run the cases with this in their name."
+        )
+    parser.add_argument(
+        '-j', '--json', metavar='path', default='', dest='json',
+        help="Write the results to a JSON file."
+        )
+    parser.add_argument(
+        '-c', '--compare', metavar='path', default='', dest='compare',
+        help="Compare the results with a baseline JSON file."
+        )
+    parser.add_argument(
+        '-t', '--tolerance', type=float, default=0.25, dest='tolerance',
+        help=("How much the wall time can grow before it is a regression "
+              "(default 0.25 = 25%%).")
+        )
+    parser.add_argument(
+        '-d', '--display', choices=Benchmarks.DISPLAYS, default='ILI9225',
+        dest='display', help="The display to benchmark (default ILI9225)."
+        )
+    parser.add_argument(
+        '-H', '--hardware', action='store_true', default=False,
+        dest='hardware', help="Use the real backend instead of the simulator."
+        )
+    options = parser.parse_args()
+
+    if not options.hardware:
+        os.environ['TFT_SIMULATOR'] = '1'
+
+    try:
+        exit_val = Benchmarks(options).start()
+    except Exception as e:
+        tb = sys.exc_info()[2]
+        traceback.print_tb(tb)
+        sys.stdout.write(f"{sys.exc_info()[0]}: {sys.exc_info()[1]}\n")
+        exit_val = 2
+
+    sys.exit(exit_val)
@@ -14,7 +14,7 @@ from time import sleep
 from busio import SPI
 from pwmio import PWMOut
 
-from utils.common import Boards, CompatibilityException
+from utils.common import Boards, CompatibilityException, pack_be16
 
 
 class PiVersion:
@@ -39,6 +39,9 @@ class PiVersion:
         self._spi = None
         self.__pin_state = {}
         self.__pwm_pin_states = {}
+        self._pin_levels = {}
+        self._cs_hold = False
+        self.gpio_stats = {'gpio_writes': 0, 'gpio_writes_saved': 0}
 
     def pin_mode(self, pin, direction, *, pull=None, default=None):
         """
@@ -60,24 +63,42 @@ class PiVersion:
         """
         self.__pin_state[str(pin)] = DigitalInOut(pin)
         self.__pin_state[str(pin)].direction = direction
-        if default is not None: self.__pin_state[str(pin)].value = default
+        self._pin_levels.pop(pin, None)
+
+        if default is not None:
+            self.__pin_state[str(pin)].value = default
+            self._pin_levels[pin] = default
 
     def digital_write(self, pin, high_low):
         """
         Set the given pin either high or low.
 
+        .. note::
+
+          The last level written to each pin is kept, writing the same
+          level again is skipped and counted in gpio_stats.
+
         :param pin: The pin to set.
         :type pin: int
         :param high_low: Set HIGH (True) or LOW (False).
         :type high_low: bool
         """
-        self.__pin_state[str(pin)].value = high_low
+        if self._pin_levels.get(pin) == high_low:
+            self.gpio_stats['gpio_writes_saved'] += 1
+        else:
+            self.__pin_state[str(pin)].value = high_low
+            self._pin_levels[pin] = high_low
+            self.gpio_stats['gpio_writes'] += 1
 
     def pin_cleanup(self):
         """
         To be run after this API is no longer used.
         """
-        if self._spi: self._spi.deinit()
+        # A display object also forgets its SPI session.
+        if hasattr(self, '_close_session'):
+            self._close_session()
+        else:
+            self.spi_end_transaction()
 
         for obj in self.__pin_state.values():
             obj.deinit()
@@ -85,6 +106,8 @@ class PiVersion:
         for obj in self.__pwm_pin_states.values():
             obj.deinit()
 
+        self._pin_levels.clear()
+
     def delay(self, ms):
         """
         Set a delay in milliseconds.
@@ -142,32 +165,50 @@ class PiVersion:
         then the cs (chip select) pin to low (selected) then write the data
         then set the cs pin to high (unselected).
 
-        :param value: The value to write to the SPI port.
-        :type value: str or bytearray
+        Any bytes like object is written as is, all other values are
+        packed as 16-bit values high byte first.
+
+        :param values: The values to write to the SPI port.
+        :type values: int, list, tuple, array, bytes, bytearray, or
+                      memoryview
         """
-        if not isinstance(values, bytearray):
-            items = values
+        if not isinstance(values, (bytearray, bytes, memoryview)):
+            values = pack_be16(values)
 
-            if isinstance(items, (int, float)):
-                items = round(items)
-                items = [items]
+        self.digital_write(self._cs, self.LOW)
 
-            values = bytearray()
+        try:
+            while self._spi.try_lock(): pass
+            self._spi.write(values)
+        except Exception as e:
+            raise CompatibilityException("Error writing: {}".format(str(e)))
+        finally:
+            self._spi.unlock()
+            if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
 
-            for item in items:
-                values.append(item >> 8)
-                values.append(item & 0xFF)
+    def spi_write_segments(self, rs, segments):
+        """
+        Write a list of command and data segments to the SPI port with
+        one chip select.
 
+        :param rs: The RS (data/command) pin.
+        :type rs: int
+        :param segments: A list of (is_data, bytearray) tuples.
+        :type segments: list
+        """
         self.digital_write(self._cs, self.LOW)
 
         try:
             while self._spi.try_lock(): pass
-            self._spi.write(values)
+
+            for is_data, values in segments:
+                self.digital_write(rs, self.HIGH if is_data else self.LOW)
+                self._spi.write(values)
         except Exception as e:
             raise CompatibilityException("Error writing: {}".format(str(e)))
         finally:
             self._spi.unlock()
-            self.digital_write(self._cs, self.HIGH)
+            if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
 
     def _need_chunking(self, array):
         array_len = len(array)
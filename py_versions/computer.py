@@ -39,6 +39,9 @@ class PiVersion:
         GPIO.setmode(mode)
         GPIO.setwarnings(False)
         self.__pwm_pin_states = {}
+        self._pin_levels = {}
+        self._cs_hold = False
+        self.gpio_stats = {'gpio_writes': 0, 'gpio_writes_saved': 0}
 
     def pin_mode(self, pin, direction, *, pull=GPIO.PUD_OFF, default=None,
                  alt=-1):
@@ -58,27 +61,48 @@ class PiVersion:
         :type alt: int
         """
         GPIO.setup(pin, direction, pull_up_down=pull)
-        if default is not None: GPIO.output(pin, default)
+        self._pin_levels.pop(pin, None)
+
+        if default is not None:
+            GPIO.output(pin, default)
+            self._pin_levels[pin] = default
 
     def digital_write(self, pin, high_low):
         """
         Set the given pin either high or low.
 
+        .. note::
+
+          The last level written to each pin is kept, writing the same
+          level again is skipped and counted in gpio_stats.
+
         :param pin: The pin to set.
         :type pin: int
         :param high_low: Set HIGH (True) or LOW (False).
         :type high_low: bool
         """
-        GPIO.output(pin, high_low)
+        if self._pin_levels.get(pin) == high_low:
+            self.gpio_stats['gpio_writes_saved'] += 1
+        else:
+            GPIO.output(pin, high_low)
+            self._pin_levels[pin] = high_low
+            self.gpio_stats['gpio_writes'] += 1
 
     def pin_cleanup(self):
         """
         To be run after this API is no longer to be used.
         """
+        # A display object also forgets its SPI session.
+        if hasattr(self, '_close_session'):
+            self._close_session()
+        else:
+            self.spi_end_transaction()
+
         for obj in self.__pwm_pin_states.values():
             obj.stop()
 
         GPIO.cleanup()
+        self._pin_levels.clear()
 
     def delay(self, ms):
         sleep(ms/1000) # Convert to floating point.
@@ -93,3 +117,6 @@ class PiVersion:
 
     def spi_write(self, value):
         pass
+
+    def spi_write_segments(self, rs, segments):
+        pass
@@ -72,7 +72,7 @@ STM32F76 = port 1=SPI1 (MISO=PA6, MOSI=PA7, SCK=PA5) or
 from machine import Pin, SPI, PWM, reset
 from time import sleep_ms
 
-from utils.common import Boards, CompatibilityException
+from utils.common import Boards, CompatibilityException, pack_be16
 
 
 class PiVersion:
@@ -108,6 +108,9 @@ class PiVersion:
         self._spi = None
         self.__pin_state = {}
         self.__pwm_pin_states = {}
+        self._pin_levels = {}
+        self._cs_hold = False
+        self.gpio_stats = {'gpio_writes': 0, 'gpio_writes_saved': 0}
 
     def pin_mode(self, pin, direction=-1, pull=-1, *, default=None):
         """
@@ -135,24 +138,44 @@ class PiVersion:
                 pin, direction, pull, default, e)
             raise CompatibilityException(msg)
 
+        self._pin_levels.pop(pin, None)
+        if default is not None: self._pin_levels[pin] = default
+
     def digital_write(self, pin, high_low):
         """
         Set the given pin either high or low.
 
+        .. note::
+
+          The last level written to each pin is kept, writing the same
+          level again is skipped and counted in gpio_stats.
+
         :param pin: The pin to set.
         :type pin: int
         :param high_low: Set HIGH (True) or LOW (False).
         :type high_low: bool
         """
-        self.__pin_state[pin].value(high_low)
+        if self._pin_levels.get(pin) == high_low:
+            self.gpio_stats['gpio_writes_saved'] += 1
+        else:
+            self.__pin_state[pin].value(high_low)
+            self._pin_levels[pin] = high_low
+            self.gpio_stats['gpio_writes'] += 1
 
     def pin_cleanup(self):
         """
         To be run after this API is no longer used.
         """
+        # A display object also forgets its SPI session.
+        if hasattr(self, '_close_session'):
+            self._close_session()
+        else:
+            self.spi_end_transaction()
+
         for obj in self.__pwm_pin_states.values():
             obj.deinit()
 
+        self._pin_levels.clear()
         reset()
 
     def delay(self, ms):
@@ -232,35 +255,50 @@ class PiVersion:
         then the cs (chip select) pin to low (selected) then write the data
         then set the cs pin to high (unselected).
 
+        Any bytes like object is written as is, all other values are
+        packed as 16-bit values high byte first.
+
         .. note::
 
           This method can raise the KeyError exception if the pin_mode()
           method was not called first on the pins used in this method.
 
-        :param value: The value to write to the SPI port.
-        :type value: str
+        :param values: The values to write to the SPI port.
+        :type values: int, list, tuple, array, bytes, bytearray, or
+                      memoryview
         """
-        if not isinstance(values, bytearray):
-            items = values
+        if not isinstance(values, (bytearray, bytes, memoryview)):
+            values = pack_be16(values)
 
-            if isinstance(items, (int, float)):
-                items = round(items)
-                items = [items]
+        self.digital_write(self._cs, self.LOW)
 
-            values = bytearray()
+        try:
+            self._spi.write(values)
+        except Exception as e:
+            raise CompatibilityException("Error writing: {}".format(str(e)))
+        finally:
+            if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
 
-            for item in items:
-                values.append(item >> 8)
-                values.append(item & 0xFF)
+    def spi_write_segments(self, rs, segments):
+        """
+        Write a list of command and data segments to the SPI port with
+        one chip select.
 
+        :param rs: The RS (data/command) pin.
+        :type rs: int
+        :param segments: A list of (is_data, bytearray) tuples.
+        :type segments: list
+        """
         self.digital_write(self._cs, self.LOW)
 
         try:
-            self._spi.write(values)
+            for is_data, values in segments:
+                self.digital_write(rs, self.HIGH if is_data else self.LOW)
+                self._spi.write(values)
         except Exception as e:
             raise CompatibilityException("Error writing: {}".format(str(e)))
         finally:
-            self.digital_write(self._cs, self.HIGH)
+            if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
 
     def _need_chunking(self, array):
         array_len = len(array)
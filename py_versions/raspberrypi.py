@@ -5,11 +5,303 @@ py_versions/raspberrypi.py
 The Raspberry Pi Linux compatibility file.
 """
 
+import ctypes
+import fcntl
+import threading
+
 from RPi import GPIO
 from spidev import SpiDev
 from time import sleep
 
-from utils.common import Boards, CompatibilityException
+from utils.common import Boards, CompatibilityException, pack_be16
+from utils.spi_capture import SpiCapture
+
+
+class _SpiIocTransfer(ctypes.Structure):
+    """
+    The Linux struct spi_ioc_transfer from <linux/spi/spidev.h>.
+    """
+    _fields_ = [
+        ('tx_buf', ctypes.c_uint64),
+        ('rx_buf', ctypes.c_uint64),
+        ('len', ctypes.c_uint32),
+        ('speed_hz', ctypes.c_uint32),
+        ('delay_usecs', ctypes.c_uint16),
+        ('bits_per_word', ctypes.c_uint8),
+        ('cs_change', ctypes.c_uint8),
+        ('tx_nbits', ctypes.c_uint8),
+        ('rx_nbits', ctypes.c_uint8),
+        ('word_delay_usecs', ctypes.c_uint8),
+        ('pad', ctypes.c_uint8),
+        ]
+
+
+class SpiIoctl:
+    """
+    Write many buffers to a spidev device with one SPI_IOC_MESSAGE ioctl.
+
+    The spidev driver limits the total size of one message to its bufsiz
+    module parameter (4096 by default), buffers are split and packed into
+    as few messages as that allows. Raising the limit with
+    spidev.bufsiz=65536 on the kernel command line lets a whole frame
+    go in one system call.
+    """
+    BUFSIZ_PATH = "/sys/module/spidev/parameters/bufsiz"
+    DEF_BUFSIZ = 4096
+    # The ioctl size field is 14 bits.
+    MAX_TRANSFERS = ((1 << 14) - 1) // ctypes.sizeof(_SpiIocTransfer)
+
+    def __init__(self, fd, speed_hz, *, bufsiz=None, ioctl=fcntl.ioctl):
+        """
+        Constructor
+
+        :param fd: The file descriptor of the open spidev device.
+        :type fd: int
+        :param speed_hz: The SPI clock frequency.
+        :type speed_hz: int
+        :param bufsiz: The spidev bufsiz, if None it is read from the
+                       spidev module parameters.
+        :type bufsiz: int
+        :param ioctl: The function used to make the ioctl call.
+        :type ioctl: function
+        """
+        self.fd = fd
+        self.speed_hz = speed_hz
+        self.bufsiz = bufsiz if bufsiz is not None else self.__read_bufsiz()
+        self._ioctl = ioctl
+        self.calls = 0
+
+    @staticmethod
+    def spi_ioc_message(num):
+        """
+        Get the SPI_IOC_MESSAGE(num) ioctl request number.
+
+        :param num: The number of transfers in the message.
+        :type num: int
+        :return: The request number.
+        :rtype: int
+        """
+        size = num * ctypes.sizeof(_SpiIocTransfer)
+        # _IOW('k', 0, char[size])
+        return (1 << 30) | (size << 16) | (ord('k') << 8) | 0
+
+    def transfer(self, buffers, read=False, keep_cs=False):
+        """
+        Write the buffers using as few ioctl calls as possible.
+
+        .. note::
+
+          When the buffers need more than one message cs_change is set on
+          the last transfer of each message, this keeps the hardware chip
+          select asserted between the messages.
+
+        :param buffers: A list of bytearray or memoryview objects.
+        :type buffers: list
+        :param read: If True return the data read while writing.
+        :type read: bool
+        :param keep_cs: If True the hardware chip select is also kept
+                        asserted after the last message.
+        :type keep_cs: bool
+        :return: The data read if read is True else None.
+        :rtype: bytearray or None
+        """
+        result = bytearray() if read else None
+        message = []
+        total = 0
+
+        for buf in buffers:
+            buf = memoryview(buf)
+
+            for idx in range(0, len(buf), self.bufsiz):
+                chunk = buf[idx:idx + self.bufsiz]
+
+                if (total + len(chunk) > self.bufsiz
+                    or len(message) >= self.MAX_TRANSFERS):
+                    self.__send(message, result, True)
+                    message = []
+                    total = 0
+
+                message.append(chunk)
+                total += len(chunk)
+
+        if message:
+            self.__send(message, result, keep_cs)
+
+        return result
+
+    def __send(self, message, result, cs_change):
+        xfers = (_SpiIocTransfer * len(message))()
+        keep = []
+
+        for xfer, chunk in zip(xfers, message):
+            tx_type = ctypes.c_ubyte * len(chunk)
+
+            # Use the buffer in place when it is writable, this saves a copy.
+            if chunk.readonly:
+                tx = tx_type.from_buffer_copy(chunk)
+            else:
+                tx = tx_type.from_buffer(chunk)
+
+            keep.append(tx)
+            xfer.tx_buf = ctypes.addressof(tx)
+            xfer.len = len(chunk)
+            xfer.speed_hz = self.speed_hz
+            xfer.bits_per_word = 8
+
+            if result is not None:
+                rx = (ctypes.c_ubyte * len(chunk))()
+                keep.append(rx)
+                xfer.rx_buf = ctypes.addressof(rx)
+
+        xfers[len(message) - 1].cs_change = 1 if cs_change else 0
+
+        try:
+            self._ioctl(self.fd, self.spi_ioc_message(len(message)), xfers)
+        except OSError as e:
+            raise CompatibilityException(f"Error writing: {e}")
+
+        self.calls += 1
+
+        if result is not None:
+            for rx in keep[1::2]:
+                result.extend(bytes(rx))
+
+    def __read_bufsiz(self):
+        try:
+            with open(self.BUFSIZ_PATH, 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError): # pragma: no cover
+            return self.DEF_BUFSIZ
+
+
+class SpiWriter:
+    """
+    Send SPI writes from a background thread.
+
+    Writes are copied into one of two buffers, while the thread sends one
+    buffer the next writes are collected in the other. An idle thread
+    picks up new writes at once, a busy one sends everything collected
+    when it gets back to it, so small writes are batched only under load.
+    Each command/data segment keeps its RS state, so the order of the RS
+    changes is the order they were written in.
+    """
+    BUFFER_SIZE = 4096
+
+    def __init__(self, send, size=BUFFER_SIZE):
+        """
+        Constructor
+
+        :param send: A callable taking a buffer and a list of (is_data,
+                     start, end) segments in that buffer.
+        :type send: callable
+        :param size: The size in bytes of each buffer.
+        :type size: int
+        """
+        self._send = send
+        self._size = size
+        self._buffers = [bytearray(size), bytearray(size)]
+        self._fill = 0
+        self._used = 0
+        self._segments = []
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self.__run, name='SpiWriter',
+                                        daemon=True)
+        self._thread.start()
+
+    def write(self, is_data, values):
+        """
+        Queue values to be written, this only blocks when both buffers
+        are full.
+
+        :param is_data: True for data, False for a command.
+        :type is_data: bool
+        :param values: The bytes to write.
+        :type values: bytes, bytearray, or memoryview
+        :raises CompatibilityException: If an earlier write failed.
+        """
+        view = memoryview(values).cast('B')
+        pos = 0
+
+        with self._cond:
+            self.__check()
+
+            while pos < len(view):
+                while self._used >= self._size:
+                    self._cond.wait()
+                    self.__check()
+
+                start = self._used
+                size = min(self._size - start, len(view) - pos)
+                end = start + size
+                self._buffers[self._fill][start:end] = view[pos:pos + size]
+                pos += size
+                self._used = end
+
+                if self._segments and self._segments[-1][0] == is_data:
+                    self._segments[-1][2] = end
+                else:
+                    self._segments.append([is_data, start, end])
+
+                self._cond.notify_all()
+
+    def wait(self):
+        """
+        Block until everything written has been sent.
+
+        :raises CompatibilityException: If a write failed.
+        """
+        with self._cond:
+            while self._used or self._busy:
+                self._cond.wait()
+
+            self.__check()
+
+    def close(self):
+        """
+        Send everything written then stop the thread.
+        """
+        try:
+            self.wait()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+            self._thread.join()
+
+    def __check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise CompatibilityException(f"Error writing: {error}")
+
+    def __run(self):
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+                while not self._used and not self._closed:
+                    self._cond.wait()
+
+                if not self._used:
+                    return
+
+                buf = self._buffers[self._fill]
+                segments = self._segments
+                self._fill ^= 1
+                self._used = 0
+                self._segments = []
+                self._busy = True
+                self._cond.notify_all()
+
+            try:
+                self._send(buf, segments)
+            except Exception as e:
+                with self._cond:
+                    self._error = e
 
 
 class PiVersion:
@@ -27,6 +319,9 @@ class PiVersion:
     INPUT_PULLOFF = GPIO.PUD_OFF
     _SPI_MODE = 0
     _DEF_PWM_FREQ = 25500
+    # The size of the capture used when testing, a full screen is 77440
+    # bytes.
+    TEST_CAPTURE_SIZE = 1 << 22
 
     # To get second port add "dtoverlay=spi1-3cs" to "/boot/config.txt".
     _SPI_HARDWARE_PORTS = {
@@ -48,15 +343,24 @@ class PiVersion:
         GPIO.setmode(mode)
         GPIO.setwarnings(False)
         self._spi = None
+        self._ioctl = None
+        self.__spi_ioctl = False
+        self.__spi_writer = False
+        self._writer = None
+        self.__rs_level = None
         self.__pwm_pin_states = {}
+        self._pin_levels = {}
+        self._cs_hold = False
+        self._hardware_cs = False
+        self._capture = None
+        self.gpio_stats = {'gpio_writes': 0, 'gpio_writes_saved': 0}
 
-    def __setup_testing(self):
-        if self.TESTING:
-            self.__write = self._spi.xfer3
-            self.__read = self.__test_read
-        else: # pragma: no cover
-            self.__write = self._spi.writebytes2
-            self.__read = self.__dummy_read
+    def __setup_write(self):
+        self.__write = self._spi.writebytes2
+
+        # Only the capture depends on testing.
+        if self.TESTING and self._capture is None:
+            self._capture = SpiCapture(self.TEST_CAPTURE_SIZE)
 
     def pin_mode(self, pin, direction, *, pull=INPUT_PULLOFF, default=None):
         """
@@ -72,30 +376,71 @@ class PiVersion:
         :param default: Set a default value of the pin.
         :type default: int
         """
+        if self._hardware_cs and pin == self._cs:
+            return
+
+        self.spi_flush()
         GPIO.setup(pin, direction, pull_up_down=pull)
+        self._pin_levels.pop(pin, None)
 
         if direction == self.OUTPUT and default is not None:
             GPIO.output(pin, default)
+            self._pin_levels[pin] = default
 
     def digital_write(self, pin, high_low):
         """
         Set the given pin either high or low.
 
+        .. note::
+
+          The last level written to each pin is kept, writing the same
+          level again is skipped and counted in gpio_stats. When the
+          writer thread is being used the rs level is sent with the next
+          write, the cs pin is left to the writer thread, and writing any
+          other pin first waits for the queued writes to be sent.
+
         :param pin: The pin to set.
         :type pin: int
         :param high_low: Set HIGH (True) or LOW (False).
         :type high_low: bool
         """
-        GPIO.output(pin, high_low)
+        if self._hardware_cs and pin == self._cs:
+            return
+
+        if self._writer is not None:
+            if pin == self._rs:
+                self.__rs_level = high_low
+                return
+            elif pin == self._cs:
+                return
+
+            self._writer.wait()
+
+        self.__gpio_write(pin, high_low)
+
+    def __gpio_write(self, pin, high_low):
+        if self._pin_levels.get(pin) == high_low:
+            self.gpio_stats['gpio_writes_saved'] += 1
+        else:
+            GPIO.output(pin, high_low)
+            self._pin_levels[pin] = high_low
+            self.gpio_stats['gpio_writes'] += 1
 
     def pin_cleanup(self):
         """
         To be run after this API is no longer to be used.
         """
+        # A display object also forgets its SPI session.
+        if hasattr(self, '_close_session'):
+            self._close_session()
+        else:
+            self.spi_end_transaction()
+
         for obj in self.__pwm_pin_states.values():
             obj.stop()
 
         GPIO.cleanup()
+        self._pin_levels.clear()
 
     def delay(self, ms):
         """
@@ -104,6 +449,7 @@ class PiVersion:
         :param ms: The value in milliseconds.
         :type ms: int
         """
+        self.spi_flush()
         sleep(ms/1000) # Convert to floating point.
 
     def _spi_port_device(self):
@@ -150,15 +496,168 @@ class PiVersion:
                 self.spi_end_transaction()
                 raise CompatibilityException(e)
             else:
-                self.__setup_testing()
+                self.__setup_write()
+
+                if self.__spi_ioctl:
+                    self._ioctl = SpiIoctl(self._spi.fileno(),
+                                           self.spi_frequency)
+
+                if self.__spi_writer:
+                    self.__start_writer()
 
     def spi_end_transaction(self):
         """
         Destroy the SPI connection.
         """
         if self._spi is not None:
+            self.__stop_writer()
             self._spi.close()
             self._spi = None
+            self._ioctl = None
+
+    @property
+    def spi_ioctl(self):
+        """
+        Check if the multi-segment ioctl backend is being used.
+
+        :return: True if being used else False.
+        :rtype: bool
+        """
+        return self.__spi_ioctl
+
+    @spi_ioctl.setter
+    def spi_ioctl(self, flag):
+        """
+        Use SPI_IOC_MESSAGE ioctl calls instead of one spidev call for
+        each write. Segments with the same RS state are sent in one call.
+
+        :param flag: True use the ioctl backend, False do not.
+        :type flag: bool
+        """
+        self.__spi_ioctl = bool(flag)
+
+        if not flag:
+            self._ioctl = None
+        elif self._spi is not None and self._ioctl is None:
+            self._ioctl = SpiIoctl(self._spi.fileno(), self.spi_frequency)
+
+    @property
+    def spi_capture(self):
+        """
+        Get the capture of the transfers written to the SPI port.
+
+        :return: The capture if turned on else None.
+        :rtype: SpiCapture
+        """
+        return self._capture
+
+    @spi_capture.setter
+    def spi_capture(self, flag):
+        """
+        Keep a binary capture of every transfer written to the SPI port,
+        see utils/spi_capture.py. The capture is always on when testing.
+
+        .. note::
+
+          When turned on spi_write() returns the values written as a list
+          of 16-bit values.
+
+        :param flag: True keep a capture of SpiCapture.DEF_SIZE bytes,
+                     an int keep a capture of that many bytes, False stop
+                     capturing.
+        :type flag: bool or int
+        """
+        if flag is True:
+            self._capture = SpiCapture()
+        elif flag:
+            self._capture = SpiCapture(flag)
+        else:
+            self._capture = None
+
+    @property
+    def spi_writer(self):
+        """
+        Check if the writer thread is being used.
+
+        :return: True if being used else False.
+        :rtype: bool
+        """
+        return self.__spi_writer
+
+    @spi_writer.setter
+    def spi_writer(self, flag):
+        """
+        Send the SPI writes from a background thread, so drawing the next
+        area overlaps with sending the last one. With the writer thread
+        spi_write() returns as soon as the values are queued, use
+        spi_flush() to wait for them to be sent.
+
+        :param flag: True use the writer thread, False do not.
+        :type flag: bool
+        """
+        self.__spi_writer = bool(flag)
+
+        if not flag:
+            self.__stop_writer()
+        elif self._spi is not None and self._writer is None:
+            self.__start_writer()
+
+    def spi_flush(self):
+        """
+        Wait until all the writes queued on the writer thread have been
+        sent, this does nothing if the writer thread is not being used.
+
+        :raises CompatibilityException: If a queued write failed.
+        """
+        if self._writer is not None:
+            self._writer.wait()
+
+    def __start_writer(self):
+        self.__rs_level = self._pin_levels.get(self._rs, self.HIGH)
+        self._writer = SpiWriter(self.__send_buffer)
+
+    def __stop_writer(self):
+        writer, self._writer = self._writer, None
+
+        if writer is not None:
+            writer.close()
+            # Leave the rs pin as the caller last set it.
+            self.__gpio_write(self._rs, self.__rs_level)
+
+    def __send_buffer(self, buf, segments):
+        view = memoryview(buf)
+        self.__write_segments(self._rs, [
+            (is_data, view[start:end]) for is_data, start, end in segments],
+            hold=False)
+
+    @property
+    def hardware_cs(self):
+        """
+        Check if the hardware chip select is being used.
+
+        :return: True if the kernel drives the chip select else False.
+        :rtype: bool
+        """
+        return self._hardware_cs
+
+    @hardware_cs.setter
+    def hardware_cs(self, flag):
+        """
+        Let the spidev driver drive the chip select. The cs pin is then
+        never set up or written as a GPIO pin, which saves two GPIO
+        writes for every SPI write.
+
+        .. note::
+
+          This must be set before begin() is called, once the cs pin has
+          been set up as a GPIO output the SPI controller no longer
+          drives it.
+
+        :param flag: True use the hardware chip select, False toggle the
+                     cs pin in software.
+        :type flag: bool
+        """
+        self._hardware_cs = bool(flag)
 
     @property
     def is_spi_connected(self):
@@ -174,56 +673,100 @@ class PiVersion:
         """
         Write to the SPI port the given values.
 
-        :param values: The values to write.
-        :type values: int, list, or tuple
-        """
-        if not isinstance(values, bytearray):
-            items = values
+        .. note::
 
-            if isinstance(items, (int, float)):
-                items = round(items)
-                items = [items]
+          Any bytes like object is written as is, all other values are
+          packed as 16-bit values high byte first.
 
-            values = bytearray()
+        :param values: The values to write.
+        :type values: int, list, tuple, array, bytes, bytearray, or
+                      memoryview
+        """
+        if not isinstance(values, (bytearray, bytes, memoryview)):
+            values = pack_be16(values)
 
-            for item in items:
-                values.append(item >> 8)
-                values.append(item & 0xFF)
+        if self._writer is not None:
+            self._writer.write(bool(self.__rs_level), values)
+            return None
 
-        result = None
         self.digital_write(self._cs, self.LOW)
 
         try:
-            result = self.__write(values)
+            if self._ioctl is not None:
+                self._ioctl.transfer([values])
+            else:
+                self.__write(values)
         except Exception as e: # pragma: no cover
             raise CompatibilityException(f"Error writing: {e}")
         else:
-            return self.__read(result)
+            if self._capture is not None:
+                self._capture.write(
+                    self._pin_levels.get(self._rs) == self.HIGH, values)
+                return SpiCapture.values(values)
+
+            return None
         finally:
-            self.digital_write(self._cs, self.HIGH)
+            if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
 
-    def __dummy_read(self, result): # pragma: no cover
-        pass
+    def spi_write_segments(self, rs, segments):
+        """
+        Write a list of command and data segments to the SPI port with
+        one chip select.
 
-    def __test_read(self, result):
-        data = []
+        :param rs: The RS (data/command) pin.
+        :type rs: int
+        :param segments: A list of (is_data, bytearray) tuples.
+        :type segments: list
+        """
+        if self._writer is not None:
+            for is_data, values in segments:
+                self._writer.write(is_data, values)
 
-        for idx in range(0, len(result), 2):
-            high, low = result[idx: idx + 2]
-            data.append((high << 8) | low)
+            if segments:
+                self.__rs_level = self.HIGH if segments[-1][0] else self.LOW
+        else:
+            self.__write_segments(rs, segments, self._cs_hold)
 
-        if data:
-            dt_name = '   Data' if GPIO.input(self._rs) else 'Command'
-            result = ','.join(str(v) for v in data)
-            result = f'{dt_name}: {result}\n'
+    def __write_segments(self, rs, segments, hold):
+        self.__gpio_cs(self.LOW)
 
-            if not hasattr(self, '_test_spi_buff'):
-                from io import StringIO
-                self._test_spi_buff = StringIO()
+        try:
+            if self._ioctl is not None:
+                # Group the segments by RS state, one ioctl for each group.
+                groups = []
+
+                for is_data, values in segments:
+                    if groups and groups[-1][0] == is_data:
+                        groups[-1][1].append(values)
+                    else:
+                        groups.append((is_data, [values]))
+
+                # The hardware chip select is kept asserted until the last
+                # group has been sent.
+                last = len(groups) - 1
+
+                for idx, (is_data, buffers) in enumerate(groups):
+                    self.__gpio_write(rs, self.HIGH if is_data else self.LOW)
+                    keep_cs = self._hardware_cs and idx < last
+                    self._ioctl.transfer(buffers, keep_cs=keep_cs)
+
+                    if self._capture is not None:
+                        self._capture.write_buffers(is_data, buffers)
+            else:
+                for is_data, values in segments:
+                    self.__gpio_write(rs, self.HIGH if is_data else self.LOW)
+                    self.__write(values)
 
-            self._test_spi_buff.write(result)
+                    if self._capture is not None:
+                        self._capture.write(is_data, values)
+        except Exception as e: # pragma: no cover
+            raise CompatibilityException(f"Error writing: {e}")
+        finally:
+            if not hold: self.__gpio_cs(self.HIGH)
 
-        return data
+    def __gpio_cs(self, high_low):
+        if not self._hardware_cs:
+            self.__gpio_write(self._cs, high_low)
 
     def setup_pwm(self, pin, brightness):
         """
@@ -0,0 +1,608 @@
+# -*- coding: utf-8 -*-
+"""
+py_versions/simulator.py
+
+The simulator compatibility file, no hardware or GPIO libraries are
+needed. Set TFT_SIMULATOR=1 in the environment to use it.
+
+The SPI writes are decoded the same way the display controller would
+decode them and the pixels are put in a model of the display's GRAM.
+Delays advance a virtual clock instead of sleeping.
+"""
+
+import struct
+import zlib
+
+from utils.common import FrameBuffer, pack_be16
+
+
+class VirtualClock:
+    """
+    A clock that only moves when it is told to.
+    """
+
+    def __init__(self):
+        self.ms = 0.0
+
+    def advance(self, ms):
+        """
+        Move the clock forward.
+
+        :param ms: The time in milliseconds.
+        :type ms: float
+        """
+        self.ms += ms
+
+
+class ILI9225Decoder:
+    """
+    Decode the ILI9225 register protocol, 16-bit register indexes are
+    written with RS low and 16-bit values with RS high.
+    """
+    WIDTH = 176
+    HEIGHT = 220
+    REG_ENTRY_MODE = 0x03
+    REG_RAM_ADDR_SET1 = 0x20
+    REG_RAM_ADDR_SET2 = 0x21
+    REG_GRAM_DATA = 0x22
+    REG_VERTICAL_SCROLL_CTRL1 = 0x31
+    REG_VERTICAL_SCROLL_CTRL2 = 0x32
+    REG_VERTICAL_SCROLL_CTRL3 = 0x33
+    REG_HORIZONTAL_WINDOW_ADDR1 = 0x36
+    REG_HORIZONTAL_WINDOW_ADDR2 = 0x37
+    REG_VERTICAL_WINDOW_ADDR1 = 0x38
+    REG_VERTICAL_WINDOW_ADDR2 = 0x39
+
+    def __init__(self, gram):
+        """
+        Constructor
+
+        :param gram: The GRAM model to write the pixels to.
+        :type gram: FrameBuffer
+        """
+        self.gram = gram
+        self.registers = {self.REG_ENTRY_MODE: 0x1030,
+                          self.REG_HORIZONTAL_WINDOW_ADDR1: self.WIDTH - 1,
+                          self.REG_VERTICAL_WINDOW_ADDR1: self.HEIGHT - 1,
+                          self.REG_VERTICAL_SCROLL_CTRL1: self.HEIGHT - 1}
+        self.index = None
+        self.x = 0
+        self.y = 0
+        self.commands = 0
+        self.pixels = 0
+        self._partial = bytearray()
+
+    def feed(self, is_data, values):
+        """
+        Decode bytes written to the display.
+
+        :param is_data: The RS state, True for data and False for commands.
+        :type is_data: bool
+        :param values: The bytes written.
+        :type values: bytes, bytearray, or memoryview
+        """
+        if self._partial:
+            values = self._partial + values
+            self._partial = bytearray()
+
+        if len(values) & 1:
+            self._partial = bytearray(values[-1:])
+            values = memoryview(values)[:-1]
+
+        if not is_data:
+            for idx in range(0, len(values), 2):
+                self.index = (values[idx] << 8) | values[idx + 1]
+                self.commands += 1
+        elif self.index == self.REG_GRAM_DATA:
+            self.__write_gram(memoryview(values))
+        else:
+            for idx in range(0, len(values), 2):
+                self.__write_register((values[idx] << 8) | values[idx + 1])
+
+    def memory_row(self, y):
+        """
+        Get the GRAM row shown on a row of the display, the rows from the
+        scroll start to the scroll end address are moved by the scroll
+        step.
+
+        :param y: The row of the display.
+        :type y: int
+        :return: The GRAM row.
+        :rtype: int
+        """
+        regs = self.registers
+        step = regs.get(self.REG_VERTICAL_SCROLL_CTRL3, 0)
+        start = regs.get(self.REG_VERTICAL_SCROLL_CTRL2, 0)
+        end = regs.get(self.REG_VERTICAL_SCROLL_CTRL1, self.HEIGHT - 1)
+
+        if step and start <= y <= end:
+            y = start + (y - start + step) % (end - start + 1)
+
+        return y
+
+    def __write_register(self, value):
+        self.registers[self.index] = value
+
+        if self.index == self.REG_RAM_ADDR_SET1:
+            self.x = value
+        elif self.index == self.REG_RAM_ADDR_SET2:
+            self.y = value
+
+    def __window(self):
+        regs = self.registers
+        x1 = min(regs.get(self.REG_HORIZONTAL_WINDOW_ADDR1, 0),
+                 self.WIDTH - 1)
+        x0 = min(regs.get(self.REG_HORIZONTAL_WINDOW_ADDR2, 0), x1)
+        y1 = min(regs.get(self.REG_VERTICAL_WINDOW_ADDR1, 0),
+                 self.HEIGHT - 1)
+        y0 = min(regs.get(self.REG_VERTICAL_WINDOW_ADDR2, 0), y1)
+        return x0, y0, x1, y1
+
+    def __write_gram(self, data):
+        """
+        Write pixels from the address counter on, the runs along the
+        primary direction are copied with one slice assignment.
+        """
+        x0, y0, x1, y1 = self.__window()
+        mode = self.registers.get(self.REG_ENTRY_MODE, 0)
+        dx = 1 if mode & 0x10 else -1
+        dy = 1 if mode & 0x20 else -1
+        vertical = mode & 0x08
+        buf = self.gram.buffer
+        stride = self.gram.width * 2
+        x = min(max(self.x, x0), x1)
+        y = min(max(self.y, y0), y1)
+        pos = 0
+        count = len(data) // 2
+
+        while pos < count:
+            if vertical:
+                run = (y1 - y + 1) if dy > 0 else (y - y0 + 1)
+                step = stride * dy
+            else:
+                run = (x1 - x + 1) if dx > 0 else (x - x0 + 1)
+                step = 2 * dx
+
+            run = min(run, count - pos)
+            start = y * stride + x * 2
+            end = start + step * run
+            src = data[pos * 2:(pos + run) * 2]
+            buf[start:end if end >= 0 else None:step] = src[0::2]
+            start += 1
+            end += 1
+            buf[start:end if end >= 0 else None:step] = src[1::2]
+            pos += run
+
+            # Move the address counter, wrapping inside the window.
+            if vertical:
+                y += dy * run
+
+                if not y0 <= y <= y1:
+                    y = y0 if dy > 0 else y1
+                    x += dx
+                    if not x0 <= x <= x1: x = x0 if dx > 0 else x1
+            else:
+                x += dx * run
+
+                if not x0 <= x <= x1:
+                    x = x0 if dx > 0 else x1
+                    y += dy
+                    if not y0 <= y <= y1: y = y0 if dy > 0 else y1
+
+        self.x = x
+        self.y = y
+        self.pixels += count
+
+
+class ILI9341Decoder:
+    """
+    Decode the ILI9341 command protocol, 8-bit commands are written with
+    RS (DC) low and their parameters with RS high. Pixel data is 16-bit
+    high byte first.
+    """
+    WIDTH = 240
+    HEIGHT = 320
+    CMD_CASET = 0x2A
+    CMD_PASET = 0x2B
+    CMD_RAMWR = 0x2C
+    CMD_VSCRDEF = 0x33
+    CMD_MADCTL = 0x36
+    CMD_VSCRSADD = 0x37
+    CMD_RAMWRC = 0x3C
+    # MADCTL bits
+    MY = 0x80
+    MX = 0x40
+    MV = 0x20
+
+    def __init__(self, gram, mirror_x=False):
+        """
+        Constructor
+
+        :param gram: The GRAM model to write the pixels to.
+        :type gram: FrameBuffer
+        :param mirror_x: True if the panel is wired with its columns
+                         reversed, MADCTL MX then shows columns in order.
+        :type mirror_x: bool
+        """
+        self.gram = gram
+        self.mirror_x = mirror_x
+        self.command = None
+        self.params = bytearray()
+        self.madctl = 0
+        # The fixed top, scrolling, and fixed bottom rows.
+        self.scroll_area = (0, self.HEIGHT, 0)
+        self.scroll_start = 0
+        self.columns = (0, self.WIDTH - 1)
+        self.pages = (0, self.HEIGHT - 1)
+        self.col = 0
+        self.page = 0
+        self.commands = 0
+        self.pixels = 0
+        self._partial = bytearray()
+
+    def feed(self, is_data, values):
+        """
+        Decode bytes written to the display.
+
+        :param is_data: The RS state, True for data and False for commands.
+        :type is_data: bool
+        :param values: The bytes written.
+        :type values: bytes, bytearray, or memoryview
+        """
+        if not is_data:
+            for value in values:
+                self.__command(value)
+        elif self.command in (self.CMD_RAMWR, self.CMD_RAMWRC):
+            if self._partial:
+                values = self._partial + values
+                self._partial = bytearray()
+
+            if len(values) & 1:
+                self._partial = bytearray(values[-1:])
+                values = memoryview(values)[:-1]
+
+            for idx in range(0, len(values), 2):
+                self.__write_pixel((values[idx] << 8) | values[idx + 1])
+        else:
+            self.params += values
+            self.__parameters()
+
+    def __command(self, value):
+        self.command = value
+        self.params = bytearray()
+        self._partial = bytearray()
+        self.commands += 1
+
+        if value == self.CMD_RAMWR:
+            self.col = self.columns[0]
+            self.page = self.pages[0]
+
+    def __parameters(self):
+        params = self.params
+
+        if self.command == self.CMD_MADCTL and len(params) >= 1:
+            self.madctl = params[0]
+        elif self.command == self.CMD_VSCRDEF and len(params) >= 6:
+            self.scroll_area = tuple((params[idx] << 8) | params[idx + 1]
+                                     for idx in range(0, 6, 2))
+        elif self.command == self.CMD_VSCRSADD and len(params) >= 2:
+            self.scroll_start = (params[0] << 8) | params[1]
+        elif self.command in (self.CMD_CASET, self.CMD_PASET) and len(
+            params) >= 4:
+            start = (params[0] << 8) | params[1]
+            end = (params[2] << 8) | params[3]
+
+            if self.command == self.CMD_CASET:
+                self.columns = (start, end)
+            else:
+                self.pages = (start, end)
+
+    def memory_row(self, y):
+        """
+        Get the memory row shown on a row of the display, the scroll area
+        starts with the row at the scroll start address.
+
+        :param y: The row of the display.
+        :type y: int
+        :return: The memory row.
+        :rtype: int
+        """
+        top, rows, bottom = self.scroll_area
+
+        if rows and top <= y < top + rows:
+            y = top + (y - top + self.scroll_start - top) % rows
+
+        return y
+
+    def __write_pixel(self, color):
+        x, y = self.col, self.page
+
+        # The address counters are in the orientation set by MADCTL.
+        if self.madctl & self.MV: x, y = y, x
+        if bool(self.madctl & self.MX) != self.mirror_x:
+            x = self.WIDTH - 1 - x
+        if self.madctl & self.MY: y = self.HEIGHT - 1 - y
+
+        if 0 <= x < self.WIDTH and 0 <= y < self.HEIGHT:
+            self.gram.set_pixel(x, y, color)
+
+        self.pixels += 1
+        self.col += 1
+
+        if self.col > self.columns[1]:
+            self.col = self.columns[0]
+            self.page += 1
+            if self.page > self.pages[1]: self.page = self.pages[0]
+
+
+class PiVersion:
+    """
+    This class implements the simulator version of the low level
+    functionality.
+    """
+    PLATFORM = "Simulator"
+    HIGH = 1
+    LOW = 0
+    INPUT = 1
+    OUTPUT = 0
+    INPUT_PULLUP = 22
+    INPUT_PULLDOWN = 21
+    INPUT_PULLOFF = 20
+    _SPI_MODE = 0
+    _DEF_PWM_FREQ = 24000
+
+    def __init__(self, mode=None):
+        """
+        Constructor
+
+        :param mode: Not used on the simulator.
+        :type mode: int
+        """
+        self._spi = None
+        self._cs_hold = False
+        self._pin_levels = {}
+        self.gpio_stats = {'gpio_writes': 0, 'gpio_writes_saved': 0}
+        self.spi_stats = {'spi_bytes': 0, 'spi_writes': 0,
+                          'spi_transactions': 0}
+        self.clock = VirtualClock()
+        self.duty_cycles = {}
+
+        if hasattr(self, 'CMD_GRAM_DATA_REG'):
+            self.gram = FrameBuffer(ILI9225Decoder.WIDTH,
+                                    ILI9225Decoder.HEIGHT)
+            self.decoder = ILI9225Decoder(self.gram)
+        else:
+            # The ILI9341 modules in use have the panel mirrored in x.
+            self.gram = FrameBuffer(ILI9341Decoder.WIDTH,
+                                    ILI9341Decoder.HEIGHT)
+            self.decoder = ILI9341Decoder(self.gram, mirror_x=True)
+
+    def pin_mode(self, pin, direction, *, pull=INPUT_PULLOFF, default=None):
+        """
+        Set a pin, direction, pull, mode, and default.
+
+        :param pin: The pin identifier.
+        :type pin: int
+        :param direction: The direction INPUT or OUTPUT.
+        :type direction: int
+        :param pull: Not used on the simulator.
+        :type pull: int
+        :param default: Set a default value of the pin.
+        :type default: int
+        """
+        self._pin_levels.pop(pin, None)
+
+        if direction == self.OUTPUT and default is not None:
+            self._pin_levels[pin] = default
+
+    def digital_write(self, pin, high_low):
+        """
+        Set the given pin either high or low.
+
+        .. note::
+
+          The last level written to each pin is kept, writing the same
+          level again is skipped and counted in gpio_stats. Each time the
+          cs pin goes low is counted as an SPI transaction.
+
+        :param pin: The pin to set.
+        :type pin: int
+        :param high_low: Set HIGH (True) or LOW (False).
+        :type high_low: bool
+        """
+        if self._pin_levels.get(pin) == high_low:
+            self.gpio_stats['gpio_writes_saved'] += 1
+        else:
+            self._pin_levels[pin] = high_low
+            self.gpio_stats['gpio_writes'] += 1
+
+            if pin == self._cs and high_low == self.LOW:
+                self.spi_stats['spi_transactions'] += 1
+
+    def pin_cleanup(self):
+        """
+        To be run after this API is no longer to be used.
+        """
+        # A display object also forgets its SPI session.
+        if hasattr(self, '_close_session'):
+            self._close_session()
+        else:
+            self.spi_end_transaction()
+        self._pin_levels.clear()
+
+    def delay(self, ms):
+        """
+        Advance the virtual clock.
+
+        :param ms: The value in milliseconds.
+        :type ms: int
+        """
+        self.clock.advance(ms)
+
+    def _spi_port_device(self):
+        """
+        Any port and cs pin can be used on the simulator.
+        """
+        self._device = 0
+
+    def spi_start_transaction(self):
+        """
+        Create the SPI connection.
+        """
+        self._spi = True
+
+    def spi_end_transaction(self):
+        """
+        Destroy the SPI connection.
+        """
+        self._spi = None
+
+    @property
+    def is_spi_connected(self):
+        """
+        Check if the SPI connection has been established.
+
+        :return: True if connected else False
+        :rtype: bool
+        """
+        return self._spi is not None
+
+    def spi_write(self, values):
+        """
+        Write to the SPI port the given values.
+
+        :param values: The values to write.
+        :type values: int, list, tuple, array, bytes, bytearray, or
+                      memoryview
+        """
+        if not isinstance(values, (bytearray, bytes, memoryview)):
+            values = pack_be16(values)
+
+        self.digital_write(self._cs, self.LOW)
+        self.__transfer(self._pin_levels.get(self._rs) == self.HIGH, values)
+        if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
+
+    def spi_write_segments(self, rs, segments):
+        """
+        Write a list of command and data segments to the SPI port with
+        one chip select.
+
+        :param rs: The RS (data/command) pin.
+        :type rs: int
+        :param segments: A list of (is_data, bytearray) tuples.
+        :type segments: list
+        """
+        self.digital_write(self._cs, self.LOW)
+
+        for is_data, values in segments:
+            self.digital_write(rs, self.HIGH if is_data else self.LOW)
+            self.__transfer(is_data, values)
+
+        if not self._cs_hold: self.digital_write(self._cs, self.HIGH)
+
+    def __transfer(self, is_data, values):
+        size = len(values)
+        self.spi_stats['spi_bytes'] += size
+        self.spi_stats['spi_writes'] += 1
+        self.decoder.feed(is_data, values)
+
+        try:
+            freq = self.spi_frequency
+        except Exception:
+            freq = 0
+
+        if freq:
+            self.clock.advance(size * 8000 / freq)
+
+    def reset_spi_stats(self):
+        """
+        Reset the SPI counters.
+        """
+        for key in self.spi_stats:
+            self.spi_stats[key] = 0
+
+    def get_pixel(self, x, y):
+        """
+        Get a pixel as it is shown on the display, when the display is
+        scrolled this is not the same row of the GRAM model.
+
+        :param x: Native x coordinate.
+        :type x: int
+        :param y: Native y coordinate.
+        :type y: int
+        :return: A 16-bit RGB color.
+        :rtype: int
+        """
+        return self.gram.get_pixel(x, self.decoder.memory_row(y))
+
+    def save_ppm(self, path):
+        """
+        Save what the display shows as a binary PPM image.
+
+        :param path: The file to write.
+        :type path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(f"P6\n{self.gram.width} {self.gram.height}\n255\n"
+                    .encode())
+            f.write(self.__rgb24_rows(b''))
+
+    def save_png(self, path):
+        """
+        Save what the display shows as a PNG image.
+
+        :param path: The file to write.
+        :type path: str
+        """
+        def chunk(kind, data):
+            return (struct.pack('>I', len(data)) + kind + data
+                    + struct.pack('>I', zlib.crc32(kind + data)))
+
+        header = struct.pack('>IIBBBBB', self.gram.width, self.gram.height,
+                             8, 2, 0, 0, 0)
+        data = zlib.compress(self.__rgb24_rows(b'\x00'))
+
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+                    + chunk(b'IDAT', data) + chunk(b'IEND', b''))
+
+    def __rgb24_rows(self, prefix):
+        buf = self.gram.buffer
+        width = self.gram.width
+        rows = bytearray()
+
+        for y in range(self.gram.height):
+            rows += prefix
+            row = self.decoder.memory_row(y)
+
+            for idx in range(row * width * 2, (row + 1) * width * 2, 2):
+                color = (buf[idx] << 8) | buf[idx + 1]
+                rows.append((color >> 11) * 255 // 31)
+                rows.append(((color >> 5) & 0x3F) * 255 // 63)
+                rows.append((color & 0x1F) * 255 // 31)
+
+        return bytes(rows)
+
+    def setup_pwm(self, pin, brightness):
+        """
+        Setup a PWM for controlling the back light LEDs brightness.
+
+        :param pin: The pin to setup the PWM on.
+        :type pin: int
+        :param brightness: Sets the duty cycle.
+        :type brightness: int
+        """
+        self.duty_cycles[pin] = self.__get_duty_cycle(brightness)
+
+    def change_led_duty_cycle(self, brightness):
+        """
+        Writes the value to the PWM pin.
+
+        :param brightness: The brightness value.
+        :type value: int
+        """
+        self.duty_cycles[self._led] = self.__get_duty_cycle(brightness)
+
+    def __get_duty_cycle(self, brightness):
+        return (brightness * 100 // (self.MAX_BRIGHTNESS + 1)
+                if brightness != 0 else 0)
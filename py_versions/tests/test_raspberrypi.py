@@ -6,12 +6,15 @@ import os
 import io
 import math
 import time
+import ctypes
 import unittest
+import threading
 
+from array import array
 from contextlib import redirect_stdout
 
 from utils.common import CommonMethods, Boards, CompatibilityException
-from py_versions.raspberrypi import PiVersion
+from py_versions.raspberrypi import PiVersion, SpiIoctl, SpiWriter
 
 from RPi import GPIO
 
@@ -147,6 +150,29 @@ class TestPiVersion(unittest.TestCase):
         msg = f"For pin {self.TEST_PIN} expected '{expect}' found '{found}'"
         self.assertEqual(expect, found, msg=msg)
 
+    #@unittest.skip("Temporary")
+    def test_digital_write_cache(self):
+        """
+        Test that writing the same level again is skipped and counted.
+        """
+        self._pyv.pin_mode(self.TEST_PIN, self._pyv.OUTPUT)
+        levels = (self._pyv.HIGH, self._pyv.HIGH, self._pyv.LOW,
+                  self._pyv.LOW, self._pyv.LOW)
+
+        for level in levels:
+            self._pyv.digital_write(self.TEST_PIN, level)
+
+        expect = {'gpio_writes': 2, 'gpio_writes_saved': 3}
+        found = self._pyv.gpio_stats
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        # Setting the pin mode forgets the level.
+        self._pyv.pin_mode(self.TEST_PIN, self._pyv.OUTPUT)
+        self._pyv.digital_write(self.TEST_PIN, self._pyv.LOW)
+        found = self._pyv.gpio_stats['gpio_writes']
+        msg = f"Expect '3' GPIO writes found '{found}'"
+        self.assertEqual(3, found, msg=msg)
+
     #@unittest.skip("Temporary")
     def test_delay(self):
         """
@@ -274,6 +300,173 @@ class TestPiVersion(unittest.TestCase):
         finally:
             self._pyv.spi_end_transaction()
 
+    #@unittest.skip("Temporary")
+    def test_spi_write_buffers(self):
+        """
+        Test that bytes like objects are written as is and that other
+        values are packed as 16-bit values.
+        """
+        self._pyv._spi_port_device()
+        expect = [0xAAAA, 0x1234, 0x00FF]
+        raw = bytes((0xAA, 0xAA, 0x12, 0x34, 0x00, 0xFF))
+        tests = (raw, bytearray(raw), memoryview(raw), array('H', expect),
+                 expect, tuple(expect))
+
+        try:
+            self._pyv.spi_start_transaction()
+
+            for values in tests:
+                found = self._pyv.spi_write(values)
+                msg = f"Expect {expect} found {found} for {values!r}"
+                self.assertEqual(expect, found, msg=msg)
+        finally:
+            self._pyv.spi_end_transaction()
+
+    #@unittest.skip("Temporary")
+    def test_spi_write_segments(self):
+        """
+        Test that command and data segments are written with the RS pin
+        set for each segment.
+        """
+        self._pyv._spi_port_device()
+        segments = [(False, bytearray((0x00, 0x36))),
+                    (True, bytearray((0x00, 0xAF, 0x12, 0x34))),
+                    (False, bytearray((0x00, 0x22)))]
+
+        try:
+            self._pyv.spi_start_transaction()
+            self._pyv.spi_write_segments(self.RS, segments)
+        finally:
+            self._pyv.spi_end_transaction()
+
+        expect = "Command: 54\n   Data: 175,4660\nCommand: 34\n"
+        found = self._pyv.spi_capture.text()
+        msg = f"Expect {expect!r} found {found!r}"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_spi_write_segments_ioctl(self):
+        """
+        Test that segments written with the ioctl backend are the same
+        as without it.
+        """
+        self._pyv._spi_port_device()
+        self._pyv.spi_ioctl = True
+        segments = [(False, bytearray((0x00, 0x36))),
+                    (True, bytearray((0x00, 0xAF))),
+                    (True, bytearray((0x12, 0x34))),
+                    (False, bytearray((0x00, 0x22)))]
+
+        try:
+            self._pyv.spi_start_transaction()
+            self._pyv.spi_write_segments(self.RS, segments)
+            found = self._pyv._ioctl.calls
+            msg = f"Expect '3' ioctl calls found '{found}'"
+            self.assertEqual(3, found, msg=msg)
+        finally:
+            self._pyv.spi_end_transaction()
+            self._pyv.spi_ioctl = False
+
+        expect = "Command: 54\n   Data: 175,4660\nCommand: 34\n"
+        found = self._pyv.spi_capture.text()
+        msg = f"Expect {expect!r} found {found!r}"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_hardware_cs(self):
+        """
+        Test that the cs pin is never touched when the hardware chip
+        select is used.
+        """
+        self._pyv._spi_port_device()
+        self._pyv.hardware_cs = True
+        before = dict(self._pyv.gpio_stats)
+
+        try:
+            self._pyv.pin_mode(self.CS, self._pyv.OUTPUT)
+            self._pyv.digital_write(self.CS, self._pyv.LOW)
+            self._pyv.spi_start_transaction()
+            self._pyv.spi_write(bytearray((0x12, 0x34)))
+        finally:
+            self._pyv.spi_end_transaction()
+            self._pyv.hardware_cs = False
+
+        found = {key: self._pyv.gpio_stats[key] - value
+                 for key, value in before.items()}
+        expect = {'gpio_writes': 0, 'gpio_writes_saved': 0}
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        found = self.CS in self._pyv._pin_levels
+        msg = f"Expect the cs pin not to be cached found '{found}'"
+        self.assertFalse(found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_spi_capture(self):
+        """
+        Test that the capture can be replaced and turned off.
+        """
+        old = self._pyv.spi_capture
+
+        try:
+            self._pyv.spi_capture = 64
+            found = self._pyv.spi_capture.size
+            msg = f"Expect a capture of '64' bytes found '{found}'"
+            self.assertEqual(64, found, msg=msg)
+            self._pyv._spi_port_device()
+            self._pyv.spi_start_transaction()
+            self._pyv.spi_capture = False
+            found = self._pyv.spi_write(bytearray((0x00, 0x36)))
+            msg = f"Expect 'None' found '{found}'"
+            self.assertIsNone(found, msg=msg)
+        finally:
+            self._pyv.spi_end_transaction()
+            self._pyv._capture = old
+
+    #@unittest.skip("Temporary")
+    def test_spi_writer(self):
+        """
+        Test that writes sent from the writer thread are the same as
+        without it and that the rs changes stay in order.
+        """
+        self._pyv._spi_port_device()
+        self._pyv.spi_writer = True
+
+        try:
+            self._pyv.spi_start_transaction()
+            self._pyv.digital_write(self.RS, self._pyv.LOW)
+            found = self._pyv.spi_write(bytearray((0x00, 0x36)))
+            msg = f"Expect 'None' found '{found}'"
+            self.assertIsNone(found, msg=msg)
+            self._pyv.digital_write(self.RS, self._pyv.HIGH)
+            self._pyv.spi_write([0x00AF, 0x1234])
+            self._pyv.spi_write_segments(self.RS, [
+                (False, bytearray((0x00, 0x22))),
+                (True, bytearray((0xFF, 0xFF)))])
+            self._pyv.spi_flush()
+        finally:
+            self._pyv.spi_end_transaction()
+            self._pyv.spi_writer = False
+
+        found = self._pyv._writer
+        msg = f"Expect the writer to be stopped found '{found}'"
+        self.assertIsNone(found, msg=msg)
+        # How the writes are batched depends on the thread, so join the
+        # values written with the same rs state.
+        found = []
+
+        for line in self._pyv.spi_capture.text().splitlines():
+            name, values = line.strip().split(': ')
+
+            if found and found[-1][0] == name:
+                found[-1] = (name, f"{found[-1][1]},{values}")
+            else:
+                found.append((name, values))
+
+        expect = [('Command', '54'), ('Data', '175,4660'), ('Command', '34'),
+                  ('Data', '65535')]
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+
     #@unittest.skip("Temporary")
     def test_setup_pwm(self):
         """
@@ -338,3 +531,216 @@ class TestPiVersion(unittest.TestCase):
             self.assertTrue(expect_percent < percent, msg=msg)
         finally:
             self.unset_pin(self.LED)
+
+
+class FakeSpiDevice:
+    """
+    Stands in for an open spidev file descriptor, records each ioctl
+    message and loops the written data back.
+    """
+    FD = 99
+
+    def __init__(self):
+        self.messages = []
+        self.cs_changes = []
+
+    def ioctl(self, fd, request, xfers):
+        assert fd == self.FD, f"Invalid fd {fd}"
+        message = []
+        self.cs_changes.append([xfer.cs_change for xfer in xfers])
+
+        for xfer in xfers:
+            data = ctypes.string_at(xfer.tx_buf, xfer.len)
+            message.append((data, xfer.speed_hz))
+
+            if xfer.rx_buf:
+                ctypes.memmove(xfer.rx_buf, data, xfer.len)
+
+        self.messages.append((request, message))
+        return 0
+
+
+class TestSpiIoctl(unittest.TestCase):
+    """
+    Test class for the SpiIoctl class.
+    """
+    SPEED = 80000000
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        self._dev = FakeSpiDevice()
+        self._spi = SpiIoctl(self._dev.FD, self.SPEED, bufsiz=16,
+                             ioctl=self._dev.ioctl)
+
+    #@unittest.skip("Temporary")
+    def test_spi_ioc_message(self):
+        """
+        Test that the ioctl request numbers match the Linux macro.
+        """
+        # SPI_IOC_MESSAGE(1) and SPI_IOC_MESSAGE(2) from the C headers.
+        for num, expect in ((1, 0x40206B00), (2, 0x40406B00)):
+            found = SpiIoctl.spi_ioc_message(num)
+            msg = f"Expect {expect:#x} found {found:#x}"
+            self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_transfer(self):
+        """
+        Test that buffers are packed into as few messages as the bufsiz
+        allows and that data is read back.
+        """
+        buffers = [bytearray(range(4)), memoryview(bytearray(range(10))),
+                   bytes(range(20))]
+        found = self._spi.transfer(buffers, read=True)
+        expect = b''.join(bytes(buf) for buf in buffers)
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        # 4 + 10 bytes, then 16 bytes, then 4 bytes.
+        expect = [[4, 10], [16], [4]]
+        found = [[len(data) for data, speed in message]
+                 for request, message in self._dev.messages]
+        msg = f"Expect transfer sizes {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        expect = [SpiIoctl.spi_ioc_message(2), SpiIoctl.spi_ioc_message(1),
+                  SpiIoctl.spi_ioc_message(1)]
+        found = [request for request, message in self._dev.messages]
+        msg = f"Expect requests {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        found = self._spi.calls
+        msg = f"Expect '3' calls found '{found}'"
+        self.assertEqual(3, found, msg=msg)
+        found = {speed for request, message in self._dev.messages
+                 for data, speed in message}
+        msg = f"Expect speed '{self.SPEED}' found '{found}'"
+        self.assertEqual({self.SPEED}, found, msg=msg)
+        # Nothing is returned if not reading.
+        found = self._spi.transfer([bytearray(2)])
+        msg = f"Expect 'None' found '{found}'"
+        self.assertIsNone(found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_transfer_keep_cs(self):
+        """
+        Test that cs_change is set on the last transfer of every message
+        but the last one unless keep_cs is True.
+        """
+        buffers = [bytearray(4), bytearray(10), bytearray(20)]
+        self._spi.transfer(buffers)
+        expect = [[0, 1], [1], [0]]
+        found = self._dev.cs_changes
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+        self._dev.cs_changes.clear()
+        self._spi.transfer(buffers, keep_cs=True)
+        expect = [[0, 1], [1], [1]]
+        found = self._dev.cs_changes
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_transfer_error(self):
+        """
+        Test that an ioctl error raises a CompatibilityException.
+        """
+        def ioctl(fd, request, xfers):
+            raise OSError(90, "Message too long")
+
+        spi = SpiIoctl(self._dev.FD, self.SPEED, bufsiz=16, ioctl=ioctl)
+
+        with self.assertRaises(CompatibilityException) as cm:
+            spi.transfer([bytearray(4)])
+
+
+class TestSpiWriter(unittest.TestCase):
+    """
+    Test class for the SpiWriter class.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        self._sent = []
+        self._release = threading.Event()
+        self._release.set()
+        self._writer = SpiWriter(self.send, size=8)
+
+    def tearDown(self):
+        self._release.set()
+        self._writer.close()
+
+    def send(self, buf, segments):
+        self._release.wait()
+        self._sent.append([(is_data, bytes(buf[start:end]))
+                           for is_data, start, end in segments])
+
+    #@unittest.skip("Temporary")
+    def test_write(self):
+        """
+        Test that everything written is sent in order with the RS state
+        of each segment.
+        """
+        writes = [(False, b'\x00\x22'), (True, bytes(range(20))),
+                  (False, b'\x00\x03'), (True, b'\x10\x30')]
+
+        for is_data, values in writes:
+            self._writer.write(is_data, values)
+
+        self._writer.wait()
+        found = []
+
+        for segments in self._sent:
+            for is_data, data in segments:
+                if found and found[-1][0] == is_data:
+                    found[-1] = (is_data, found[-1][1] + data)
+                else:
+                    found.append((is_data, data))
+
+        msg = f"Expect {writes} found {found}"
+        self.assertEqual(writes, found, msg=msg)
+        found = max(sum(len(data) for is_data, data in segments)
+                    for segments in self._sent)
+        msg = f"Expect no more than '8' bytes sent at a time found '{found}'"
+        self.assertTrue(found <= 8, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_batching(self):
+        """
+        Test that writes made while the thread is busy are sent together.
+        """
+        self._release.clear()
+        self._writer.write(False, b'\x00\x22')
+
+        # Wait for the thread to take the first write.
+        while not self._writer._busy:
+            time.sleep(0.001)
+
+        for value in range(3):
+            self._writer.write(True, bytes((0, value)))
+
+        self._release.set()
+        self._writer.wait()
+        expect = [[(False, b'\x00\x22')], [(True, b'\x00\x00\x00\x01\x00\x02')]]
+        found = self._sent
+        msg = f"Expect {expect} found {found}"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_error(self):
+        """
+        Test that a failed send is raised on the next call.
+        """
+        def send(buf, segments):
+            raise OSError(5, "Input/output error")
+
+        writer = SpiWriter(send)
+
+        try:
+            writer.write(True, b'\x00\x01')
+
+            with self.assertRaises(CompatibilityException) as cm:
+                writer.wait()
+        finally:
+            writer.close()
@@ -231,7 +231,11 @@ class CreatePackages:
         ('common.py', None, None),
         ('circuitpython.py', _fix_circuitpython, None),
         ('computer.py', _fix_computer, None),
+        ('async_tft.py', None, None),
         ('default_fonts.py', None, None),
+        ('draw_stats.py', None, None),
+        ('spi_capture.py', None, None),
+        ('trace.py', None, None),
         ('micropython.py', _fix_micropython, None),
         ('raspberrypi.py', _fix_raspberrypi, None),
         ('fonts', None, None),
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+utils/async_tft.py
+
+Async versions of the drawing methods for asyncio and uasyncio.
+
+The long drawing methods are written as generators that yield after
+each chunk of data is sent (see the _iter_* methods in CommonMethods and
+the display classes), the chunks are never larger than FILL_CHUNK_SIZE or
+BYTEARRAY_SIZE. The methods here step through the same generators and
+give the event loop a turn whenever the time budget runs out.
+"""
+
+try: # MicroPython
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try: # MicroPython and CircuitPython
+    from time import ticks_ms, ticks_diff
+except ImportError:
+    from time import monotonic
+
+    def ticks_ms():
+        return int(monotonic() * 1000)
+
+    def ticks_diff(new, old):
+        return new - old
+
+from .common import Colors, SpanRasterizer
+
+
+class AsyncTFT:
+    """
+    Wrap a display object so its long drawing methods can be awaited.
+
+    .. code-block:: python
+
+        tft = ILI9225(RST, RS, PORT, CS, LED, board=Boards.RASPI)
+        tft.begin()
+        atft = AsyncTFT(tft, budget_ms=5)
+        await atft.fill_rectangle(0, 0, 175, 219, Colors.RED)
+        await atft.draw_gfx_text(10, 40, "Hello", Colors.WHITE,
+                                 budget_ms=2)
+
+    .. note::
+
+      Every drawing method that can take long has an async version here.
+      draw_pixel(), draw_char() and draw_gfx_char() are left out, they
+      write too little to block the event loop. There is no outlined
+      round rectangle or polygon in CommonMethods, only the filled ones.
+
+      Calls are run one at a time, a call waits for the one before it to
+      finish. Do not call the display object directly from other tasks
+      while an async call is running, its window would be overwritten.
+    """
+    DEF_BUDGET_MS = 10
+
+    def __init__(self, tft, budget_ms=DEF_BUDGET_MS):
+        """
+        Constructor
+
+        :param tft: The display object.
+        :type tft: ILI9225
+        :param budget_ms: The longest time in milliseconds a call runs
+                          before giving the event loop a turn.
+        :type budget_ms: int
+        """
+        self._tft = tft
+        self.budget_ms = budget_ms
+        self._lock = asyncio.Lock()
+
+    @property
+    def tft(self):
+        """
+        Get the display object.
+
+        :return: The display object.
+        :rtype: ILI9225
+        """
+        return self._tft
+
+    async def clear(self, x0=None, y0=None, x1=None, y1=None,
+                    color=Colors.BLACK, *, budget_ms=None):
+        """
+        Async version of clear().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        tft = self._tft
+
+        if any([True for v in (x0, y0, x1, y1) if v is None]):
+            async with self._lock:
+                old_orientation = tft.orientation
+                tft.orientation = 0
+
+                try:
+                    await self.__step(tft._iter_fill_rectangle(
+                        0, 0, tft.max_x - 1, tft.max_y - 1, color), budget_ms)
+                finally:
+                    tft.orientation = old_orientation
+
+            await asyncio.sleep(0.01)
+        else:
+            await self.fill_rectangle(x0, y0, x1, y1, color,
+                                      budget_ms=budget_ms)
+
+    async def show(self, *, budget_ms=None):
+        """
+        Async version of show().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_show(), budget_ms)
+
+    async def draw_pixels(self, pixels, *, budget_ms=None):
+        """
+        Async version of draw_pixels().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_pixels(pixels), budget_ms)
+
+    async def draw_line(self, x0, y0, x1, y1, color, *, budget_ms=None):
+        """
+        Async version of draw_line().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_line(x0, y0, x1, y1, color),
+                         budget_ms)
+
+    async def draw_circle(self, x0, y0, radius, color, *, budget_ms=None):
+        """
+        Async version of draw_circle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_circle(x0, y0, radius, color),
+                         budget_ms)
+
+    async def draw_triangle(self, x0, y0, x1, y1, x2, y2, color, *,
+                            budget_ms=None):
+        """
+        Async version of draw_triangle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_triangle(
+            x0, y0, x1, y1, x2, y2, color), budget_ms)
+
+    async def draw_rectangle(self, x0, y0, x1, y1, color, *, budget_ms=None):
+        """
+        Async version of draw_rectangle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_rectangle(x0, y0, x1, y1,
+                                                        color), budget_ms)
+
+    async def fill_rectangle(self, x0, y0, x1, y1, color, *, budget_ms=None):
+        """
+        Async version of fill_rectangle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_fill_rectangle(x0, y0, x1, y1,
+                                                        color), budget_ms)
+
+    async def draw_hline(self, x, y, width, color, *, budget_ms=None):
+        """
+        Async version of draw_hline().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_hline(x, y, width, color),
+                         budget_ms)
+
+    async def draw_vline(self, x, y, height, color, *, budget_ms=None):
+        """
+        Async version of draw_vline().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_vline(x, y, height, color),
+                         budget_ms)
+
+    async def fill_circle(self, x0, y0, radius, color, *, budget_ms=None):
+        """
+        Async version of fill_circle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        raster = self.__raster()
+        raster.circle(x0, y0, radius)
+        await self.__run(self._tft._iter_fill_raster(raster, color),
+                         budget_ms)
+
+    async def fill_triangle(self, x0, y0, x1, y1, x2, y2, color, *,
+                            budget_ms=None):
+        """
+        Async version of fill_triangle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        raster = self.__raster()
+        raster.triangle(x0, y0, x1, y1, x2, y2)
+        await self.__run(self._tft._iter_fill_raster(raster, color),
+                         budget_ms)
+
+    async def fill_round_rectangle(self, x0, y0, x1, y1, radius, color, *,
+                                   budget_ms=None):
+        """
+        Async version of fill_round_rectangle().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        raster = self.__raster()
+        raster.round_rect(x0, y0, x1, y1, radius)
+        await self.__run(self._tft._iter_fill_raster(raster, color),
+                         budget_ms)
+
+    async def fill_polygon(self, points, color, *, budget_ms=None):
+        """
+        Async version of fill_polygon().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        raster = self.__raster()
+        raster.polygon(points)
+        await self.__run(self._tft._iter_fill_raster(raster, color),
+                         budget_ms)
+
+    async def draw_text(self, x, y, s, color=Colors.WHITE,
+                        bg_color=Colors.BLACK, *, budget_ms=None):
+        """
+        Async version of draw_text().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        :return: The position of x after the text is displayed.
+        :rtype: int
+        """
+        return await self.__run(self._tft._iter_draw_text(
+            x, y, s, color, bg_color), budget_ms)
+
+    async def draw_gfx_text(self, x, y, s, color=Colors.WHITE, *,
+                            add_pixels=0, budget_ms=None):
+        """
+        Async version of draw_gfx_text().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        :return: The position of x after the text is displayed.
+        :rtype: int
+        """
+        return await self.__run(self._tft._iter_draw_gfx_text(
+            x, y, s, color, add_pixels), budget_ms)
+
+    async def draw_bitmap(self, x, y, bitmap, w, h, color=Colors.WHITE,
+                          bg=Colors.BLACK, transparent=False, lsb_first=False,
+                          *, budget_ms=None):
+        """
+        Async version of draw_bitmap().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_bitmap(
+            x, y, bitmap, w, h, color, bg, transparent, lsb_first), budget_ms)
+
+    async def draw_rgb_bitmap(self, x, y, bitmap, w, h, transparent=None, *,
+                              budget_ms=None):
+        """
+        Async version of draw_rgb_bitmap().
+
+        :param budget_ms: Overrides the time budget for this call.
+        :type budget_ms: int
+        """
+        await self.__run(self._tft._iter_draw_rgb_bitmap(
+            x, y, bitmap, w, h, transparent), budget_ms)
+
+    def __raster(self):
+        return SpanRasterizer(self._tft.max_x, self._tft.max_y)
+
+    async def __run(self, gen, budget_ms):
+        async with self._lock:
+            return await self.__step(gen, budget_ms)
+
+    async def __step(self, gen, budget_ms):
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        start = ticks_ms()
+
+        try:
+            while True:
+                next(gen)
+
+                if ticks_diff(ticks_ms(), start) >= budget:
+                    await asyncio.sleep(0)
+                    start = ticks_ms()
+        except StopIteration as e:
+            return e.value
+        finally:
+            # Ends any transaction left open if the task was cancelled.
+            gen.close()
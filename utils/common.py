@@ -9,6 +9,70 @@ https://techexplorations.com/guides/esp32/micropython-with-the-esp32/4-micropyth
 https://stm32-base.org/boards/
 """
 
+import sys
+
+from array import array
+
+try:
+    from warnings import warn
+except ImportError: # MicroPython and CircuitPython
+    warn = None
+
+try: # MicroPython
+    from time import ticks_us, ticks_diff
+except ImportError:
+    try: # CPython
+        from time import perf_counter_ns as _ticks_ns
+    except ImportError: # CircuitPython
+        from time import monotonic_ns as _ticks_ns
+
+    def ticks_us():
+        return _ticks_ns() // 1000
+
+    def ticks_diff(new, old):
+        return new - old
+
+
+def pack_be16(values):
+    """
+    Pack 16-bit values into a bytearray high byte first, this is the byte
+    order the displays expect.
+
+    .. note::
+
+      On CPython the values are put in an array('H') and byte swapped in
+      one call on little endian machines, other platforms fall back to a
+      loop.
+
+    :param values: A single value or a sequence of values, an
+                   array('H') can also be used.
+    :type values: int, list, tuple, or array
+    :return: The packed values.
+    :rtype: bytearray
+    """
+    if isinstance(values, (int, float)):
+        values = (values,)
+
+    try:
+        arr = array('H', values)
+    except TypeError:
+        arr = array('H', [round(value) for value in values])
+
+    if sys.byteorder == 'big':
+        return bytearray(arr)
+
+    if hasattr(arr, 'byteswap'):
+        arr.byteswap()
+        return bytearray(arr)
+
+    result = bytearray(len(arr) * 2) # pragma: no cover
+
+    for idx, value in enumerate(arr): # pragma: no cover
+        result[idx * 2] = value >> 8
+        result[idx * 2 + 1] = value & 0xFF
+
+    return result # pragma: no cover
+
 
 class TFTException(Exception):
     """
@@ -187,262 +251,459 @@ class RGB16BitColor:
 Colors = RGB16BitColor
 
 
-class CommonMethods:
-    """
-    These are common method accross all display types.
+class FrameBuffer:
     """
+    An off-screen RGB565 frame buffer.
 
-    ERROR_MSGS = {
-        'STD_FONT': "Please set a standard font before using this method.",
-        'GFX_FONT': "Please set a GFX font before using this method.",
-        'GFX_BAD_CH': "The character '{}' is not in the current font.",
-        'BRD_UNSUP': "Error: The {} board is not supported.",
-        'INV_PORT': "Invalid port for the {} board."
-        }
+    The buffer is kept in the native (orientation 0) coordinates of the
+    display, two bytes per pixel, high byte first. This is the same byte
+    order that is sent to the display so dirty areas can be streamed
+    without any conversion.
+    """
+    # Dirty rectangles beyond this number are merged together.
+    MAX_DIRTY = 8
+    # Width and height of a tile when diffing against the shadow copy.
+    TILE_SIZE = 16
 
-    def __init__(self):
-        self._max_x = 0
-        self._max_y = 0
-        self.__orientation = 0
-        self.__brightness = 0
-        self.__spi_close_override = False
+    def __init__(self, width, height, diff=False):
+        """
+        Constructor
+
+        :param width: The native width of the display in pixels.
+        :type width: int
+        :param height: The native height of the display in pixels.
+        :type height: int
+        :param diff: If True keep a shadow copy of what was last sent to
+                     the display so that unchanged tiles can be skipped.
+        :type diff: bool
+        """
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(width * height * 2)
+        self._mv = memoryview(self.buffer)
+        self._dirty = []
+        self._shadow = bytearray(len(self.buffer)) if diff else None
+        self.stats = {'tiles_sent': 0, 'tiles_skipped': 0}
 
     @property
-    def spi_close_override(self):
+    def is_diff(self):
         """
-        Returns the override state of the SPI interface.
+        Check if the shadow copy diffing is being used.
 
-        :return: If the override is active the result is True,
-                 if not active it is False.
+        :return: True if diffing else False.
         :rtype: bool
         """
-        return self.__spi_close_override
+        return self._shadow is not None
 
-    @spi_close_override.setter
-    def spi_close_override(self, value):
+    def reset_stats(self):
         """
-        Sets the override state of the SPI interface.
-
-        :param value: If True the SPI interface close is overridden
-                      else if False it is not overridden.
-        :type value: bool
+        Reset the tile counters.
         """
-        self.__spi_close_override = value
+        for key in self.stats:
+            self.stats[key] = 0
 
-    def clear(self, x0=None, y0=None, x1=None, y1=None, color=Colors.BLACK):
+    @property
+    def dirty(self):
         """
-        Overwrites the entire display with the color black.
+        Get the current dirty rectangles.
 
-        .. note::
+        :return: A list of (x0, y0, x1, y1) tuples in native coordinates.
+        :rtype: list
+        """
+        return list(self._dirty)
 
-          This method can be used to clear, to the previously set
-          background color, a rectilinear area to clear a previous object
-          on the display. Circles can be cleared however the area must be
-          rectilinear. Any intersecting lines or objects will also be cleared.
+    def mark_dirty(self, x0, y0, x1, y1):
+        """
+        Add a rectangle to the dirty list. Rectangles that overlap or touch
+        are merged, if there are too many rectangles the new one is merged
+        with the one that will grow the least.
 
         :param x0: Start x coordinate.
         :type x0: int
-        :param y0, Start y coordinate.
+        :param y0: Start y coordinate.
         :type y0: int
         :param x1: End x coordinate.
         :type x1: int
-        :param y1, End y coordinate.
+        :param y1: End y coordinate.
         :type y1: int
         """
-        if any([True for v in (x0, y0, x1, y1) if v is None]):
-            self.set_display_background(color)
-        else:
-            self.fill_rectangle(x0, y0, x1, y1, color)
+        rect = (x0, y0, x1, y1)
 
-    def set_display_background(self, color):
+        while True:
+            found = None
+
+            for r in self._dirty:
+                if (r[0] <= rect[2] + 1 and rect[0] <= r[2] + 1
+                    and r[1] <= rect[3] + 1 and rect[1] <= r[3] + 1):
+                    found = r
+                    break
+
+            if found is None and len(self._dirty) >= self.MAX_DIRTY:
+                growth = None
+
+                for r in self._dirty:
+                    area = self.__area(self.__union(r, rect))
+                    area -= self.__area(r) + self.__area(rect)
+
+                    if growth is None or area < growth:
+                        growth = area
+                        found = r
+
+            if found is None:
+                break
+
+            self._dirty.remove(found)
+            rect = self.__union(found, rect)
+
+        self._dirty.append(rect)
+
+    def pop_dirty(self):
         """
-        Set the background color of the display.
+        Get and clear the dirty rectangles.
 
-        :param color: The RGB color for the display, default is black.
+        :return: A list of (x0, y0, x1, y1) tuples in native coordinates.
+        :rtype: list
+        """
+        dirty = self._dirty
+        self._dirty = []
+        return dirty
+
+    def set_pixel(self, x, y, color):
+        """
+        Set a single pixel, the coordinates must be within the buffer.
+
+        :param x: Native x coordinate.
+        :type x: int
+        :param y: Native y coordinate.
+        :type y: int
+        :param color: A 16-bit RGB color.
         :type color: int
         """
-        old_orientation = self.orientation
-        self.orientation = 0
-        self.fill_rectangle(0, 0, self.max_x - 1, self.max_y - 1, color)
-        self.orientation = old_orientation
-        self.delay(10)
+        idx = (y * self.width + x) * 2
+        self.buffer[idx] = color >> 8
+        self.buffer[idx + 1] = color & 0xFF
 
-    def set_backlight(self, flag, brightness=None):
+    def get_pixel(self, x, y):
         """
-        Set the backlight on or off and set the brightness if there
-        is an LED pin.
+        Get a single pixel, the coordinates must be within the buffer.
 
-        :param flag: True = backlight on and False = backlight off.
-        :type flag: bool
-        :param brightness: The brightness of the display, it defaults to
-                           full brightness.
-        :type brightness: int
+        :param x: Native x coordinate.
+        :type x: int
+        :param y: Native y coordinate.
+        :type y: int
+        :return: A 16-bit RGB color.
+        :rtype: int
         """
-        # This fixes the subclass issue where MAX_BRIGHTNESS is not
-        # available until instantiation.
-        brightness = self.MAX_BRIGHTNESS if brightness is None else brightness
+        idx = (y * self.width + x) * 2
+        return (self.buffer[idx] << 8) | self.buffer[idx + 1]
 
-        self._bl_state = flag
+    def fill_rect(self, x0, y0, x1, y1, color):
+        """
+        Fill a rectangle, the coordinates must be within the buffer.
 
-        if self._led != -1:
-            self.brightness = brightness
-            self.change_led_duty_cycle(
-                self.brightness if self._bl_state else 0)
+        :param x0: Start x coordinate.
+        :type x0: int
+        :param y0: Start y coordinate.
+        :type y0: int
+        :param x1: End x coordinate.
+        :type x1: int
+        :param y1: End y coordinate.
+        :type y1: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        row = bytes((color >> 8, color & 0xFF)) * (x1 - x0 + 1)
+        stride = self.width * 2
+        start = y0 * stride + x0 * 2
+        end = start + len(row)
 
-    @property
-    def brightness(self):
+        for y in range(y0, y1 + 1):
+            self._mv[start:end] = row
+            start += stride
+            end += stride
+
+        self.mark_dirty(x0, y0, x1, y1)
+
+    def region(self, x0, y0, x1, y1):
         """
-        Get the current brightness.
+        Get a copy of the pixel data in a rectangle in row order.
+
+        :param x0: Start x coordinate.
+        :type x0: int
+        :param y0: Start y coordinate.
+        :type y0: int
+        :param x1: End x coordinate.
+        :type x1: int
+        :param y1: End y coordinate.
+        :type y1: int
+        :return: The RGB565 pixel data.
+        :rtype: bytearray
         """
-        return self.__brightness
+        stride = self.width * 2
+        start = y0 * stride + x0 * 2
 
-    @brightness.setter
-    def brightness(self, brightness):
+        if x0 == 0 and x1 == self.width - 1:
+            return bytearray(self._mv[start:(y1 + 1) * stride])
+
+        array = bytearray()
+        size = (x1 - x0 + 1) * 2
+
+        for y in range(y0, y1 + 1):
+            array += self._mv[start:start + size]
+            start += stride
+
+        return array
+
+    def diff_tiles(self, rects):
         """
-        Set a different brightness.
+        Find the tiles, within the given rectangles, that are different
+        from the shadow copy and update the shadow copy. Changed tiles
+        that are next to each other on the same tile row are joined.
+
+        :param rects: A list of (x0, y0, x1, y1) tuples in native
+                      coordinates, usually the dirty rectangles.
+        :type rects: list
+        :return: A list of (x0, y0, x1, y1) tuples that need to be sent.
+        :rtype: list
+        """
+        ts = self.TILE_SIZE
+        tiles = set()
+
+        for x0, y0, x1, y1 in rects:
+            for ty in range(y0 // ts, y1 // ts + 1):
+                for tx in range(x0 // ts, x1 // ts + 1):
+                    tiles.add((ty, tx))
+
+        changed = []
+        run = None
+
+        for ty, tx in sorted(tiles):
+            x0 = tx * ts
+            y0 = ty * ts
+            x1 = min(x0 + ts, self.width) - 1
+            y1 = min(y0 + ts, self.height) - 1
+
+            if self.__update_shadow(x0, y0, x1, y1):
+                if run is not None and run[1] == y0 and run[2] == x0 - 1:
+                    run[2] = x1
+                else:
+                    run = [x0, y0, x1, y1]
+                    changed.append(run)
+
+                self.stats['tiles_sent'] += 1
+            else:
+                run = None
 
-        :param brightness: The brightness value to set (0 .. 255)
+        # Every tile that is not sent has been skipped.
+        tx_count = (self.width + ts - 1) // ts
+        ty_count = (self.height + ts - 1) // ts
+        sent = sum([((r[2] - r[0]) // ts) + 1 for r in changed])
+        self.stats['tiles_skipped'] += tx_count * ty_count - sent
+        return [tuple(r) for r in changed]
+
+    def __update_shadow(self, x0, y0, x1, y1):
+        stride = self.width * 2
+        start = y0 * stride + x0 * 2
+        size = (x1 - x0 + 1) * 2
+        changed = False
+
+        for y in range(y0, y1 + 1):
+            end = start + size
+
+            if self.buffer[start:end] != self._shadow[start:end]:
+                self._shadow[start:end] = self.buffer[start:end]
+                changed = True
+
+            start += stride
+
+        return changed
+
+    def __union(self, r0, r1):
+        return (min(r0[0], r1[0]), min(r0[1], r1[1]),
+                max(r0[2], r1[2]), max(r0[3], r1[3]))
+
+    def __area(self, r):
+        return (r[2] - r[0] + 1) * (r[3] - r[1] + 1)
+
+
+class CommandBatch:
+    """
+    A list of command and data writes that are sent together.
+
+    Writes of the same kind (command or data) that follow each other are
+    joined into one segment, so the whole batch is sent with one chip
+    select and the fewest changes of the RS (data/command) line.
+    """
+
+    def __init__(self, size=2):
         """
-        self.__brightness = brightness % (self.MAX_BRIGHTNESS + 1)
+        Constructor
 
-    @property
-    def orientation(self):
+        :param size: The number of bytes to use for each int value, 2 for
+                     the ILI9225 and 1 for 8-bit commands and parameters.
+        :type size: int
         """
-        Get the orientation.
+        self._size = size
+        self.segments = []
 
-        :return: Return the current orientation.
-        :rtype: int
+    def __len__(self):
+        return len(self.segments)
+
+    def command(self, value):
         """
-        return self.__orientation
+        Add a command.
 
-    @orientation.setter
-    def orientation(self, orientation):
+        :param value: The command, a list of commands or a bytearray.
+        :type value: int, list, tuple, bytearray, or memoryview
         """
-        Set the orientation.
+        self.__append(False, value)
 
-        :param orientation: 0=portrait, 1=right rotated landscape,
-                            2=reverse portrait, 3=left rotated landscape
-        :type orientation: int
+    def data(self, value):
         """
-        self.__orientation = orientation % 4
+        Add data.
 
-        if self.__orientation == 0: # 0=portrait
-            self._max_x = self.LCD_WIDTH
-            self._max_y = self.LCD_HEIGHT
-        elif self.__orientation == 1: # 1=right rotated landscape
-            self._max_x = self.LCD_HEIGHT
-            self._max_y = self.LCD_WIDTH
-        elif self.__orientation == 2: # 2=reverse portrait
-            self._max_x = self.LCD_WIDTH
-            self._max_y = self.LCD_HEIGHT
-        elif self.__orientation == 3: # 3=left rotated landscape
-            self._max_x = self.LCD_HEIGHT
-            self._max_y = self.LCD_WIDTH
+        :param value: The data, a list of values or a bytearray.
+        :type value: int, list, tuple, bytearray, or memoryview
+        """
+        self.__append(True, value)
 
-    def _orient_coordinates(self, x, y):
-        if self.__orientation == 1:
-            y = self.max_y - y - 1
-            x, y = y, x
-        elif self.__orientation == 2:
-            x = self.max_x - x - 1
-            y = self.max_y - y - 1
-        elif self.__orientation == 3:
-            x = self.max_x - x - 1
-            x, y = y, x
-
-        # if self.__orientation == 0: We fall through.
-        return x, y
+    def register(self, command, data):
+        """
+        Add a command followed by its data.
 
-    @property
-    def max_x(self):
+        :param command: The command.
+        :type command: int
+        :param data: The data.
+        :type data: int, list, tuple, bytearray, or memoryview
         """
-        Get the display max x size. The value is based on the orientation.
+        self.__append(False, command)
+        self.__append(True, data)
 
-        .. note::
+    def clear(self):
+        """
+        Remove all the writes from the batch.
+        """
+        self.segments = []
 
-          Either 0..LCD_WIDTH or 0..LCD_HEIGHT depending on orientation.
+    def __append(self, is_data, value):
+        if self.segments and self.segments[-1][0] == is_data:
+            segment = self.segments[-1][1]
+        else:
+            segment = bytearray()
+            self.segments.append((is_data, segment))
 
-        :return: Horizontal size of the display in pixels.
-        :rtype: int
+        if isinstance(value, (bytearray, bytes, memoryview)):
+            segment.extend(value)
+        elif self._size == 2:
+            segment.extend(pack_be16(value))
+        else:
+            if isinstance(value, (int, float)):
+                value = (value,)
+
+            segment.extend(bytearray(round(item) & 0xFF for item in value))
+
+
+class SpanRasterizer:
+    """
+    Turn filled shapes into horizontal spans.
+
+    Each row holds a sorted list of [x_start, x_end] spans (inclusive),
+    spans that overlap or touch are merged and everything is clipped to
+    the display. The spans can then be sent as a small set of rectangles
+    so that no pixel is written more than once.
+    """
+
+    def __init__(self, max_x, max_y):
         """
-        return self._max_x
+        Constructor
 
-    @property
-    def max_y(self):
+        :param max_x: The width of the display in pixels.
+        :type max_x: int
+        :param max_y: The height of the display in pixels.
+        :type max_y: int
         """
-        Get the display max y size. The value is based on the orientation.
+        self.max_x = max_x
+        self.max_y = max_y
+        self._rows = {}
 
-        .. note::
+    def add_span(self, y, xs, xe):
+        """
+        Add a span to a row, it is clipped to the display and merged with
+        any spans it overlaps or touches.
+
+        :param y: The row (y-axis).
+        :type y: int
+        :param xs: Start of the span (x-axis).
+        :type xs: int
+        :param xe: End of the span (x-axis).
+        :type xe: int
+        """
+        if xe < xs: xs, xe = xe, xs
+        y = round(y)
+        xs = max(round(xs), 0)
+        xe = min(round(xe), self.max_x - 1)
 
-          Either 0..LCD_WIDTH or 0..LCD_HEIGHT depending on orientation.
+        if not 0 <= y < self.max_y or xe < xs:
+            return
 
-        :return: Vertical size of the display in pixels.
-        :rtype: int
-        """
-        return self._max_y
+        spans = []
+        idx = 0
 
-    def draw_rectangle(self, x0, y0, x1, y1, color):
+        for span in self._rows.get(y, []):
+            if span[1] < xs - 1:
+                spans.append(span)
+                idx += 1
+            elif span[0] > xe + 1:
+                spans.append(span)
+            else:
+                xs = min(xs, span[0])
+                xe = max(xe, span[1])
+
+        spans.insert(idx, [xs, xe])
+        self._rows[y] = spans
+
+    def spans(self):
         """
-        Draw a rectangle using rectangular coordinates.
+        Get all the spans.
 
-        :param x0: Start point coordinate (x0-axis).
-        :type x0: int
-        :param y0: Center point coordinate (y0-axis).
-        :type y0: int
-        :param x1: Center point coordinate (x1-axis).
-        :type x1: int
-        :param y1: Center point coordinate (y1-axis).
-        :type y1: int
-        :param color: A 16-bit RGB color.
-        :type color: int
+        :return: A list of (y, x_start, x_end) tuples sorted by row.
+        :rtype: list
         """
-        self._start_write()
-        self.draw_line(x0, y0, x0, y1, color)
-        self.draw_line(x0, y0, x1, y0, color)
-        self.draw_line(x0, y1, x1, y1, color)
-        self.draw_line(x1, y0, x1, y1, color)
-        self._end_write(reuse=False)
+        return [(y, xs, xe) for y in sorted(self._rows)
+                for xs, xe in self._rows[y]]
 
-    def fill_rectangle(self, x0, y0, x1, y1, color):
+    def rects(self):
         """
-        Fill a rectangle using rectangular coordinates.
+        Get the spans as rectangles, spans with the same start and end on
+        consecutive rows are joined into one rectangle.
 
-        :param x0: Start point coordinate (x0-axis).
-        :type x0: int
-        :param y0: Center point coordinate (y0-axis).
-        :type y0: int
-        :param x1: Center point coordinate (x1-axis).
-        :type x1: int
-        :param y1: Center point coordinate (y1-axis).
-        :type y1: int
-        :param color: A 16-bit RGB color
-        :type color: int
+        :return: A list of (x0, y0, x1, y1) tuples.
+        :rtype: list
         """
-        self.spi_close_override = True
-        self._start_write()
-        self._set_window(x0, y0, x1, y1)
-        array = bytearray()
-        c_hi = color >> 8
-        c_lo = color & 0xFF
+        rects = []
+        current = {}
 
-        # Count backwards from (y1 - y0 + 1) * (x1 - x0 + 1)) + 1 ending at 1.
-        for t in reversed(range(1, round((y1 - y0 + 1) * (x1 - x0 + 1)) + 1)):
-            if (hasattr(self, '_need_chunking')
-                and self._need_chunking(array)): # pragma: no cover
-                self._write_data(array)
-                array = bytearray()
+        for y in sorted(self._rows):
+            found = {}
 
-            array.append(c_hi)
-            array.append(c_lo)
+            for xs, xe in self._rows[y]:
+                rect = current.get((xs, xe))
 
-        self._write_data(array)
-        self._reset_window()
-        self.spi_close_override = False
-        self._end_write(reuse=False)
+                if rect is not None and rect[3] == y - 1:
+                    rect[3] = y
+                else:
+                    rect = [xs, y, xe, y]
+                    rects.append(rect)
 
-    def draw_circle(self, x0, y0, radius, color):
+                found[(xs, xe)] = rect
+
+            current = found
+
+        return [tuple(rect) for rect in rects]
+
+    def circle(self, x0, y0, radius):
         """
-        Draw a circle.
+        Add a filled circle.
 
         :param x0: Center point coordinate (x-axis).
         :type x0: int
@@ -450,17 +711,1192 @@ class CommonMethods:
         :type y0: int
         :param radius: The radius of the circle.
         :type radius: int
-        :param color: A 16-bit RGB color.
-        :type color: int
         """
-        f = 1 - radius
-        ddf_x = 1
-        ddf_y = -2 * radius
-        x = 0
-        y = radius
-        pixels = []
-        self.spi_close_override = True
-        self._start_write()
+        if radius < 0:
+            return
+
+        extents = self.__circle_extents(radius)
+
+        for dy in range(-radius, radius + 1):
+            dx = extents[abs(dy)]
+            self.add_span(y0 + dy, x0 - dx, x0 + dx)
+
+    def round_rect(self, x0, y0, x1, y1, radius):
+        """
+        Add a filled rectangle with rounded corners.
+
+        :param x0: Start point coordinate (x-axis).
+        :type x0: int
+        :param y0: Start point coordinate (y-axis).
+        :type y0: int
+        :param x1: End point coordinate (x-axis).
+        :type x1: int
+        :param y1: End point coordinate (y-axis).
+        :type y1: int
+        :param radius: The radius of the corners.
+        :type radius: int
+        """
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        radius = max(min(radius, (x1 - x0) // 2, (y1 - y0) // 2), 0)
+        extents = self.__circle_extents(radius)
+
+        for y in range(y0, y1 + 1):
+            dy = max(y0 + radius - y, y - (y1 - radius), 0)
+            inset = radius - extents[dy]
+            self.add_span(y, x0 + inset, x1 - inset)
+
+    def triangle(self, x0, y0, x1, y1, x2, y2):
+        """
+        Add a filled triangle.
+
+        :param x0: Corner 1 coordinate (x-axis).
+        :type x0: int
+        :param y0: Corner 1 coordinate (y-axis).
+        :type y0: int
+        :param x1: Corner 2 coordinate (x-axis).
+        :type x1: int
+        :param y1: Corner 2 coordinate (y-axis).
+        :type y1: int
+        :param x2: Corner 3 coordinate (x-axis).
+        :type x2: int
+        :param y2: Corner 3 coordinate (y-axis).
+        :type y2: int
+        """
+        # Sort coordinates by Y order (y2 >= y1 >= y0)
+        if y0 > y1:
+            y0, y1 = y1, y0
+            x0, x1 = x1, x0
+
+        if y1 > y2:
+            y2, y1 = y1, y2
+            x2, x1 = x1, x2
+
+        if y0 > y1:
+            y0, y1 = y1, y0
+            x0, x1 = x1, x0
+
+        # Handle awkward all-on-same-line case as its own thing.
+        if y0 == y2:
+            self.add_span(y0, min(x0, x1, x2), max(x0, x1, x2))
+            return
+
+        # The upper part uses edges 0-1 and 0-2, the lower part 1-2 and
+        # 0-2. A flat-bottomed triangle (y1 == y2) includes the y1
+        # scanline in the upper part, otherwise it is left to the lower
+        # part, this avoids a divide by zero in both.
+        last = y1 if y1 == y2 else y1 - 1
+
+        for y in range(y0, y2 + 1):
+            if y <= last:
+                a = x0 + (x1 - x0) * (y - y0) / (y1 - y0)
+            else:
+                a = x1 + (x2 - x1) * (y - y1) / (y2 - y1)
+
+            b = x0 + (x2 - x0) * (y - y0) / (y2 - y0)
+            self.add_span(y, a, b)
+
+    def polygon(self, points):
+        """
+        Add a filled polygon using the even-odd rule.
+
+        :param points: A list of (x, y) corners, the last corner is joined
+                       to the first.
+        :type points: list
+        """
+        edges = []
+
+        for idx, (xa, ya) in enumerate(points):
+            xb, yb = points[(idx + 1) % len(points)]
+
+            if ya == yb:
+                # Horizontal edges are added as they are.
+                self.add_span(ya, xa, xb)
+            else:
+                if yb < ya: xa, ya, xb, yb = xb, yb, xa, ya
+                edges.append((xa, ya, xb, yb))
+
+        if not edges:
+            return
+
+        top = max(min(ya for xa, ya, xb, yb in edges), 0)
+        bottom = min(max(yb for xa, ya, xb, yb in edges), self.max_y - 1)
+
+        for y in range(round(top), round(bottom) + 1):
+            # Half open edges so a shared corner is only counted once.
+            nodes = sorted(xa + (xb - xa) * (y - ya) / (yb - ya)
+                           for xa, ya, xb, yb in edges if ya <= y < yb)
+
+            for idx in range(0, len(nodes) - 1, 2):
+                self.add_span(y, nodes[idx], nodes[idx + 1])
+
+    def __circle_extents(self, radius):
+        """
+        Find the half width of each row of a circle with the midpoint
+        algorithm.
+
+        :return: A list indexed by the distance from the center row.
+        :rtype: list
+        """
+        extents = [0] * (radius + 1)
+        f = 1 - radius
+        ddf_x = 1
+        ddf_y = -2 * radius
+        x = 0
+        y = radius
+        extents[0] = radius
+
+        while x < y:
+            if f >= 0:
+                y -= 1
+                ddf_y += 2
+                f += ddf_y
+
+            x += 1
+            ddf_x += 2
+            f += ddf_x
+            extents[y] = max(extents[y], x)
+            extents[x] = max(extents[x], y)
+
+        return extents
+
+
+class CurrentFont:
+    """
+    Stores the currently used standard font.
+    """
+
+    def __init__(self, font=((), 0, 0, 0, 0, 0, False)):
+        self.set_font(font)
+
+    def set_font(self, font):
+        """
+        Set a standard font.
+
+        .. note::
+
+          Tuple definition: font = Full data object
+                            width = 1st byte in full data object
+                            height = 2nd byte in full data object
+                            offset = 3rd byte in full data object
+                            numchars = 4th byte in full data object
+                            nbrows = 2nd byte / 8 in full data object
+                            mono_sp = Boolean indicating if mono spaced
+
+        :param font: A parsed font object.
+        :type font: tuple
+        """
+        self.font = font[0]
+        self.width = font[1]
+        self.height = font[2]
+        self.offset = font[3]
+        self.numchars = font[4]
+        # Set number of bytes used by height of font in multiples of 8
+        self.nbrows = font[5] + 1 if self.height % 8 else font[5]
+        self.mono_sp = font[6]
+
+
+class GFXGlyph:
+    """
+    Glyph structure data.
+    """
+
+    def __init__(self, glyph):
+        self.bitmap_offset = glyph[0] # GFXFont.bitmap
+        self.width = glyph[1]         # Bitmap dimensions in pixels
+        self.height = glyph[2]
+        self.x_advance = glyph[3]     # Distance to advance cursor (x axis)
+        self.x_offset = glyph[4]      # Distance from cursor pos to UL corner
+        self.y_offset = glyph[5]
+
+
+class GFXFont:
+    """
+    Font meta data for the font bitmaps and glyphs.
+    """
+
+    def __init__(self, font):
+        self.bitmap = font[0]    # Bitmaps
+        self.glyph = font[1]     # Glyphs
+        self.first = font[2]     # ASCII extents
+        self.last = font[3]
+        self.y_advance = font[4] # Newline distance (y axis)
+
+
+class SPITransaction:
+    """
+    A reentrant context manager that keeps the SPI port selected, see
+    CommonMethods.transaction().
+    """
+
+    def __init__(self, tft):
+        """
+        Constructor
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        """
+        self._tft = tft
+        self.depth = 0
+
+    def __enter__(self):
+        if self.depth == 0:
+            self._tft._start_write()
+
+        self.depth += 1
+        return self._tft
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.depth -= 1
+
+        if self.depth == 0:
+            self._tft._end_write(reuse=False)
+
+        return False
+
+
+class CommonMethods:
+    """
+    These are common method accross all display types.
+    """
+    # The size in bytes of the buffer used to fill an area with one color.
+    FILL_CHUNK_SIZE = 4096
+    # The number of colors to keep fill buffers for.
+    FILL_CACHE_COLORS = 8
+
+    # 1: pixel width of 1 font character, 2: pixel height
+    _CFONT_HEADER_SIZE = 4
+
+    # Is bit out-of-range for value.
+    _BIT_READ = lambda self, value, bit: ((value) >> (bit)) & 0x01
+
+    ERROR_MSGS = {
+        'STD_FONT': "Please set a standard font before using this method.",
+        'GFX_FONT': "Please set a GFX font before using this method.",
+        'GFX_BAD_CH': "The character '{}' is not in the current font.",
+        'BRD_UNSUP': "Error: The {} board is not supported.",
+        'INV_PORT': "Invalid port for the {} board.",
+        'SCROLL_AREA': "Invalid scroll area, top: {}, bottom: {}.",
+        'PARTIAL_AREA': "Invalid partial area, start: {}, end: {}."
+        }
+
+    def __init__(self):
+        self._max_x = 0
+        self._max_y = 0
+        self.__orientation = 0
+        # Orientation 0 is the native orientation.
+        self._orient_coordinates = self.__native
+        self._native_coordinates = self.__native
+        self._logical_coordinates = self.__native
+        self._clear_scroll()
+        self._clear_partial()
+        self.__brightness = 0
+        self.__spi_close_override = False
+        self.__spi_session = False
+        self._transaction = SPITransaction(self)
+        self._fb = None
+        self._fb_window = None
+        self._fill_cache = {}
+        self._draw_stats = None
+        self._tracer = None
+        # The DrawStats and Tracer objects wrapping methods, in the order
+        # they were attached.
+        self._hooks = []
+        self._current_font = None
+        self._cfont = CurrentFont()
+        self._gfx_font = None
+
+    @property
+    def spi_close_override(self):
+        """
+        Returns the override state of the SPI interface.
+
+        :return: If the override is active the result is True,
+                 if not active it is False.
+        :rtype: bool
+        """
+        return self.__spi_close_override
+
+    @spi_close_override.setter
+    def spi_close_override(self, value):
+        """
+        Sets the override state of the SPI interface.
+
+        .. deprecated::
+
+          Use ``with tft.transaction():`` around the writes instead, the
+          port is also kept open between transactions once begin() has
+          been called.
+
+        :param value: If True the SPI interface close is overridden
+                      else if False it is not overridden.
+        :type value: bool
+        """
+        if warn is not None:
+            warn("spi_close_override is deprecated, use transaction().",
+                 DeprecationWarning, stacklevel=2)
+
+        self.__spi_close_override = value
+
+    @property
+    def spi_session(self):
+        """
+        Check if the SPI port is being kept open between writes.
+
+        :return: True if the session is open else False.
+        :rtype: bool
+        """
+        return self.__spi_session
+
+    @property
+    def cs_hold(self):
+        """
+        Check if the chip select is held for a whole transaction.
+
+        :return: True if held else False.
+        :rtype: bool
+        """
+        return self._cs_hold
+
+    @cs_hold.setter
+    def cs_hold(self, flag):
+        """
+        Hold the chip select low from the start to the end of a
+        transaction instead of toggling it for every write.
+
+        :param flag: True hold the chip select, False toggle it for every
+                     write.
+        :type flag: bool
+        """
+        self._cs_hold = bool(flag)
+
+        if not flag and not self._transaction.depth:
+            self.digital_write(self._cs, self.HIGH)
+
+    @property
+    def draw_stats(self):
+        """
+        Get the counters kept for each drawing method.
+
+        :return: The counters if turned on else None.
+        :rtype: DrawStats
+        """
+        return self._draw_stats
+
+    @draw_stats.setter
+    def draw_stats(self, flag):
+        """
+        Turn on or off the counters kept for each drawing method, see
+        utils/draw_stats.py.
+
+        :param flag: True turn on the counters, False turn them off.
+        :type flag: bool
+        """
+        if flag and self._draw_stats is None:
+            from .draw_stats import DrawStats
+
+            self._draw_stats = DrawStats()
+            self._add_hook(self._draw_stats)
+        elif not flag and self._draw_stats is not None:
+            self._remove_hook(self._draw_stats)
+            self._draw_stats = None
+
+    @property
+    def trace(self):
+        """
+        Get the timeline of the drawing methods, SPI writes and delays.
+
+        :return: The tracer if turned on else None.
+        :rtype: Tracer
+        """
+        return self._tracer
+
+    @trace.setter
+    def trace(self, flag):
+        """
+        Turn on or off tracing, see utils/trace.py.
+
+        :param flag: True turn on tracing, False turn it off.
+        :type flag: bool
+        """
+        if flag and self._tracer is None:
+            from .trace import Tracer
+
+            self._tracer = Tracer()
+            self._add_hook(self._tracer)
+        elif not flag and self._tracer is not None:
+            self._remove_hook(self._tracer)
+            self._tracer = None
+
+    def _add_hook(self, hook):
+        """
+        Wrap methods with a hook, it wraps the methods of any hook added
+        before it.
+
+        :param hook: An object with attach() and detach() methods.
+        :type hook: DrawStats or Tracer
+        """
+        self._hooks.append(hook)
+        hook.attach(self)
+
+    def _remove_hook(self, hook):
+        """
+        Remove the wrappers of a hook, the hooks can be removed in any
+        order. All the hooks are detached last one first so each puts back
+        what it replaced, then the others are attached again.
+
+        :param hook: A hook added with _add_hook().
+        :type hook: DrawStats or Tracer
+        """
+        for item in reversed(self._hooks):
+            item.detach(self)
+
+        self._hooks.remove(hook)
+
+        for item in self._hooks:
+            item.attach(self)
+
+    def get_stats(self):
+        """
+        Get the performance counters.
+
+        :return: A dict of counter names and values, when the draw_stats
+                 are on they are under the 'methods' key.
+        :rtype: dict
+        """
+        stats = dict(self.gpio_stats)
+        if self._fb is not None: stats.update(self._fb.stats)
+
+        if self._draw_stats is not None:
+            stats['methods'] = self._draw_stats.as_dict()
+
+        return stats
+
+    def reset_stats(self):
+        """
+        Reset the performance counters.
+        """
+        for key in self.gpio_stats:
+            self.gpio_stats[key] = 0
+
+        if self._fb is not None: self._fb.reset_stats()
+        if self._draw_stats is not None: self._draw_stats.reset()
+
+    def transaction(self):
+        """
+        Get a context manager that keeps the SPI port selected for all the
+        writes done inside it. Transactions can be nested, only the
+        outermost one starts and ends the writes.
+
+        .. code-block:: python
+
+            with tft.transaction():
+                tft.draw_rectangle(10, 10, 50, 50, Colors.RED)
+                tft.draw_line(10, 10, 50, 50, Colors.RED)
+
+        :return: The context manager.
+        :rtype: SPITransaction
+        """
+        return self._transaction
+
+    def clear(self, x0=None, y0=None, x1=None, y1=None, color=Colors.BLACK):
+        """
+        Overwrites the entire display with the color black.
+
+        .. note::
+
+          This method can be used to clear, to the previously set
+          background color, a rectilinear area to clear a previous object
+          on the display. Circles can be cleared however the area must be
+          rectilinear. Any intersecting lines or objects will also be cleared.
+
+        :param x0: Start x coordinate.
+        :type x0: int
+        :param y0, Start y coordinate.
+        :type y0: int
+        :param x1: End x coordinate.
+        :type x1: int
+        :param y1, End y coordinate.
+        :type y1: int
+        """
+        if any([True for v in (x0, y0, x1, y1) if v is None]):
+            self.set_display_background(color)
+        else:
+            self.fill_rectangle(x0, y0, x1, y1, color)
+
+    def set_display_background(self, color):
+        """
+        Set the background color of the display.
+
+        :param color: The RGB color for the display, default is black.
+        :type color: int
+        """
+        old_orientation = self.orientation
+        self.orientation = 0
+        self.fill_rectangle(0, 0, self.max_x - 1, self.max_y - 1, color)
+        self.orientation = old_orientation
+        self.delay(10)
+
+    def set_framebuffer(self, flag, *, diff=False):
+        """
+        Turn the off-screen frame buffer on or off.
+
+        .. note::
+
+          While the frame buffer is on all drawing is done in memory and
+          nothing is sent to the display until show() is called. The
+          buffer starts out black, the same as the display after begin().
+          Turning the frame buffer off discards any changes that have not
+          been shown.
+
+          With diff turned on show() compares the dirty areas, a tile at
+          a time, against a shadow copy of what was last sent and only
+          sends the tiles that changed. This doubles the memory used but
+          makes redrawing the whole screen every time almost free if
+          little has changed.
+
+        :param flag: True = frame buffer on and False = frame buffer off.
+        :type flag: bool
+        :param diff: True = only send changed tiles (default False).
+        :type diff: bool
+        """
+        if flag:
+            if self._fb is None or self._fb.is_diff != diff:
+                self._fb = FrameBuffer(self.LCD_WIDTH, self.LCD_HEIGHT,
+                                       diff=diff)
+        else:
+            self._fb = None
+            self._fb_window = None
+
+    @property
+    def framebuffer(self):
+        """
+        Get the frame buffer.
+
+        :return: The FrameBuffer object or None if it is not turned on.
+        :rtype: FrameBuffer
+        """
+        return self._fb
+
+    def show(self):
+        """
+        Send the dirty areas of the frame buffer to the display. Each
+        dirty rectangle is sent with a single window and data burst. If
+        diff is being used only the changed tiles in the dirty areas are
+        sent.
+        """
+        self._run(self._iter_show())
+
+    def _iter_show(self):
+        """
+        Generator version of show(), yields after each dirty area.
+        """
+        fb = self._fb
+
+        if fb is None:
+            return
+
+        dirty = fb.pop_dirty()
+        if fb.is_diff: dirty = fb.diff_tiles(dirty)
+
+        if not dirty:
+            return
+
+        # Turn off the frame buffer so the writes below go to the display.
+        self._fb = None
+        self._fb_window = None
+        old_orientation = self.orientation
+        self.orientation = 0
+
+        try:
+            with self.transaction():
+                for rect in dirty:
+                    for x0, y0, x1, y1 in self._scroll_bands(*rect):
+                        self._set_window(x0, y0, x1, y1,
+                                         self.MODE_L2R_TOP_DOWN)
+                        self._write_data(fb.region(x0, y0, x1, y1))
+
+                    yield
+
+                self._reset_window()
+        finally:
+            self.orientation = old_orientation
+            self._fb = fb
+
+    def set_backlight(self, flag, brightness=None):
+        """
+        Set the backlight on or off and set the brightness if there
+        is an LED pin.
+
+        :param flag: True = backlight on and False = backlight off.
+        :type flag: bool
+        :param brightness: The brightness of the display, it defaults to
+                           full brightness.
+        :type brightness: int
+        """
+        # This fixes the subclass issue where MAX_BRIGHTNESS is not
+        # available until instantiation.
+        brightness = self.MAX_BRIGHTNESS if brightness is None else brightness
+
+        self._bl_state = flag
+
+        if self._led != -1:
+            self.brightness = brightness
+            self.change_led_duty_cycle(
+                self.brightness if self._bl_state else 0)
+
+    @property
+    def brightness(self):
+        """
+        Get the current brightness.
+        """
+        return self.__brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        """
+        Set a different brightness.
+
+        :param brightness: The brightness value to set (0 .. 255)
+        """
+        self.__brightness = brightness % (self.MAX_BRIGHTNESS + 1)
+
+    @property
+    def orientation(self):
+        """
+        Get the orientation.
+
+        :return: Return the current orientation.
+        :rtype: int
+        """
+        return self.__orientation
+
+    @orientation.setter
+    def orientation(self, orientation):
+        """
+        Set the orientation.
+
+        :param orientation: 0=portrait, 1=right rotated landscape,
+                            2=reverse portrait, 3=left rotated landscape
+        :type orientation: int
+        """
+        self.__orientation = orientation % 4
+
+        if self.__orientation == 0: # 0=portrait
+            self._max_x = self.LCD_WIDTH
+            self._max_y = self.LCD_HEIGHT
+        elif self.__orientation == 1: # 1=right rotated landscape
+            self._max_x = self.LCD_HEIGHT
+            self._max_y = self.LCD_WIDTH
+        elif self.__orientation == 2: # 2=reverse portrait
+            self._max_x = self.LCD_WIDTH
+            self._max_y = self.LCD_HEIGHT
+        elif self.__orientation == 3: # 3=left rotated landscape
+            self._max_x = self.LCD_HEIGHT
+            self._max_y = self.LCD_WIDTH
+
+        # The transforms are picked here once, so drawing does not test
+        # the orientation for every pixel. The frame buffer is always in
+        # the native coordinates, writes to the display are not when the
+        # controller does the rotation.
+        self._native_coordinates = self.__transform(self.__orientation)
+        self._logical_coordinates = self.__inverse(self.__orientation)
+
+        if self._set_scan_direction(self.__orientation):
+            self._orient_coordinates = self.__native
+        else:
+            self._orient_coordinates = self._native_coordinates
+
+    def _set_scan_direction(self, orientation):
+        """
+        Set the order the controller writes its memory in so it does the
+        rotation. Display classes whose controller can do this override
+        this method.
+
+        :param orientation: The orientation, 0..3.
+        :type orientation: int
+        :return: True if the controller does the rotation, False if the
+                 coordinates need to be rotated in software.
+        :rtype: bool
+        """
+        return False
+
+    def __transform(self, orientation):
+        """
+        Get the function that turns coordinates in an orientation into
+        native coordinates.
+        """
+        w = self.LCD_WIDTH - 1
+        h = self.LCD_HEIGHT - 1
+
+        if orientation == 1:
+            return lambda x, y: (w - y, x)
+        elif orientation == 2:
+            return lambda x, y: (w - x, h - y)
+        elif orientation == 3:
+            return lambda x, y: (y, h - x)
+
+        return self.__native
+
+    def __inverse(self, orientation):
+        """
+        Get the function that turns native coordinates into coordinates
+        in an orientation.
+        """
+        w = self.LCD_WIDTH - 1
+        h = self.LCD_HEIGHT - 1
+
+        if orientation == 1:
+            return lambda x, y: (y, w - x)
+        elif orientation == 2:
+            return lambda x, y: (w - x, h - y)
+        elif orientation == 3:
+            return lambda x, y: (h - y, x)
+
+        return self.__native
+
+    @staticmethod
+    def __native(x, y):
+        return x, y
+
+    @property
+    def max_x(self):
+        """
+        Get the display max x size. The value is based on the orientation.
+
+        .. note::
+
+          Either 0..LCD_WIDTH or 0..LCD_HEIGHT depending on orientation.
+
+        :return: Horizontal size of the display in pixels.
+        :rtype: int
+        """
+        return self._max_x
+
+    @property
+    def max_y(self):
+        """
+        Get the display max y size. The value is based on the orientation.
+
+        .. note::
+
+          Either 0..LCD_WIDTH or 0..LCD_HEIGHT depending on orientation.
+
+        :return: Vertical size of the display in pixels.
+        :rtype: int
+        """
+        return self._max_y
+
+    def set_scroll_area(self, top=0, bottom=0):
+        """
+        Set the area that is scrolled by the display, the rows above and
+        below it do not move. The scroll offset is set back to 0.
+
+        .. note::
+
+          The rows are those of orientation 0, in orientations 1 and 3
+          the area scrolls horizontally. The display classes write the
+          area with _write_scroll_area() and the offset with
+          _write_scroll_offset().
+
+        :param top: The number of fixed rows at the top.
+        :type top: int
+        :param bottom: The number of fixed rows at the bottom.
+        :type bottom: int
+        :raises TFTException: If no rows are left to scroll.
+        """
+        rows = self.LCD_HEIGHT - top - bottom
+
+        if top < 0 or bottom < 0 or rows <= 0:
+            raise TFTException(self.ERROR_MSGS['SCROLL_AREA'].format(
+                top, bottom))
+
+        self._scroll_top = top
+        self._scroll_rows = rows
+        self._scroll_offset = 0
+
+        with self.transaction():
+            self._write_scroll_area(top, rows, bottom)
+            self._write_scroll_offset(0)
+
+    @property
+    def scroll_offset(self):
+        """
+        Get the number of rows the scroll area is scrolled by.
+
+        :return: The scroll offset.
+        :rtype: int
+        """
+        return self._scroll_offset
+
+    @scroll_offset.setter
+    def scroll_offset(self, offset):
+        """
+        Set the number of rows the scroll area is scrolled by.
+
+        :param offset: The scroll offset, it wraps around the number of
+                       rows in the scroll area.
+        :type offset: int
+        """
+        self._scroll_offset = offset % self._scroll_rows
+
+        with self.transaction():
+            self._write_scroll_offset(self._scroll_offset)
+
+    def scroll(self, lines):
+        """
+        Scroll the scroll area, only the scroll offset is written.
+
+        .. note::
+
+          Drawing is still done in display coordinates, the coordinates
+          are moved to where the rows are in the display memory. The rows
+          that scroll in show what scrolled out, so draw over them with
+          the new line.
+
+          .. code-block:: python
+
+            tft.set_scroll_area(top=16)
+            x0, y0, x1, y1 = tft.scroll(16)
+            tft.clear(x0, y0, x1, y1)
+            tft.draw_text(x0, y0, "A new line")
+
+        :param lines: The number of rows to scroll, positive moves the
+                      content up and negative down.
+        :type lines: int
+        :return: The rectangle (x0, y0, x1, y1) of the rows that scrolled
+                 in, or None if nothing scrolled.
+        :rtype: tuple
+        """
+        self.scroll_offset = self._scroll_offset + lines
+        count = min(abs(lines), self._scroll_rows)
+
+        if count == 0:
+            return None
+
+        if lines > 0:
+            r0 = self._scroll_top + self._scroll_rows - count
+        else:
+            r0 = self._scroll_top
+
+        x0, y0 = self._logical_coordinates(0, r0)
+        x1, y1 = self._logical_coordinates(self.LCD_WIDTH - 1,
+                                           r0 + count - 1)
+        return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+    def _clear_scroll(self):
+        """
+        Forget the scroll area, the reset in begin() puts the display
+        back to scrolling every row with no offset.
+        """
+        self._scroll_top = 0
+        self._scroll_rows = self.LCD_HEIGHT
+        self._scroll_offset = 0
+
+    def _scroll_coordinates(self, x, y):
+        """
+        Move a point in the scroll area to where its row is in the display
+        memory.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :return: The moved point (x, y).
+        :rtype: tuple
+        """
+        if not self._scroll_offset:
+            return x, y
+
+        nx, ny = self._native_coordinates(x, y)
+        top = self._scroll_top
+
+        if top <= ny < top + self._scroll_rows:
+            ny = top + (ny - top + self._scroll_offset) % self._scroll_rows
+
+        return self._logical_coordinates(nx, ny)
+
+    def _scroll_bands(self, x0, y0, x1, y1):
+        """
+        Split a rectangle into the parts whose rows are next to each other
+        in the display memory, a window can only be set on one of them.
+        When a partial area is set the rectangle is clipped to it.
+
+        :return: A list of rectangles (x0, y0, x1, y1), the rectangle is
+                 returned as it is when the display is not scrolled and
+                 has no partial area.
+        :rtype: list
+        """
+        if not self._scroll_offset and self._partial_area is None:
+            return [(x0, y0, x1, y1)]
+
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        cx0, cy0, cx1, cy1 = self._clip_rect()
+        x0 = max(round(x0), cx0)
+        y0 = max(round(y0), cy0)
+        x1 = min(round(x1), cx1)
+        y1 = min(round(y1), cy1)
+
+        if x1 < x0 or y1 < y0:
+            return []
+
+        if not self._scroll_offset:
+            return [(x0, y0, x1, y1)]
+
+        nx0, ny0 = self._native_coordinates(x0, y0)
+        nx1, ny1 = self._native_coordinates(x1, y1)
+        if ny1 < ny0: ny0, ny1 = ny1, ny0
+        top = self._scroll_top
+        end = top + self._scroll_rows
+        # The first row in the display memory is shown here.
+        wrap = end - self._scroll_offset
+        rows = []
+
+        for edge in (top, wrap, end):
+            if ny0 < edge <= ny1:
+                rows.append((ny0, edge - 1))
+                ny0 = edge
+
+        rows.append((ny0, ny1))
+        rects = []
+
+        for r0, r1 in rows:
+            x0, y0 = self._logical_coordinates(nx0, r0)
+            x1, y1 = self._logical_coordinates(nx1, r1)
+            rects.append((min(x0, x1), min(y0, y1), max(x0, x1),
+                          max(y0, y1)))
+
+        return rects
+
+    def _scroll_runs(self, runs):
+        """
+        Split runs of points where they are not next to each other in the
+        display memory.
+
+        :param runs: A list of runs from _find_runs().
+        :type runs: list
+        :return: The runs that can each be drawn with one window.
+        :rtype: list
+        """
+        if not self._scroll_offset:
+            return runs
+
+        split = []
+
+        for run in runs:
+            part = [run[0]]
+            last = self._scroll_coordinates(*run[0])
+
+            for point in run[1:]:
+                moved = self._scroll_coordinates(*point)
+
+                if abs(moved[0] - last[0]) + abs(moved[1] - last[1]) != 1:
+                    split.append(part)
+                    part = []
+
+                part.append(point)
+                last = moved
+
+            split.append(part)
+
+        return split
+
+    def set_partial_area(self, start, end):
+        """
+        Only refresh the rows from start to end, the rest of the display
+        shows nothing. Drawing outside the area is skipped.
+
+        .. note::
+
+          The rows are those of orientation 0, in orientations 1 and 3
+          they are columns. What was drawn outside the area is not in the
+          display memory when the partial area is cleared, redraw it or
+          use the frame buffer which keeps it. The display classes write
+          the area with _write_partial_area().
+
+          .. code-block:: python
+
+            tft.set_partial_area(200, 219)
+            tft.idle_mode = True
+            tft.draw_text(0, 202, "12:30")
+
+        :param start: The first row that is refreshed.
+        :type start: int
+        :param end: The last row that is refreshed.
+        :type end: int
+        :raises TFTException: If the rows are not on the display or start
+                              is after end.
+        """
+        if not 0 <= start <= end < self.LCD_HEIGHT:
+            raise TFTException(self.ERROR_MSGS['PARTIAL_AREA'].format(
+                start, end))
+
+        self._partial_area = (start, end)
+
+        with self.transaction():
+            self._write_partial_area(start, end)
+
+    def clear_partial_area(self):
+        """
+        Refresh the whole display again. If the frame buffer is on all of
+        it is sent with the next show().
+        """
+        self._partial_area = None
+
+        with self.transaction():
+            self._write_partial_area(None, None)
+
+        if self._fb is not None:
+            self._fb.mark_dirty(0, 0, self.LCD_WIDTH - 1,
+                                self.LCD_HEIGHT - 1)
+
+    @property
+    def partial_area(self):
+        """
+        Get the rows that are refreshed.
+
+        :return: The first and last row (start, end) or None if the whole
+                 display is refreshed.
+        :rtype: tuple
+        """
+        return self._partial_area
+
+    @property
+    def idle_mode(self):
+        """
+        Check if the display is in idle mode.
+
+        :return: True if only 8 colors are shown else False.
+        :rtype: bool
+        """
+        return self._idle_mode
+
+    @idle_mode.setter
+    def idle_mode(self, flag):
+        """
+        Set idle mode, the display shows 8 colors using only the most
+        significant bit of red, green, and blue, which uses less power.
+
+        :param flag: True turn idle mode on, False turn it off.
+        :type flag: bool
+        """
+        self._idle_mode = bool(flag)
+
+        with self.transaction():
+            self._write_idle_mode(self._idle_mode)
+
+    def _clear_partial(self):
+        """
+        Forget the partial area and idle mode, the reset in begin() puts
+        the display back to refreshing every row in full color.
+        """
+        self._partial_area = None
+        self._idle_mode = False
+
+    def _clip_rect(self):
+        """
+        Get the rectangle that can be drawn on, it is the whole display
+        unless a partial area is set.
+
+        :return: The rectangle (x0, y0, x1, y1).
+        :rtype: tuple
+        """
+        if self._partial_area is None:
+            return 0, 0, self.max_x - 1, self.max_y - 1
+
+        start, end = self._partial_area
+        x0, y0 = self._logical_coordinates(0, start)
+        x1, y1 = self._logical_coordinates(self.LCD_WIDTH - 1, end)
+        return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+    def draw_rectangle(self, x0, y0, x1, y1, color):
+        """
+        Draw a rectangle using rectangular coordinates.
+
+        :param x0: Start point coordinate (x0-axis).
+        :type x0: int
+        :param y0: Center point coordinate (y0-axis).
+        :type y0: int
+        :param x1: Center point coordinate (x1-axis).
+        :type x1: int
+        :param y1: Center point coordinate (y1-axis).
+        :type y1: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        self._run(self._iter_draw_rectangle(x0, y0, x1, y1, color))
+
+    def _iter_draw_rectangle(self, x0, y0, x1, y1, color):
+        """
+        Generator version of draw_rectangle().
+        """
+        with self.transaction():
+            yield from self._iter_fill_span(x0, y0, x0, y1, color)
+            yield from self._iter_fill_span(x0, y0, x1, y0, color)
+            yield from self._iter_fill_span(x0, y1, x1, y1, color)
+            yield from self._iter_fill_span(x1, y0, x1, y1, color)
+            self._reset_window()
+
+    def fill_rectangle(self, x0, y0, x1, y1, color):
+        """
+        Fill a rectangle using rectangular coordinates.
+
+        :param x0: Start point coordinate (x0-axis).
+        :type x0: int
+        :param y0: Center point coordinate (y0-axis).
+        :type y0: int
+        :param x1: Center point coordinate (x1-axis).
+        :type x1: int
+        :param y1: Center point coordinate (y1-axis).
+        :type y1: int
+        :param color: A 16-bit RGB color
+        :type color: int
+        """
+        self._run(self._iter_fill_rectangle(x0, y0, x1, y1, color))
+
+    def _iter_fill_rectangle(self, x0, y0, x1, y1, color):
+        """
+        Generator version of fill_rectangle().
+        """
+        if self._fb is not None:
+            rect = self._fb_rect(x0, y0, x1, y1)
+            if rect is not None: self._fb.fill_rect(*rect, color)
+            return
+
+        with self.transaction():
+            for x0, y0, x1, y1 in self._scroll_bands(x0, y0, x1, y1):
+                self._set_window(x0, y0, x1, y1)
+                yield from self._iter_write_color(
+                    color, round((y1 - y0 + 1) * (x1 - x0 + 1)))
+
+            self._reset_window()
+
+    def draw_circle(self, x0, y0, radius, color):
+        """
+        Draw a circle.
+
+        :param x0: Center point coordinate (x-axis).
+        :type x0: int
+        :param y0: Center point coordinate (y-axis).
+        :type y0: int
+        :param radius: The radius of the circle.
+        :type radius: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        self._run(self._iter_draw_circle(x0, y0, radius, color))
+
+    def _iter_draw_circle(self, x0, y0, radius, color):
+        """
+        Generator version of draw_circle().
+        """
+        f = 1 - radius
+        ddf_x = 1
+        ddf_y = -2 * radius
+        x = 0
+        y = radius
+        pixels = []
 
         pixels.append((x0, y0 + radius, color))
         pixels.append((x0, y0 - radius, color))
@@ -486,9 +1922,7 @@ class CommonMethods:
             pixels.append((x0 + y, y0 - x, color))
             pixels.append((x0 - y, y0 - x, color))
 
-        self.draw_pixels(pixels)
-        self._end_write(reuse=False)
-        self.spi_close_override = False
+        yield from self._iter_draw_pixels(pixels)
 
     def fill_circle(self, x0, y0, radius, color):
         """
@@ -503,32 +1937,9 @@ class CommonMethods:
         :param color: A 16-bit RGB color.
         :type color: int
         """
-        f = 1 - radius
-        ddf_x = 1
-        ddf_y = -2 * radius
-        x = 0
-        y = radius
-        self.spi_close_override = True
-        self._start_write()
-
-        while x < y:
-            if f >= 0:
-                y -= 1
-                ddf_y += 2
-                f += ddf_y
-
-            x += 1
-            ddf_x += 2
-            f += ddf_x
-
-            self.draw_line(x0 + x, y0 + y, x0 - x, y0 + y, color) # bottom
-            self.draw_line(x0 + x, y0 - y, x0 - x, y0 - y, color) # top
-            self.draw_line(x0 + y, y0 - x, x0 + y, y0 + x, color) # right
-            self.draw_line(x0 - y, y0 - x, x0 - y, y0 + x, color) # left
-
-        self.spi_close_override = False
-        self._end_write(reuse=False)
-        self.fill_rectangle(x0 - x, y0 - y, x0 + x, y0 + y, color)
+        raster = SpanRasterizer(self.max_x, self.max_y)
+        raster.circle(x0, y0, radius)
+        self._fill_raster(raster, color)
 
     def draw_triangle(self, x0, y0, x1, y1, x2, y2, color):
         """
@@ -549,13 +1960,16 @@ class CommonMethods:
         :param color: A 16-bit RGB color.
         :type color: int
         """
-        self.spi_close_override = True
-        self._start_write()
-        self.draw_line(x0, y0, x1, y1, color)
-        self.draw_line(x1, y1, x2, y2, color)
-        self.draw_line(x2, y2, x0, y0, color)
-        self.spi_close_override = False
-        self._end_write(reuse=False)
+        self._run(self._iter_draw_triangle(x0, y0, x1, y1, x2, y2, color))
+
+    def _iter_draw_triangle(self, x0, y0, x1, y1, x2, y2, color):
+        """
+        Generator version of draw_triangle().
+        """
+        with self.transaction():
+            yield from self._iter_draw_line(x0, y0, x1, y1, color)
+            yield from self._iter_draw_line(x1, y1, x2, y2, color)
+            yield from self._iter_draw_line(x2, y2, x0, y0, color)
 
     def fill_triangle(self, x0, y0, x1, y1, x2, y2, color):
         """
@@ -576,85 +1990,43 @@ class CommonMethods:
         :param color: A 16-bit RGB color.
         :type color: int
         """
-        # Sort coordinates by Y order (y2 >= y1 >= y0)
-        if y0 > y1:
-            y0, y1 = y1, y0
-            x0, x1 = x1, x0
-
-        if y1 > y2:
-            y2, y1 = y1, y2
-            x2, x1 = x1, x2
-
-        # Handle awkward all-on-same-line case as its own thing.
-        if y0 == y2:
-            a = b = x0
-
-            if x1 < a: a = x1
-            elif x2 > b: b = x1
+        raster = SpanRasterizer(self.max_x, self.max_y)
+        raster.triangle(x0, y0, x1, y1, x2, y2)
+        self._fill_raster(raster, color)
 
-            if x2 < a: a = x2
-            elif x2 > b: b = x2
-
-            self.draw_line(a, y0, b, y0, color)
-            return
+    def fill_round_rectangle(self, x0, y0, x1, y1, radius, color):
+        """
+        Fill a rectangle with rounded corners.
 
-        dx11 = x1 - x0
-        dy11 = y1 - y0
-        dx12 = x2 - x0
-        dy12 = y2 - y0
-        dx22 = x2 - x1
-        dy22 = y2 - y1
-
-        # For upper part of triangle, find scanline crossings for segments
-        # 0-1 and 0-2. If y1=y2 (flat-bottomed triangle), the scanline y2
-        # is included here (and second loop will be skipped, avoiding a /0
-        # error there), otherwise scanline y1 is skipped here and handled
-        # in the second loop...which also avoids a /0 error here if y0=y1
-        # (flat-topped triangle).
-        if y1 == y2:
-            last = y1     # Include y1 scanline
-        else:
-            last = y1 - 1 # Skip it
+        :param x0: Start point coordinate (x0-axis).
+        :type x0: int
+        :param y0: Start point coordinate (y0-axis).
+        :type y0: int
+        :param x1: End point coordinate (x1-axis).
+        :type x1: int
+        :param y1: End point coordinate (y1-axis).
+        :type y1: int
+        :param radius: The radius of the corners.
+        :type radius: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        raster = SpanRasterizer(self.max_x, self.max_y)
+        raster.round_rect(x0, y0, x1, y1, radius)
+        self._fill_raster(raster, color)
 
-        y = y0
-        sa = 0
-        sb = 0
-        self.spi_close_override = True
-        self._start_write()
+    def fill_polygon(self, points, color):
+        """
+        Fill a polygon using the even-odd rule.
 
-        while y <= last:
-            a = x0 + sa / dy11
-            b = x0 + sb / dy12
-            sa += dx11
-            sb += dx12
-
-            # longhand:
-            # a = x0 + (x1 - x0) * (y - y0) / (y1 - y0)
-            # b = x0 + (x2 - x0) * (y - y0) / (y2 - y0)
-            if a > b: a, b = b, a
-            self.draw_line(a, y, b, y, color)
-            y += 1
-
-        # For lower part of triangle, find scanline crossings for segments
-        # 0-2 and 1-2.  This loop is skipped if y1=y2.
-        sa = dx22 * (y - y1)
-        sb = dx12 * (y - y0)
-
-        while y <= y2:
-            a = x1 + sa / dy22
-            b = x0 + sb / dy12
-            sa += dx22
-            sb += dx12
-
-            # longhand:
-            # a = x1 + (x2 - x1) * (y - y1) / (y2 - y1)
-            # b = x0 + (x2 - x0) * (y - y0) / (y2 - y0)
-            if a > b: a, b = b, a
-            self.draw_line(a, y, b, y, color)
-            y += 1
-
-        self.spi_close_override = False
-        self._end_write(reuse=False)
+        :param points: A list of corners: [(x, y),...].
+        :type points: list
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        raster = SpanRasterizer(self.max_x, self.max_y)
+        raster.polygon(points)
+        self._fill_raster(raster, color)
 
     def draw_line(self, x0, y0, x1, y1, color):
         """
@@ -671,6 +2043,25 @@ class CommonMethods:
         :param color: A 16-bit RGB color.
         :type color: int
         """
+        self._run(self._iter_draw_line(x0, y0, x1, y1, color))
+
+    def _iter_draw_line(self, x0, y0, x1, y1, color):
+        """
+        Generator version of draw_line(), a straight line is one write so
+        it yields once.
+        """
+        if y0 == y1:
+            if x1 < x0: x0, x1 = x1, x0
+            self.draw_hline(x0, y0, x1 - x0 + 1, color)
+            yield
+            return
+
+        if x0 == x1:
+            if y1 < y0: y0, y1 = y1, y0
+            self.draw_vline(x0, y0, y1 - y0 + 1, color)
+            yield
+            return
+
         # Classic Bresenham algorithm
         steep = abs(y1 - y0) > abs(x1 - x0)
 
@@ -692,7 +2083,6 @@ class CommonMethods:
             ystep = -1
 
         pixels = []
-        self._start_write()
 
         while x0 <= x1:
             if steep:
@@ -708,85 +2098,566 @@ class CommonMethods:
 
             x0 += 1
 
+        yield from self._iter_draw_pixels(pixels)
+
+    def draw_hline(self, x, y, width, color):
+        """
+        Draw a horizontal line with one window and one data write.
+
+        :param x: Start point coordinate (x-axis).
+        :type x: int
+        :param y: Start point coordinate (y-axis).
+        :type y: int
+        :param width: The length of the line in pixels, a negative length
+                      draws to the left of and including x, zero draws
+                      nothing.
+        :type width: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        self._run(self._iter_draw_hline(x, y, width, color))
+
+    def _iter_draw_hline(self, x, y, width, color):
+        """
+        Generator version of draw_hline().
+        """
+        if width < 0:
+            x += width + 1
+            width = -width
+
+        if width < 1:
+            return
+
+        with self.transaction():
+            if (yield from self._iter_fill_span(x, y, x + width - 1, y,
+                                                color)):
+                self._reset_window()
+
+    def draw_vline(self, x, y, height, color):
+        """
+        Draw a vertical line with one window and one data write.
+
+        :param x: Start point coordinate (x-axis).
+        :type x: int
+        :param y: Start point coordinate (y-axis).
+        :type y: int
+        :param height: The length of the line in pixels, a negative length
+                       draws above and including y, zero draws nothing.
+        :type height: int
+        :param color: A 16-bit RGB color.
+        :type color: int
+        """
+        self._run(self._iter_draw_vline(x, y, height, color))
+
+    def _iter_draw_vline(self, x, y, height, color):
+        """
+        Generator version of draw_vline().
+        """
+        if height < 0:
+            y += height + 1
+            height = -height
+
+        if height < 1:
+            return
+
+        with self.transaction():
+            if (yield from self._iter_fill_span(x, y, x, y + height - 1,
+                                                color)):
+                self._reset_window()
+
+    #
+    # Beginning of standard font methods.
+    #
+    def set_font(self, font, mono_sp=False):
+        """
+        Set the current font.
+
+        :param font: The name of the font.
+        :type font: str
+        :param mono_sp: True = Mono spaced, False = Proportional
+        :type mono_sp: bool
+        """
+        #       font, width,   height,  offset,  numchars, height / 8
+        args = (font, font[0], font[1], font[2], font[3], font[1] // 8,
+                mono_sp)
+        self._cfont.set_font(args)
+
+    def get_font(self):
+        """
+        Get the current font.
+
+        :return: The current font.
+        :rtype: CurrentFont
+        """
+        return self._cfont
+
+    def draw_char(self, x, y, ch, color=Colors.WHITE, bg_color=Colors.BLACK):
+        """
+        Draw a character.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param ch: The character to draw on the display.
+        :type ch: str
+        :param color: A 16-bit RGB color (default=white).
+        :type color: int
+        :param bg_color: Set the character background color (default = black).
+        :type bg_color: int
+        :return: Width of the character in display pixels.
+        :rtype: int
+        :raises TFTException: If the a standard font is not set.
+        """
+        self._is_font_set()
+        char_offset = self.__get_offset(ch)
+
+        # Monospaced: Get char width from font.
+        if self._cfont.mono_sp:
+            char_width = self._cfont.width
+        else:
+            char_width = self._cfont.font[char_offset]
+
+        char_offset += 1
+        # Use autoincrement/decrement feature, if character fits
+        # completely on the screen.
+        rect = (x, y, x + char_width + 1, y + self._cfont.height - 1)
+        fast_mode = ((x + char_width + 1) < self.max_x
+                     and (y + self._cfont.height - 1) < self.max_y
+                     and self._scroll_bands(*rect) == [rect])
+
+        # Set character window, the font is stored a column at a time.
+        if fast_mode:
+            self._set_window(x, y, x + char_width + 1,
+                             y + self._cfont.height - 1,
+                             self.MODE_TOP_DOWN_L2R)
+            array = bytearray()
+        else:
+            pixels = []
+
+        with self.transaction():
+            # Each font "column" (+1 blank column for spacing).
+            for i in range(char_width + 1):
+                h = 0  # Keep track of char height.
+
+                for j in range(self._cfont.nbrows): # Each column byte.
+                    if i == char_width:
+                        chr_data = 0x00  # Insert blank column
+                    else:
+                        chr_data = self._cfont.font[char_offset]
+
+                    char_offset += 1
+
+                    for k in range(8): # Process every row in font character.
+                        if h >= self._cfont.height: break
+                        x0 = x + i
+                        y0 = y + (j * 8) + k
+                        clr = (color if self._BIT_READ(chr_data, k)
+                               else bg_color)
+
+                        if fast_mode:
+                            if (hasattr(self, '_need_chunking') and
+                                self._need_chunking(array)): # pragma: no cover
+                                self._write_data(array)
+                                array = bytearray()
+
+                            array.append(clr >> 8)
+                            array.append(clr & 0xFF)
+                        else:
+                            pixels.append((x0, y0, clr))
+
+                        h += 1
+
+            if fast_mode:
+                self._write_data(array)
+                self._reset_window()
+            else:
+                self.draw_pixels(pixels)
+
+        return char_width
+
+    def draw_text(self, x, y, s, color=Colors.WHITE, bg_color=Colors.BLACK):
+        """
+        Draw a text string to the display.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param s: The string to draw on the display.
+        :type s: str
+        :param color: A 16-bit RGB color (default=white).
+        :type color: int
+        :param bg_color: Set the character background color (default = black).
+        :type bg_color: int
+        :return: The position of x after the text is displayed.
+        :rtype: int
+        """
+        return self._run(self._iter_draw_text(x, y, s, color, bg_color))
+
+    def _iter_draw_text(self, x, y, s, color, bg_color):
+        """
+        Generator version of draw_text(), yields after each character.
+        """
+        currx = x
+        with self.transaction():
+            for k in range(len(s)):
+                currx += self.draw_char(currx, y, s[k], color, bg_color) + 1
+                yield
+
+        return currx
+
+    def get_char_extent(self, ch):
+        """
+        Gets the width and height of a standard font character in pixels.
+
+        .. note:
+
+          The height of a standard character is the same for all characters.
+
+        :param ch: The ASCII character.
+        :type ch: str
+        :return: A tuple consisting of (width, height).
+        :rtype: tuple
+        :raises TFTException: If the a standard font is not set.
+        """
+        self._is_font_set()
+        char_offset = self.__get_offset(ch)
+        # Get font width from 1st byte
+        return self._cfont.font[char_offset], self._cfont.height
+
+    def get_text_extent(self, s):
+        """
+        Gets the width and height of a standard font string in pixels.
+
+        .. note:
+
+          The height of a standard character is the same for all characters.
+
+        :param s: Text to get the width for.
+        :type s: str
+        :return: A tuple consisting of (width, height).
+        :rtype: tuple
+        :raises TFTException: If the a standard font is not set.
+        """
+        width = 0
+        height = 0
+
+        for k in range(len(s)):
+            w, h = self.get_char_extent(s[k])
+            width += w + 1
+            height = h
+
+        return round(width), height
+
+    def __get_offset(self, ch):
+        # Bytes used by each character.
+        char_offset = (self._cfont.width * self._cfont.nbrows) + 1
+        # Char offset (add 4 for font header)
+        return (char_offset * (ord(ch) - self._cfont.offset)
+                ) + self._CFONT_HEADER_SIZE
+
+    def _is_font_set(self):
+        if len(self._cfont.font) <= 0:
+            raise TFTException(self.ERROR_MSGS.get('STD_FONT'))
+
+    #
+    # End of standard font methods.
+    #
+    # Beginning of GFX font methods.
+    #
+
+    def set_gfx_font(self, font):
+        """
+        Set the GFX font.
+
+        :param font: GFX font name defined in include file.
+        :type font: str
+        """
+        self._gfx_font = GFXFont(font)
+
+    def draw_gfx_char(self, x, y, ch, color=Colors.WHITE):
+        """
+        Draw a single character with the current GFX font.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param ch: A single character to draw on the display.
+        :type ch: str
+        :param color: A 16-bit RGB color (default=white).
+        :type color: int
+        :return: The width of character in display pixels.
+        :rtype: int
+        :raises TFTException: If the a GFX font is not set or a character
+                              is not found in the current font.
+        """
+        self._is_gfx_font_set()
+        ch = ord(ch) - self._gfx_font.first
+
+        try:
+            glyph = GFXGlyph(self._gfx_font.glyph[ch])
+        except IndexError as e:
+            ch += self._gfx_font.first
+            msg = self.ERROR_MSGS['GFX_BAD_CH'].format(chr(ch))
+            raise TFTException(msg)
+
+        bitmap = self._gfx_font.bitmap
+        bo = glyph.bitmap_offset
+        w = glyph.width
+        h = glyph.height
+        xa = glyph.x_advance
+        xo = glyph.x_offset
+        yo = glyph.y_offset
+        bits = bit = 0
+        pixels = []
+
+        # Add character clipping here one day.
+        for yy in range(h):
+            for xx in range(w):
+                if not (bit & 7):
+                    bits = bitmap[bo]
+                    bo += 1
+
+                bit += 1
+                x0 = x + xo + xx
+                y0 = y + yo + yy
+
+                if bits & 0x80:
+                    pixels.append((x0, y0, color))
+
+                bits <<= 1
+
         self.draw_pixels(pixels)
-        self._end_write(reuse=False)
-
-    ## def draw_bitmap(self, x, y, bitmap, w, h, color, bg=Colors.BLACK,
-    ##                 transparent=False, x_bit=False):
-    ##     """
-    ##     Draw a bitmap image.
-
-    ##     :param x: Point coordinate (x-axis).
-    ##     :type x: int
-    ##     :param y: Point coordinate (y-axis).
-    ##     :type y: int
-    ##     :param bitmap: A 2D 16-bit color bitmap image to draw on the display.
-    ##     :type bitmap: int
-    ##     :param w: Width
-    ##     :type w: int
-    ##     :param h: Height
-    ##     :type h: int
-    ##     :param color: A 16-bit RGB color (default=white).
-    ##     :type color: int
-    ##     :param bg: A 16-bit RGB background color.
-    ##     :type bg: int
-    ##     :param transparent: True = transparent bitmap, False = not transparent.
-    ##     :type transparent: bool
-    ##     :param x_bit: This indicates that the left most (8th) bit is set.
-    ##     :type x_bit: bool
-    ##     """
-    ##     no_auto_inc = False # Flag set when transparent pixel was 'written'.
-    ##     byte_width = (w + 7) / 8
-    ##     byte = 0
-    ##     mask_bit = 0x01 if x_bit else 0x80
-
-    ##     # Adjust window height/width to display dimensions
-    ##     wx0 = 0 if x < 0 else x
-    ##     wy0 = 0 if y < 0 else y
-    ##     wx1 = (self.max_x if x + w > self.max_x else x + w) - 1
-    ##     wy1 = (self.max_y if y + h > self.max_y else y + h) - 1
-    ##     wh = wy1 - wy0 + 1
-
-    ##     if self.DEBUG: # pragma: no cover
-    ##         print("draw_bitmap: max_x={}, max_y={}".format(
-    ##             self.max_x, self.max_y))
-    ##         print("draw_bitmap: wx0={}, wy0={}, wx1={}, wy1={}".format(
-    ##             wx0, wy0, wx1, wy1))
-
-    ##     self.spi_close_override = True
-    ##     self._start_write()
-    ##     self._set_window(wx0, wy0, wx1, wy1, self.MODE_L2R_TOP_DOWN)
-
-    ##     # for (j = y >= 0 ? 0 : -y; j < (y >= 0 ? 0 : -y)+wh; j++) {...}
-    ##     yy = 0 if y >= 0 else -y
-
-    ##     for j in range(yy, yy + wh):
-    ##         for i in range(w):
-    ##             if i & 7:
-    ##                 if x_bit: byte >>= 1
-    ##                 else: byte <<= 1
-    ##             else:
-    ##                 byte = bitmap[j * byte_width + i // 8]
-
-    ##             if wx0 <= x + i <= wx1:
-    ##                 # Write only if pixel is within window.
-    ##                 if byte & mask_bit:
-    ##                     if no_auto_inc:
-    ##                         # There was a transparent area,
-    ##                         # set pixel coordinates again.
-    ##                         self.draw_pixel(x + i, y + j, color)
-    ##                         no_auto_inc = False
-    ##                     else:
-    ##                         self._write_data(color)
-    ##                 elif transparent:
-    ##                     # No autoincrement in transparent area!
-    ##                     no_auto_inc = True
-    ##                 else:
-    ##                     self._write_data(bg)
-
-    ##     self._reset_window()
-    ##     self.spi_close_override = False
-    ##     self._end_write(reuse=False)
+        return xa
+
+    def draw_gfx_text(self, x, y, s, color=Colors.WHITE, *, add_pixels=0):
+        """
+        Draw a string in the GFX font.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param s: The string to draw on the display.
+        :type s: str
+        :param color: A 16-bit RGB color (default=white).
+        :type color: int
+        :param add_pixels: Number of pixels to add between characters
+                           (Default = 0).
+        :type add_pixels: int
+        :return: The position of x after the text is displayed.
+        :rtype: int
+        :raises TFTException: If the a GFX font is not set.
+        """
+        return self._run(self._iter_draw_gfx_text(x, y, s, color,
+                                                  add_pixels))
+
+    def _iter_draw_gfx_text(self, x, y, s, color, add_pixels):
+        """
+        Generator version of draw_gfx_text(), yields after each character.
+        """
+        currx = x
+        with self.transaction():
+            # Draw every character in the string.
+            for ch in s:
+                currx += self.draw_gfx_char(currx, y, ch, color) + add_pixels
+                yield
+
+        return currx
+
+    def get_gfx_char_extent(self, ch):
+        """
+        Return the width, height, and the distance to advance cursor for
+        the current GFX font.
+
+        .. note::
+
+          If the character does not exist return values gw, gh, and xa
+          will be 0 (zero).
+
+        :param ch: The character to draw on the display.
+        :type ch: str
+        :return: A tuple (gw, gh, xa) where gw is the width in pixels
+                 of the character, gh is the height, and xa is the distance
+                 to advance cursor on the x axis.
+        :rtype: tuple
+        :raises TFTException: If the a GFX font is not set.
+        """
+        self._is_gfx_font_set()
+        ch = ord(ch)
+
+        # Is char present in this font?
+        if self._gfx_font.first <= ch <= self._gfx_font.last:
+            glyph = GFXGlyph(self._gfx_font.glyph[ch - self._gfx_font.first])
+            gw = glyph.width
+            gh = glyph.height
+            xa = glyph.x_advance
+        else:
+            gw = gh = xa = 0
+
+        return gw, gh, xa
+
+    def get_gfx_text_extent(self, s, *, add_pixels=0):
+        """
+        Return the width and height of the string in pixels for the
+        current GFX font.
+
+        .. note::
+
+          If any of the chararcters in the provided string are not found
+          in the font the results for that character will be 0 (zero) for
+          both the w and h causing an invalid total for w and h.
+
+        :param s: The character to draw on the display.
+        :type s: str
+        :param add_pixels: Number of pixels to add between characters
+                           (Default = 0).
+        :type add_pixels: int
+        :return: A tuple (w, h) where w is the width of the string and
+                 h is the height.
+        :rtype: tuple
+        :raises TFTException: If the a GFX font is not set.
+        """
+        w = h = 0
+
+        for ch in s:
+            gw, gh, xa = self.get_gfx_char_extent(ch)
+            if gh > h: h = gh
+            w += xa + add_pixels
+
+        return w, h
+
+    def _is_gfx_font_set(self):
+        if self._gfx_font is None:
+            raise TFTException(self.ERROR_MSGS.get('GFX_FONT'))
+
+    #
+    # End of GFX font methods.
+    #
+
+    def draw_bitmap(self, x, y, bitmap, w, h, color=Colors.WHITE,
+                    bg=Colors.BLACK, transparent=False, lsb_first=False):
+        """
+        Draw a monochrome bitmap, each row starts on a new byte.
+
+        .. note::
+
+          Opaque bitmaps are streamed a row at a time inside one window.
+          Transparent bitmaps are drawn as runs of set bits, each with
+          its own window, so only the set bits are written.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param bitmap: The bitmap, 1 bit per pixel.
+        :type bitmap: bytes, bytearray, or memoryview
+        :param w: Width in pixels.
+        :type w: int
+        :param h: Height in pixels.
+        :type h: int
+        :param color: A 16-bit RGB color for the set bits (default=white).
+        :type color: int
+        :param bg: A 16-bit RGB color for the clear bits (default=black).
+        :type bg: int
+        :param transparent: True = the clear bits are not drawn, False =
+                            they are drawn with bg.
+        :type transparent: bool
+        :param lsb_first: True = the left most pixel of a byte is bit 0,
+                          False = it is bit 7.
+        :type lsb_first: bool
+        """
+        self._run(self._iter_draw_bitmap(x, y, bitmap, w, h, color, bg,
+                                         transparent, lsb_first))
+
+    def _iter_draw_bitmap(self, x, y, bitmap, w, h, color, bg, transparent,
+                          lsb_first):
+        """
+        Generator version of draw_bitmap(), yields after each chunk.
+        """
+        byte_width = (w + 7) // 8
+        bits = tuple(range(8)) if lsb_first else tuple(range(7, -1, -1))
+        fg = bytes((color >> 8, color & 0xFF))
+        bg = bytes((bg >> 8, bg & 0xFF))
+        # The 8 pixels of each byte value are only built once.
+        cache = {}
+
+        def pixels(byte):
+            data = cache.get(byte)
+
+            if data is None:
+                data = b''.join([fg if (byte >> bit) & 1 else bg
+                                 for bit in bits])
+                cache[byte] = data
+
+            return data
+
+        def row(j, c0, c1):
+            start = j * byte_width
+            data = b''.join([pixels(byte) for byte in bitmap[
+                start + c0 // 8:start + c1 // 8 + 1]])
+            pos = (c0 & 7) * 2
+            return data[pos:pos + (c1 - c0 + 1) * 2]
+
+        def spans(j, c0, c1):
+            start = j * byte_width
+            return self._opaque_spans(
+                [(bitmap[start + c // 8] >> bits[c & 7]) & 1
+                 for c in range(c0, c1 + 1)], c0)
+
+        yield from self._iter_blit(x, y, w, h, row,
+                                   spans if transparent else None)
+
+    def draw_rgb_bitmap(self, x, y, bitmap, w, h, transparent=None):
+        """
+        Draw an RGB565 bitmap, each pixel is 2 bytes high byte first as
+        they are sent to the display.
+
+        .. note::
+
+          Opaque bitmaps are streamed a row at a time inside one window
+          without converting the pixels. Transparent bitmaps are drawn as
+          runs of opaque pixels, each with its own window.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param bitmap: The bitmap, w * h * 2 bytes.
+        :type bitmap: bytes, bytearray, or memoryview
+        :param w: Width in pixels.
+        :type w: int
+        :param h: Height in pixels.
+        :type h: int
+        :param transparent: A 16-bit RGB color that is not drawn, None
+                            draws every pixel (default=None).
+        :type transparent: int
+        """
+        self._run(self._iter_draw_rgb_bitmap(x, y, bitmap, w, h,
+                                             transparent))
+
+    def _iter_draw_rgb_bitmap(self, x, y, bitmap, w, h, transparent):
+        """
+        Generator version of draw_rgb_bitmap(), yields after each chunk.
+        """
+        view = memoryview(bitmap)
+
+        if transparent is not None:
+            hi, lo = transparent >> 8, transparent & 0xFF
+
+        def row(j, c0, c1):
+            return view[(j * w + c0) * 2:(j * w + c1 + 1) * 2]
+
+        def spans(j, c0, c1):
+            start = j * w * 2
+            return self._opaque_spans(
+                [view[start + c * 2] != hi or view[start + c * 2 + 1] != lo
+                 for c in range(c0, c1 + 1)], c0)
+
+        yield from self._iter_blit(x, y, w, h, row,
+                                   None if transparent is None else spans)
 
     def rgb16_to_bgr16(self, color):
         """
@@ -834,11 +2705,37 @@ class CommonMethods:
         blu = round((0xFF * (color & 0b0000000000011111)) / 0x1F)
         return red, grn, blu
 
+    def _write_batch(self, batch):
+        """
+        Send a CommandBatch with one chip select.
+        """
+        if not batch.segments:
+            return
+
+        stats = self._draw_stats
+        if stats is not None: start = ticks_us()
+
+        try:
+            self.spi_write_segments(self._rs, batch.segments)
+        except CompatibilityException as e: # pragma: no cover
+            self._end_write(reuse=False)
+            raise e
+
+        if stats is not None:
+            stats.add_write(
+                ticks_diff(ticks_us(), start),
+                sum([len(values) for is_data, values in batch.segments]),
+                len([1 for is_data, values in batch.segments
+                     if not is_data]))
+
     def _write_register(self, command, data):
         self._write_command(command)
         self._write_data(data)
 
     def _write_command(self, command):
+        stats = self._draw_stats
+        if stats is not None: start = ticks_us()
+
         try:
             self.digital_write(self._rs, self.LOW) # Command
             self.spi_write(command)
@@ -846,7 +2743,18 @@ class CommonMethods:
             self._end_write(reuse=False)
             raise e
 
+        if stats is not None:
+            stats.add_write(ticks_diff(ticks_us(), start),
+                            stats.size(command), 1)
+
     def _write_data(self, data):
+        if self._fb_window is not None:
+            self._fb_write(data)
+            return
+
+        stats = self._draw_stats
+        if stats is not None: start = ticks_us()
+
         try:
             self.digital_write(self._rs, self.HIGH) # Data
             self.spi_write(data)
@@ -854,15 +2762,398 @@ class CommonMethods:
             self._end_write(reuse=False)
             raise e
 
+        if stats is not None:
+            stats.add_write(ticks_diff(ticks_us(), start), stats.size(data))
+
+    def _write_color(self, color, count):
+        """
+        Write the same color count times to the current window.
+
+        .. note::
+
+          A chunk of the color is built once and cached, it is then
+          written as many times as needed with any remainder sent as a
+          memoryview slice of the same chunk.
+        """
+        self._run(self._iter_write_color(color, count))
+
+    def _iter_write_color(self, color, count):
+        """
+        Generator version of _write_color(), yields after each chunk.
+        """
+        chunk = self._fill_cache.get(color)
+
+        if chunk is None:
+            if len(self._fill_cache) >= self.FILL_CACHE_COLORS:
+                self._fill_cache.clear()
+
+            size = self._chunk_size()
+            chunk = bytearray((color >> 8, color & 0xFF)) * (size // 2)
+            self._fill_cache[color] = chunk
+
+        full, remainder = divmod(count * 2, len(chunk))
+
+        for idx in range(full):
+            self._write_data(chunk)
+            yield
+
+        if remainder:
+            self._write_data(memoryview(chunk)[:remainder])
+            yield
+
+    def _fill_span(self, x0, y0, x1, y1, color):
+        """
+        Fill a clipped rectangle without resetting the window afterwards,
+        the caller must call _reset_window() when it is done.
+
+        :return: True if anything was written else False.
+        :rtype: bool
+        """
+        return self._run(self._iter_fill_span(x0, y0, x1, y1, color))
+
+    def _iter_fill_span(self, x0, y0, x1, y1, color):
+        """
+        Generator version of _fill_span(), the generator returns True if
+        anything was written.
+        """
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        x0 = max(round(x0), 0)
+        y0 = max(round(y0), 0)
+        x1 = min(round(x1), self.max_x - 1)
+        y1 = min(round(y1), self.max_y - 1)
+
+        if x1 < x0 or y1 < y0:
+            return False
+
+        if self._fb is not None:
+            self._fb.fill_rect(*self._fb_rect(x0, y0, x1, y1), color)
+        else:
+            for x0, y0, x1, y1 in self._scroll_bands(x0, y0, x1, y1):
+                self._set_window(x0, y0, x1, y1)
+                yield from self._iter_write_color(
+                    color, (x1 - x0 + 1) * (y1 - y0 + 1))
+
+        return True
+
+    def _fill_raster(self, raster, color):
+        """
+        Send the spans in a SpanRasterizer as rectangle bursts.
+        """
+        self._run(self._iter_fill_raster(raster, color))
+
+    def _iter_fill_raster(self, raster, color):
+        """
+        Generator version of _fill_raster().
+        """
+        with self.transaction():
+            drawn = False
+
+            for rect in raster.rects():
+                if (yield from self._iter_fill_span(*rect, color)):
+                    drawn = True
+
+            if drawn:
+                self._reset_window()
+
+    def _iter_blit(self, x, y, w, h, row, spans=None):
+        """
+        Stream the rows of an image to the display, it is clipped to the
+        display and split where it crosses the scroll area.
+
+        :param x: Point coordinate (x-axis).
+        :type x: int
+        :param y: Point coordinate (y-axis).
+        :type y: int
+        :param w: Width in pixels.
+        :type w: int
+        :param h: Height in pixels.
+        :type h: int
+        :param row: A function (j, c0, c1) that returns the pixel data of
+                    row j from column c0 to c1.
+        :type row: function
+        :param spans: A function (j, c0, c1) that returns the opaque
+                      (s0, s1) column spans of row j from column c0 to c1,
+                      None if the image is opaque.
+        :type spans: function
+        """
+        x = round(x)
+        y = round(y)
+
+        if self._fb is not None:
+            cx0, cy0, cx1, cy1 = 0, 0, self.max_x - 1, self.max_y - 1
+        else:
+            cx0, cy0, cx1, cy1 = self._clip_rect()
+
+        x0 = max(x, cx0)
+        y0 = max(y, cy0)
+        x1 = min(x + w - 1, cx1)
+        y1 = min(y + h - 1, cy1)
+
+        if x1 < x0 or y1 < y0:
+            return
+
+        if spans is None:
+            rects = [(x0, y0, x1, y1)]
+        else:
+            rects = [(x + s0, yy, x + s1, yy) for yy in range(y0, y1 + 1)
+                     for s0, s1 in spans(yy - y, x0 - x, x1 - x)]
+
+        size = self._chunk_size()
+
+        with self.transaction():
+            for rect in rects:
+                bands = ([rect] if self._fb is not None
+                         else self._scroll_bands(*rect))
+
+                for bx0, by0, bx1, by1 in bands:
+                    self._set_window(bx0, by0, bx1, by1,
+                                     self.MODE_L2R_TOP_DOWN)
+                    chunk = bytearray()
+
+                    for yy in range(by0, by1 + 1):
+                        data = row(yy - y, bx0 - x, bx1 - x)
+
+                        if chunk and len(chunk) + len(data) > size:
+                            self._write_data(chunk)
+                            chunk = bytearray()
+                            yield
+
+                        chunk += data
+
+                    self._write_data(chunk)
+                    yield
+
+            self._reset_window()
+
+    def _opaque_spans(self, opaque, c0):
+        """
+        Find the spans of opaque pixels in a row.
+
+        :param opaque: A true value for each opaque pixel.
+        :type opaque: list
+        :param c0: The column of the first pixel.
+        :type c0: int
+        :return: A list of (s0, s1) column spans.
+        :rtype: list
+        """
+        spans = []
+        start = None
+
+        for idx, flag in enumerate(opaque):
+            if flag:
+                if start is None: start = idx
+            elif start is not None:
+                spans.append((c0 + start, c0 + idx - 1))
+                start = None
+
+        if start is not None:
+            spans.append((c0 + start, c0 + len(opaque) - 1))
+
+        return spans
+
+    def _chunk_size(self):
+        """
+        Get the largest number of bytes sent in one write.
+
+        :return: The size in bytes.
+        :rtype: int
+        """
+        size = self.FILL_CHUNK_SIZE
+
+        if hasattr(self, 'BYTEARRAY_SIZE'): # pragma: no cover
+            size = min(size, self.BYTEARRAY_SIZE - 2)
+
+        return size
+
+    def _find_runs(self, points, axis, min_run):
+        """
+        Split sorted points into runs along the x (0) or y (1) axis.
+
+        :param points: The points sorted along the axis.
+        :type points: list
+        :param axis: The axis of the runs, 0 for x or 1 for y.
+        :type axis: int
+        :param min_run: The shortest run, shorter runs are left over.
+        :type min_run: int
+        :return: A tuple of a list of runs and a list of left over points
+                 sorted along the other axis.
+        :rtype: tuple
+        """
+        other = 1 - axis
+        runs = []
+        singles = []
+        run = []
+
+        for point in points + [None]:
+            if (run and point is not None and point[other] == run[-1][other]
+                and point[axis] == run[-1][axis] + 1):
+                run.append(point)
+                continue
+
+            if len(run) >= min_run:
+                runs.append(run)
+            else:
+                singles += run
+
+            run = [point]
+
+        singles.sort(key=lambda p: (p[axis], p[other]))
+        return runs, singles
+
+    def _run(self, gen):
+        """
+        Run one of the _iter_* drawing generators to the end, the async
+        methods in utils/async_tft.py step through the same generators.
+
+        :param gen: The generator to run.
+        :type gen: generator
+        :return: The value returned by the generator.
+        """
+        try:
+            while True:
+                next(gen)
+        except StopIteration as e:
+            return e.value
+
+    def _open_session(self):
+        """
+        Open the SPI port and keep it open until pin_cleanup() is called.
+        """
+        self.__spi_session = True
+        self._start_write()
+
+    def _close_session(self):
+        """
+        Close the SPI port opened by _open_session(), this is called by
+        pin_cleanup().
+        """
+        self.__spi_session = False
+        self.spi_end_transaction()
+
     def _start_write(self):
         if not self.is_spi_connected:
+            if self._draw_stats is not None:
+                self._draw_stats.add_transaction()
+
             self.spi_start_transaction()
             self.digital_write(self._cs, self.LOW)
 
     def _end_write(self, reuse=True):
-        if self.spi_close_override:
+        if self._cs_hold and not self._transaction.depth:
+            self.digital_write(self._cs, self.HIGH)
+
+        if (self.spi_close_override or self.__spi_session
+            or self._transaction.depth):
             reuse = True
 
         if not reuse and self.is_spi_connected:
             self.digital_write(self._cs, self.HIGH)
             self.spi_end_transaction()
+
+    #
+    # Frame buffer methods, these work in the logical coordinates of the
+    # current orientation and write to the buffer in native coordinates.
+    #
+
+    def _fb_rect(self, x0, y0, x1, y1):
+        """
+        Clip a rectangle to the display and convert it to native
+        coordinates.
+
+        :return: A tuple (x0, y0, x1, y1) or None if nothing is visible.
+        :rtype: tuple
+        """
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        x0 = max(round(x0), 0)
+        y0 = max(round(y0), 0)
+        x1 = min(round(x1), self.max_x - 1)
+        y1 = min(round(y1), self.max_y - 1)
+
+        if x1 < x0 or y1 < y0:
+            return None
+
+        x0, y0 = self._native_coordinates(x0, y0)
+        x1, y1 = self._native_coordinates(x1, y1)
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        return x0, y0, x1, y1
+
+    def _fb_draw_pixels(self, pixels):
+        fb = self._fb
+        max_x = self.max_x
+        max_y = self.max_y
+        bx0 = by0 = None
+
+        for x, y, color in pixels:
+            x = round(x)
+            y = round(y)
+
+            if 0 <= x < max_x and 0 <= y < max_y:
+                x, y = self._native_coordinates(x, y)
+                fb.set_pixel(x, y, color)
+
+                if bx0 is None:
+                    bx0 = bx1 = x
+                    by0 = by1 = y
+                else:
+                    if x < bx0: bx0 = x
+                    elif x > bx1: bx1 = x
+                    if y < by0: by0 = y
+                    elif y > by1: by1 = y
+
+        if bx0 is not None:
+            fb.mark_dirty(bx0, by0, bx1, by1)
+
+    def _fb_set_window(self, x0, y0, x1, y1, mode):
+        """
+        Set the window that _write_data() will write to.
+
+        .. note::
+
+          The mode bits are the same as the ILI9225 entry mode where
+          bit 0 set is vertical first, bit 1 set is left to right, and
+          bit 2 set is top down.
+        """
+        x0 = max(min(round(x0), self.max_x - 1), 0)
+        x1 = max(min(round(x1), self.max_x - 1), 0)
+        y0 = max(min(round(y0), self.max_y - 1), 0)
+        y1 = max(min(round(y1), self.max_y - 1), 0)
+        if x1 < x0: x0, x1 = x1, x0
+        if y1 < y0: y0, y1 = y1, y0
+        # [x0, y0, x1, y1, mode, next pixel]
+        self._fb_window = [x0, y0, x1, y1, mode, 0]
+
+    def _fb_write(self, data):
+        if isinstance(data, (int, float)):
+            data = (round(data),)
+
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            colors = [(data[i] << 8) | data[i + 1]
+                      for i in range(0, len(data) - 1, 2)]
+        else:
+            colors = data
+
+        fb = self._fb
+        x0, y0, x1, y1, mode, pos = self._fb_window
+        width = x1 - x0 + 1
+        height = y1 - y0 + 1
+        size = width * height
+
+        for color in colors:
+            if mode & 0x01: # Vertical first
+                col, row = divmod(pos, height)
+            else:
+                row, col = divmod(pos, width)
+
+            x = x0 + col if mode & 0x02 else x1 - col
+            y = y0 + row if mode & 0x04 else y1 - row
+            x, y = self._native_coordinates(x, y)
+            fb.set_pixel(x, y, color)
+            pos = (pos + 1) % size
+
+        self._fb_window[5] = pos
+
+        if colors:
+            fb.mark_dirty(*self._fb_rect(x0, y0, x1, y1))
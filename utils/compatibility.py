@@ -12,27 +12,36 @@ which to use in this library.
 from .common import Boards, CompatibilityException
 
 
-try: # MicroPython
-    from time import sleep_ms
-except:
-    try: # CircuitPython
-        import board
+try: # The simulator is used if TFT_SIMULATOR is set.
+    from os import environ
+    _SIMULATOR = bool(environ.get('TFT_SIMULATOR'))
+except: # pragma: no cover
+    _SIMULATOR = False
+
+if _SIMULATOR:
+    from py_versions.simulator import PiVersion
+else:
+    try: # MicroPython
+        from time import sleep_ms
     except:
-        try: # A PC with the RTx.GPIO library and hardware
-            import RTk
+        try: # CircuitPython
+            import board
         except:
-            try: # Raspberry Pi
-                import importlib
-            except: # pragma: no cover
-                pass
-            else:
-                from py_versions.raspberrypi import PiVersion
+            try: # A PC with the RTx.GPIO library and hardware
+                import RTk
+            except:
+                try: # Raspberry Pi
+                    import importlib
+                except: # pragma: no cover
+                    pass
+                else:
+                    from py_versions.raspberrypi import PiVersion
+            else: # pragma: no cover
+                from py_versions.computer import PiVersion
         else: # pragma: no cover
-            from py_versions.computer import PiVersion
+            from py_versions.circuitpython import PiVersion
     else: # pragma: no cover
-        from py_versions.circuitpython import PiVersion
-else: # pragma: no cover
-    from py_versions.micropython import PiVersion
+        from py_versions.micropython import PiVersion
 
 
 class Compatibility(PiVersion):
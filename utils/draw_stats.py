@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+utils/draw_stats.py
+
+Counters and latency histograms for each public drawing method.
+
+The counters are kept by the write methods in CommonMethods, so they work
+the same way on every platform. Turn them on with the draw_stats property
+of the display object.
+"""
+
+from .common import ticks_us, ticks_diff
+
+
+class DrawStats:
+    """
+    Keep counters for each public drawing method.
+
+    .. code-block:: python
+
+        tft.draw_stats = True
+        tft.draw_text(10, 10, "Hello")
+        print(tft.draw_stats.as_dict()['draw_text'])
+
+    .. note::
+
+      Only the outermost method is counted, the writes done by draw_char()
+      when it is called by draw_text() are counted under draw_text().
+      Writes done outside any of the methods, such as by the async
+      methods, are counted under OTHER.
+    """
+    # The public methods that are counted, if the display class has them.
+    METHODS = (
+        'begin', 'clear', 'show', 'set_backlight', 'set_display',
+        'set_display_background', 'draw_pixel', 'draw_pixels',
+        'draw_line', 'draw_hline', 'draw_vline', 'draw_rectangle',
+        'fill_rectangle', 'draw_circle', 'fill_circle', 'draw_triangle',
+        'fill_triangle', 'fill_round_rectangle', 'fill_polygon',
+        'draw_char', 'draw_text', 'draw_gfx_char', 'draw_gfx_text',
+        'draw_bitmap', 'draw_rgb_bitmap',
+        )
+    OTHER = 'other'
+    # The upper bound in microseconds of each latency bucket, the last
+    # bucket counts everything longer.
+    BUCKETS_US = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000,
+                  100000, 250000)
+
+    def __init__(self):
+        self._counters = {}
+        self._depth = 0
+        self._current = self.OTHER
+        self._start = 0
+        self._gpio_start = 0
+        self._saved = {}
+
+    def attach(self, tft):
+        """
+        Replace the drawing methods of the display object with counted
+        versions.
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        """
+        for name in self.METHODS:
+            if hasattr(tft, name) and name not in self._saved:
+                self._saved[name] = tft.__dict__.get(name)
+                setattr(tft, name, self.wrap(tft, name))
+
+    def detach(self, tft):
+        """
+        Put back the methods replaced by attach().
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        """
+        for name, method in self._saved.items():
+            if method is None:
+                tft.__dict__.pop(name, None)
+            else:
+                setattr(tft, name, method)
+
+        self._saved = {}
+
+    def wrap(self, tft, name):
+        """
+        Get a version of a method that is counted.
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        :param name: The name of the method.
+        :type name: str
+        :return: The counted method.
+        :rtype: function
+        """
+        method = getattr(tft, name)
+
+        def counted(*args, **kwargs):
+            self.start(name, tft.gpio_stats['gpio_writes'])
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.end(tft.gpio_stats['gpio_writes'])
+
+        return counted
+
+    def start(self, name, gpio_writes):
+        """
+        Start counting a call.
+
+        :param name: The name of the method.
+        :type name: str
+        :param gpio_writes: The GPIO write counter when the call started.
+        :type gpio_writes: int
+        """
+        if self._depth == 0:
+            self._current = name
+            self._gpio_start = gpio_writes
+            self._start = ticks_us()
+
+        self._depth += 1
+
+    def end(self, gpio_writes):
+        """
+        End counting a call.
+
+        :param gpio_writes: The GPIO write counter when the call ended.
+        :type gpio_writes: int
+        """
+        self._depth -= 1
+
+        if self._depth == 0:
+            elapsed = ticks_diff(ticks_us(), self._start)
+            counter = self.__counter(self._current)
+            counter['calls'] += 1
+            counter['total_us'] += elapsed
+            counter['gpio_writes'] += gpio_writes - self._gpio_start
+            histogram = counter['histogram']
+
+            for idx, bound in enumerate(self.BUCKETS_US):
+                if elapsed <= bound:
+                    histogram[idx] += 1
+                    break
+            else:
+                histogram[-1] += 1
+
+            self._current = self.OTHER
+
+    def add_write(self, elapsed, nbytes, registers=0):
+        """
+        Count one write to the SPI port.
+
+        :param elapsed: The time in microseconds the write took.
+        :type elapsed: int
+        :param nbytes: The number of bytes written.
+        :type nbytes: int
+        :param registers: The number of commands (register writes) in the
+                          write.
+        :type registers: int
+        """
+        counter = self.__counter(self._current)
+        counter['spi_writes'] += 1
+        counter['spi_us'] += elapsed
+        counter['bytes'] += nbytes
+        counter['registers'] += registers
+
+    def add_transaction(self):
+        """
+        Count the SPI port being opened.
+        """
+        self.__counter(self._current)['transactions'] += 1
+
+    def reset(self):
+        """
+        Remove all the counters.
+        """
+        self._counters = {}
+
+    def as_dict(self):
+        """
+        Get the counters for each method.
+
+        The time spent building buffers is the time not spent in writes
+        to the SPI port, so it includes any delays.
+
+        :return: A dict of method names and dicts of counters.
+        :rtype: dict
+        """
+        result = {}
+
+        for name, counter in self._counters.items():
+            item = dict(counter)
+            item['build_us'] = max(counter['total_us'] - counter['spi_us'],
+                                   0)
+            labels = ['<={}'.format(bound) for bound in self.BUCKETS_US]
+            labels.append('>{}'.format(self.BUCKETS_US[-1]))
+            item['histogram'] = dict(zip(labels, counter['histogram']))
+            result[name] = item
+
+        return result
+
+    @staticmethod
+    def size(values):
+        """
+        Get the number of bytes values will be written as.
+
+        :param values: The values passed to spi_write().
+        :type values: int, list, tuple, array, bytes, bytearray, or
+                      memoryview
+        :return: The number of bytes.
+        :rtype: int
+        """
+        if isinstance(values, (bytearray, bytes, memoryview)):
+            return len(values)
+        elif isinstance(values, (int, float)):
+            return 2
+        else:
+            return len(values) * 2
+
+    def __counter(self, name):
+        counter = self._counters.get(name)
+
+        if counter is None:
+            counter = {'calls': 0, 'bytes': 0, 'spi_writes': 0,
+                       'transactions': 0, 'registers': 0, 'gpio_writes': 0,
+                       'total_us': 0, 'spi_us': 0,
+                       'histogram': [0] * (len(self.BUCKETS_US) + 1)}
+            self._counters[name] = counter
+
+        return counter
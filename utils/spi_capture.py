@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+utils/spi_capture.py
+
+A compact binary capture of the transfers written to the SPI port.
+
+Each transfer is kept as one record, a flags byte (bit 0 set for data,
+clear for a command) then the payload length as 4 bytes little endian
+then the payload. The records are kept in a ring buffer that is
+allocated once, when it is full the oldest records are dropped.
+"""
+
+import sys
+
+from array import array
+
+
+class SpiCapture:
+    """
+    A ring buffer of the transfers written to the SPI port.
+
+    .. code-block:: python
+
+        tft.spi_capture = True
+        tft.fill_rectangle(0, 0, 9, 9, Colors.RED)
+
+        for is_data, payload in tft.spi_capture:
+            print(is_data, SpiCapture.values(payload))
+
+        tft.spi_capture.save('fill.cap')
+
+        with open('fill.cap', 'rb') as f:
+            records = list(SpiCapture.decode(f.read()))
+    """
+    HEADER_SIZE = 5
+    DATA_FLAG = 0x01
+    DEF_SIZE = 1 << 20
+
+    def __init__(self, size=DEF_SIZE):
+        """
+        Constructor
+
+        :param size: The size in bytes of the ring buffer.
+        :type size: int
+        """
+        self._size = size
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self.clear()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return self.decode(self.getvalue())
+
+    @property
+    def size(self):
+        """
+        Get the size in bytes of the ring buffer.
+
+        :return: The size.
+        :rtype: int
+        """
+        return self._size
+
+    def clear(self):
+        """
+        Remove all the records and reset the counters.
+        """
+        self._head = 0
+        self._tail = 0
+        self._used = 0
+        self._count = 0
+        self.stats = {'records': 0, 'bytes': 0, 'dropped': 0,
+                      'truncated': 0}
+
+    def write(self, is_data, payload):
+        """
+        Add a transfer.
+
+        :param is_data: True if the RS pin was high (data) else False.
+        :type is_data: bool
+        :param payload: The bytes written.
+        :type payload: bytes, bytearray, or memoryview
+        """
+        self.write_buffers(is_data, (payload,))
+
+    def write_buffers(self, is_data, buffers):
+        """
+        Add a transfer made of more than one buffer as one record.
+
+        :param is_data: True if the RS pin was high (data) else False.
+        :type is_data: bool
+        :param buffers: The bytes written.
+        :type buffers: list
+        """
+        length = sum([len(buf) for buf in buffers])
+        self.stats['records'] += 1
+        self.stats['bytes'] += length
+        limit = self._size - self.HEADER_SIZE
+
+        # Only the end of a transfer larger than the buffer is kept.
+        if length > limit:
+            buffers = [memoryview(b''.join(buffers))[length - limit:]]
+            length = limit
+            self.stats['truncated'] += 1
+
+        while self._size - self._used < length + self.HEADER_SIZE:
+            self.__drop()
+
+        header = bytearray(self.HEADER_SIZE)
+        header[0] = self.DATA_FLAG if is_data else 0
+        header[1:] = length.to_bytes(4, 'little')
+        self.__put(header)
+
+        for buf in buffers:
+            self.__put(buf)
+
+        self._used += length + self.HEADER_SIZE
+        self._count += 1
+
+    def getvalue(self):
+        """
+        Get the records oldest first as one bytes object, this is the
+        format decode() reads and save() writes.
+
+        :return: The records.
+        :rtype: bytes
+        """
+        end = self._head + self._used
+
+        if end <= self._size:
+            return bytes(self._view[self._head:end])
+
+        return (bytes(self._view[self._head:])
+                + bytes(self._view[:end - self._size]))
+
+    def save(self, path):
+        """
+        Write the records to a file.
+
+        :param path: The path of the file.
+        :type path: str
+        """
+        with open(path, 'wb') as f:
+            f.write(self.getvalue())
+
+    def text(self, width=16):
+        """
+        Get the records as text, one line for each transfer.
+
+        .. note::
+
+          With the default width a one byte transfer has no 16-bit value
+          and is left out, use a width of 8 for displays like the ILI9341
+          that send 8-bit commands.
+
+        :param width: The size in bits of the values, 16 or 8.
+        :type width: int
+        :return: The text.
+        :rtype: str
+        """
+        lines = []
+
+        for is_data, payload in self:
+            values = self.values(payload, width)
+
+            if values:
+                name = '   Data' if is_data else 'Command'
+                lines.append(f"{name}: {','.join(map(str, values))}\n")
+
+        return ''.join(lines)
+
+    @classmethod
+    def decode(cls, data):
+        """
+        Iterate over the records in captured data.
+
+        :param data: The data from getvalue() or a saved file, an mmap
+                     can also be used.
+        :type data: bytes, bytearray, memoryview, or mmap
+        :return: A generator of (is_data, payload) tuples, the payload is
+                 a memoryview of the data.
+        :rtype: generator
+        """
+        view = memoryview(data)
+        pos = 0
+
+        while pos + cls.HEADER_SIZE <= len(view):
+            is_data = bool(view[pos] & cls.DATA_FLAG)
+            length = int.from_bytes(view[pos + 1:pos + cls.HEADER_SIZE],
+                                    'little')
+            pos += cls.HEADER_SIZE
+            yield is_data, view[pos:pos + length]
+            pos += length
+
+    @staticmethod
+    def values(payload, width=16):
+        """
+        Unpack a payload into 16-bit values high byte first, an odd last
+        byte is ignored so a one byte payload gives no values. With a width
+        of 8 each byte is a value.
+
+        :param payload: The payload.
+        :type payload: bytes, bytearray, or memoryview
+        :param width: The size in bits of the values, 16 or 8.
+        :type width: int
+        :return: The values.
+        :rtype: list
+        """
+        if width == 8:
+            return list(bytes(payload))
+
+        arr = array('H')
+        arr.frombytes(payload[:len(payload) & ~1])
+        if sys.byteorder == 'little': arr.byteswap()
+        return arr.tolist()
+
+    def __put(self, data):
+        data = memoryview(data)
+        first = min(len(data), self._size - self._tail)
+        self._view[self._tail:self._tail + first] = data[:first]
+
+        if first < len(data):
+            self._view[:len(data) - first] = data[first:]
+
+        self._tail = (self._tail + len(data)) % self._size
+
+    def __drop(self):
+        header = bytearray(self.HEADER_SIZE)
+
+        for idx in range(self.HEADER_SIZE):
+            header[idx] = self._buf[(self._head + idx) % self._size]
+
+        total = int.from_bytes(header[1:], 'little') + self.HEADER_SIZE
+        self._head = (self._head + total) % self._size
+        self._used -= total
+        self._count -= 1
+        self.stats['dropped'] += 1
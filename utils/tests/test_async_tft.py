@@ -0,0 +1,159 @@
+#
+# utils/tests/test_async_tft.py
+#
+
+import asyncio
+import unittest
+
+from ILI9225 import ILI9225, Boards, Terminal12x16, RGB16BitColor as Colors
+from fonts.FreeSerifItalic18pt7b import FreeSerifItalic18pt7b
+from utils.async_tft import AsyncTFT
+
+
+class TestAsyncTFT(unittest.TestCase):
+    """
+    Test class for the AsyncTFT class using the Raspberry Pi.
+    """
+    RST = 17 # RTD
+    RS = 27
+    PORT = 0
+    CS = 8
+    LED = 22
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        self._tft = ILI9225(self.RST, self.RS, self.PORT, self.CS,
+                            led=self.LED, board=Boards.RASPI)
+        self._tft.begin()
+        self._tft.set_font(Terminal12x16)
+        self._tft.set_gfx_font(FreeSerifItalic18pt7b)
+        self._atft = AsyncTFT(self._tft)
+        self._read_spi_buff()
+
+    def tearDown(self):
+        self._tft.pin_cleanup()
+
+    def _read_spi_buff(self):
+        ret = self._tft.spi_capture.text()
+        self._tft.spi_capture.clear()
+        return ret
+
+    #@unittest.skip("Temporary")
+    def test_same_as_sync(self):
+        """
+        Test that the async methods send the same data as the sync ones.
+        """
+        tests = (
+            ('clear', (), {'color': Colors.RED}),
+            ('clear', (10, 10, 50, 50), {'color': Colors.BLUE}),
+            ('draw_pixels', ([(x, 5 + x % 3, Colors.RED)
+                              for x in range(0, 60, 2)],), {}),
+            ('draw_line', (0, 0, 175, 219, Colors.RED), {}),
+            ('draw_line', (5, 30, 120, 30, Colors.RED), {}),
+            ('draw_circle', (80, 100, 60, Colors.BLUE), {}),
+            ('draw_triangle', (10, 10, 150, 40, 60, 200, Colors.CYAN), {}),
+            ('draw_rectangle', (10, 10, 50, 60, Colors.GREEN), {}),
+            ('fill_rectangle', (0, 0, 175, 219, Colors.GRAY), {}),
+            ('draw_hline', (-5, 20, 40, Colors.RED), {}),
+            ('draw_vline', (40, 200, 50, Colors.RED), {}),
+            ('draw_hline', (10, 10, 0, Colors.RED), {}),
+            ('draw_hline', (10, 10, -5, Colors.RED), {}),
+            ('draw_vline', (10, 10, 0, Colors.RED), {}),
+            ('draw_vline', (10, 10, -5, Colors.RED), {}),
+            ('fill_circle', (80, 100, 40, Colors.YELLOW), {}),
+            ('fill_triangle', (10, 10, 150, 40, 60, 200, Colors.CYAN), {}),
+            ('fill_round_rectangle', (10, 10, 100, 80, 12, Colors.RED), {}),
+            ('fill_polygon', ([(10, 10), (90, 30), (40, 90)], Colors.RED),
+             {}),
+            ('draw_text', (10, 10, "Hello"), {}),
+            ('draw_gfx_text', (10, 40, "Hello", Colors.RED),
+             {'add_pixels': 2}),
+            ('draw_bitmap', (-3, 10, bytes(range(64)), 16, 32),
+             {'transparent': True}),
+            ('draw_rgb_bitmap', (10, 10, b'\xf8\x00' * 2000, 40, 50), {}),
+            )
+
+        for name, args, kwargs in tests:
+            # Start both from the same register state.
+            self._tft._invalidate_registers()
+            expect_ret = getattr(self._tft, name)(*args, **kwargs)
+            expect = self._read_spi_buff()
+            self._tft._invalidate_registers()
+            found_ret = asyncio.run(getattr(self._atft, name)(
+                *args, **kwargs, budget_ms=0))
+            found = self._read_spi_buff()
+            msg = f"Expect the same data as the sync version for '{name}'"
+            self.assertEqual(expect, found, msg=msg)
+            msg = f"Expect '{expect_ret}' found '{found_ret}' for '{name}'"
+            self.assertEqual(expect_ret, found_ret, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_show(self):
+        """
+        Test that the async show() sends the frame buffer.
+        """
+        self._tft.set_framebuffer(True)
+        self._tft.fill_rectangle(10, 10, 40, 40, Colors.RED)
+        asyncio.run(self._atft.show())
+        found = self._read_spi_buff()
+        msg = "Expect the frame buffer to be sent"
+        self.assertTrue(found, msg=msg)
+        found = self._tft.framebuffer.dirty
+        msg = f"Expect nothing dirty found '{found}'"
+        self.assertFalse(found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_budget(self):
+        """
+        Test that other tasks run while drawing and that a large budget
+        does not yield.
+        """
+        async def count(counter, done):
+            while not done.is_set():
+                counter[0] += 1
+                await asyncio.sleep(0)
+
+        async def draw(budget_ms):
+            counter = [0]
+            done = asyncio.Event()
+            task = asyncio.create_task(count(counter, done))
+            await asyncio.sleep(0)
+            start = counter[0]
+            await self._atft.fill_rectangle(0, 0, 175, 219, Colors.RED,
+                                            budget_ms=budget_ms)
+            found = counter[0] - start
+            done.set()
+            await task
+            return found
+
+        # A full screen is 77440 bytes, 19 chunks of 4096 bytes.
+        found = asyncio.run(draw(0))
+        msg = f"Expect other tasks to run at least '18' times found '{found}'"
+        self.assertTrue(found >= 18, msg=msg)
+        found = asyncio.run(draw(10000))
+        msg = f"Expect other tasks not to run found '{found}'"
+        self.assertEqual(0, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_cancel(self):
+        """
+        Test that a cancelled call ends its transaction.
+        """
+        async def draw():
+            task = asyncio.create_task(self._atft.fill_rectangle(
+                0, 0, 175, 219, Colors.RED, budget_ms=0))
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            task.cancel()
+
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(draw())
+        found = self._tft.transaction().depth
+        msg = f"Expect transaction depth '0' found '{found}'"
+        self.assertEqual(0, found, msg=msg)
@@ -0,0 +1,372 @@
+#
+# utils/tests/test_common.py
+#
+
+import unittest
+
+from array import array
+
+from utils.common import (FrameBuffer, CommandBatch, SpanRasterizer,
+                          RGB16BitColor as Colors, pack_be16)
+
+
+class TestPackBe16(unittest.TestCase):
+    """
+    Test class for the pack_be16 function.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    #@unittest.skip("Temporary")
+    def test_pack_be16(self):
+        """
+        Test that values are packed high byte first.
+        """
+        expect = bytearray((0xF8, 0x00, 0x12, 0x34, 0x00, 0x01))
+        tests = ([0xF800, 0x1234, 0x0001], (0xF800, 0x1234, 0x0001),
+                 array('H', (0xF800, 0x1234, 0x0001)),
+                 [0xF800, 4660.2, 0.9])
+
+        for values in tests:
+            found = pack_be16(values)
+            msg = f"Expect '{expect}' found '{found}' for '{values}'"
+            self.assertEqual(expect, found, msg=msg)
+
+        found = pack_be16(0x1234)
+        msg = f"Expect '{bytearray((0x12, 0x34))}' found '{found}'"
+        self.assertEqual(bytearray((0x12, 0x34)), found, msg=msg)
+        arr = array('H', (0x1234,))
+        pack_be16(arr)
+        msg = "Expect the array passed in to be unchanged"
+        self.assertEqual(array('H', (0x1234,)), arr, msg=msg)
+
+
+class TestFrameBuffer(unittest.TestCase):
+    """
+    Test class for the FrameBuffer class.
+    """
+    WIDTH = 176
+    HEIGHT = 220
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        self._fb = FrameBuffer(self.WIDTH, self.HEIGHT)
+
+    #@unittest.skip("Temporary")
+    def test_buffer_size(self):
+        """
+        Test that the buffer is two bytes for every pixel.
+        """
+        expect = self.WIDTH * self.HEIGHT * 2
+        found = len(self._fb.buffer)
+        msg = f"Expect buffer size '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_set_get_pixel(self):
+        """
+        Test that a pixel is stored high byte first.
+        """
+        self._fb.set_pixel(3, 2, Colors.VIOLET) # 0xEC1D
+        idx = (2 * self.WIDTH + 3) * 2
+        found = tuple(self._fb.buffer[idx:idx + 2])
+        msg = f"Expect bytes '(236, 29)' found '{found}'"
+        self.assertEqual((0xEC, 0x1D), found, msg=msg)
+        found = self._fb.get_pixel(3, 2)
+        msg = f"Expect color '{Colors.VIOLET}' found '{found}'"
+        self.assertEqual(Colors.VIOLET, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_fill_rect_region(self):
+        """
+        Test that a filled rectangle is returned by region() and is
+        marked dirty.
+        """
+        self._fb.fill_rect(5, 6, 9, 8, Colors.RED)
+        region = self._fb.region(5, 6, 9, 8)
+        expect = bytearray((0xF8, 0x00)) * 15
+        msg = f"Expect region '{expect}' found '{region}'"
+        self.assertEqual(expect, region, msg=msg)
+        found = self._fb.dirty
+        msg = f"Expect dirty '[(5, 6, 9, 8)]' found '{found}'"
+        self.assertEqual([(5, 6, 9, 8)], found, msg=msg)
+        # A full width region is the same as the buffer slice.
+        region = self._fb.region(0, 6, self.WIDTH - 1, 8)
+        start = 6 * self.WIDTH * 2
+        expect = self._fb.buffer[start:start + self.WIDTH * 2 * 3]
+        self.assertEqual(expect, region)
+
+    #@unittest.skip("Temporary")
+    def test_mark_dirty(self):
+        """
+        Test that overlapping or touching rectangles are merged and that
+        separate rectangles are not.
+        """
+        tests = (
+            # new rectangle, expected dirty list
+            ((0, 0, 9, 9), [(0, 0, 9, 9)]),
+            ((5, 5, 14, 14), [(0, 0, 14, 14)]),
+            ((15, 0, 20, 4), [(0, 0, 20, 14)]),
+            ((50, 50, 60, 60), [(0, 0, 20, 14), (50, 50, 60, 60)]),
+            )
+
+        for rect, expect in tests:
+            self._fb.mark_dirty(*rect)
+            found = self._fb.dirty
+            msg = f"Rect {rect}: expect '{expect}' found '{found}'"
+            self.assertEqual(expect, found, msg=msg)
+
+        found = self._fb.pop_dirty()
+        msg = f"Expect '{tests[-1][1]}' found '{found}'"
+        self.assertEqual(tests[-1][1], found, msg=msg)
+        msg = f"Expect no dirty rectangles found '{self._fb.dirty}'"
+        self.assertEqual([], self._fb.dirty, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_max_dirty(self):
+        """
+        Test that the number of dirty rectangles never exceeds MAX_DIRTY.
+        """
+        for idx in range(FrameBuffer.MAX_DIRTY * 2):
+            x = idx * 10
+            self._fb.mark_dirty(x, 0, x + 1, 1)
+
+        found = len(self._fb.dirty)
+        msg = f"Expect at most {FrameBuffer.MAX_DIRTY} found '{found}'"
+        self.assertTrue(found <= FrameBuffer.MAX_DIRTY, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_diff_tiles(self):
+        """
+        Test that only changed tiles are returned and that they are counted.
+        """
+        fb = FrameBuffer(self.WIDTH, self.HEIGHT, diff=True)
+        ts = fb.TILE_SIZE
+        total = ((self.WIDTH + ts - 1) // ts) * ((self.HEIGHT + ts - 1) // ts)
+        # Two tiles next to each other are joined.
+        fb.fill_rect(ts, ts, ts * 3 - 1, ts * 2 - 1, Colors.RED)
+        found = fb.diff_tiles(fb.pop_dirty())
+        expect = [(ts, ts, ts * 3 - 1, ts * 2 - 1)]
+        msg = f"Expect '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+        expect = {'tiles_sent': 2, 'tiles_skipped': total - 2}
+        msg = f"Expect '{expect}' found '{fb.stats}'"
+        self.assertEqual(expect, fb.stats, msg=msg)
+        # Redrawing the same thing sends nothing.
+        fb.reset_stats()
+        fb.fill_rect(0, 0, self.WIDTH - 1, ts * 2 - 1, Colors.BLACK)
+        fb.fill_rect(ts, ts, ts * 3 - 1, ts * 2 - 1, Colors.RED)
+        found = fb.diff_tiles(fb.pop_dirty())
+        msg = f"Expect '[]' found '{found}'"
+        self.assertEqual([], found, msg=msg)
+        expect = {'tiles_sent': 0, 'tiles_skipped': total}
+        msg = f"Expect '{expect}' found '{fb.stats}'"
+        self.assertEqual(expect, fb.stats, msg=msg)
+        # A single changed pixel sends a single tile.
+        fb.fill_rect(0, 0, self.WIDTH - 1, self.HEIGHT - 1, Colors.BLACK)
+        fb.fill_rect(ts, ts, ts * 3 - 1, ts * 2 - 1, Colors.RED)
+        fb.set_pixel(self.WIDTH - 1, self.HEIGHT - 1, Colors.BLUE)
+        found = fb.diff_tiles(fb.pop_dirty())
+        x0 = (self.WIDTH - 1) // ts * ts
+        y0 = (self.HEIGHT - 1) // ts * ts
+        expect = [(x0, y0, self.WIDTH - 1, self.HEIGHT - 1)]
+        msg = f"Expect '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+
+
+class TestCommandBatch(unittest.TestCase):
+    """
+    Test class for the CommandBatch class.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    #@unittest.skip("Temporary")
+    def test_register(self):
+        """
+        Test that registers are written as a command then data segment.
+        """
+        batch = CommandBatch()
+        batch.register(0x36, 0x00AF)
+        batch.register(0x37, [0x1234, 0x5678])
+        expect = [(False, bytearray((0x00, 0x36))),
+                  (True, bytearray((0x00, 0xAF))),
+                  (False, bytearray((0x00, 0x37))),
+                  (True, bytearray((0x12, 0x34, 0x56, 0x78)))]
+        found = batch.segments
+        msg = f"Expect segments '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_coalesce(self):
+        """
+        Test that writes of the same kind are joined into one segment.
+        """
+        batch = CommandBatch(size=1)
+        batch.command(0x2A)
+        batch.data((0x00, 0x10))
+        batch.data(bytearray((0x00, 0xEF)))
+        batch.command(0x2B)
+        batch.command(0x2C)
+        expect = [(False, bytearray((0x2A,))),
+                  (True, bytearray((0x00, 0x10, 0x00, 0xEF))),
+                  (False, bytearray((0x2B, 0x2C)))]
+        found = batch.segments
+        msg = f"Expect segments '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+        found = len(batch)
+        msg = f"Expect '3' segments found '{found}'"
+        self.assertEqual(3, found, msg=msg)
+        batch.clear()
+        found = len(batch)
+        msg = f"Expect '0' segments found '{found}'"
+        self.assertEqual(0, found, msg=msg)
+
+
+class TestSpanRasterizer(unittest.TestCase):
+    """
+    Test class for the SpanRasterizer class.
+    """
+    WIDTH = 176
+    HEIGHT = 220
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        self._raster = SpanRasterizer(self.WIDTH, self.HEIGHT)
+
+    def _pixels(self):
+        return {(x, y) for y, xs, xe in self._raster.spans()
+                for x in range(xs, xe + 1)}
+
+    #@unittest.skip("Temporary")
+    def test_add_span(self):
+        """
+        Test that spans that overlap or touch are merged and that spans
+        are clipped to the display.
+        """
+        spans = (
+            (10, 20, 30), (10, 25, 40), (10, 41, 45), (10, 50, 55),
+            (10, 0, 5), (11, -10, 5), (12, 170, 200), (-1, 0, 5),
+            (self.HEIGHT, 0, 5), (13, 200, 210), (14, 8, 4),
+            )
+
+        for y, xs, xe in spans:
+            self._raster.add_span(y, xs, xe)
+
+        expect = [(10, 0, 5), (10, 20, 45), (10, 50, 55), (11, 0, 5),
+                  (12, 170, 175), (14, 4, 8)]
+        found = self._raster.spans()
+        msg = f"Expect spans '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_rects(self):
+        """
+        Test that identical spans on consecutive rows are joined.
+        """
+        for y in range(5, 10):
+            self._raster.add_span(y, 10, 20)
+
+        self._raster.add_span(7, 30, 40)
+        self._raster.add_span(8, 30, 40)
+        self._raster.add_span(10, 10, 21)
+        self._raster.add_span(12, 10, 20)
+        expect = [(10, 5, 20, 9), (30, 7, 40, 8), (10, 10, 21, 10),
+                  (10, 12, 20, 12)]
+        found = self._raster.rects()
+        msg = f"Expect rects '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_circle(self):
+        """
+        Test that a circle is symmetric and has one span per row.
+        """
+        x0, y0, radius = 80, 90, 40
+        self._raster.circle(x0, y0, radius)
+        spans = self._raster.spans()
+        found = len(spans)
+        msg = f"Expect '{radius * 2 + 1}' spans found '{found}'"
+        self.assertEqual(radius * 2 + 1, found, msg=msg)
+        expect = (y0, x0 - radius, x0 + radius)
+        msg = f"Expect center row '{expect}' in '{spans}'"
+        self.assertIn(expect, spans, msg=msg)
+
+        for y, xs, xe in spans:
+            msg = f"Expect row {y} to be centered, found '{xs}, {xe}'"
+            self.assertEqual(x0 - xs, xe - x0, msg=msg)
+
+        pixels = self._pixels()
+        found = {(y - y0 + x0, x - x0 + y0) for x, y in pixels}
+        msg = "Expect the circle to be the same when transposed"
+        self.assertEqual(pixels, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_round_rect(self):
+        """
+        Test that the corners of a rounded rectangle are removed.
+        """
+        self._raster.round_rect(10, 20, 50, 40, 5)
+        pixels = self._pixels()
+        corners = ((10, 20), (50, 20), (10, 40), (50, 40))
+
+        for corner in corners:
+            msg = f"Expect corner '{corner}' to be removed"
+            self.assertNotIn(corner, pixels, msg=msg)
+
+        edges = ((30, 20), (10, 30), (50, 30), (30, 40), (15, 20))
+
+        for edge in edges:
+            msg = f"Expect edge '{edge}' to be drawn"
+            self.assertIn(edge, pixels, msg=msg)
+
+        found = len(self._raster.rects())
+        msg = f"Expect '7' rects found '{found}'"
+        self.assertEqual(7, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_triangle(self):
+        """
+        Test that a triangle has one span per row and the corner order
+        does not matter.
+        """
+        corners = ((44, 55), (132, 55), (88, 165))
+        self._raster.triangle(*corners[0], *corners[1], *corners[2])
+        expect = self._raster.spans()
+        found = len(expect)
+        msg = f"Expect '111' spans found '{found}'"
+        self.assertEqual(111, found, msg=msg)
+
+        for order in ((2, 1, 0), (1, 2, 0), (2, 0, 1)):
+            raster = SpanRasterizer(self.WIDTH, self.HEIGHT)
+            raster.triangle(*corners[order[0]], *corners[order[1]],
+                            *corners[order[2]])
+            found = raster.spans()
+            msg = f"Expect '{expect}' found '{found}' with order {order}"
+            self.assertEqual(expect, found, msg=msg)
+
+    #@unittest.skip("Temporary")
+    def test_polygon(self):
+        """
+        Test that a polygon is filled with the even-odd rule.
+        """
+        # A square with a square hole.
+        self._raster.polygon(((10, 10), (30, 10), (30, 30), (10, 30)))
+        self._raster.polygon(((15, 15), (25, 15), (25, 25), (15, 25)))
+        expect = [(10, 10, 30, 30)]
+        found = self._raster.rects()
+        msg = f"Expect rects '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
+        # A bow tie crosses itself so the middle is drawn once.
+        raster = SpanRasterizer(self.WIDTH, self.HEIGHT)
+        raster.polygon(((0, 0), (20, 20), (20, 0), (0, 20)))
+        found = [span for span in raster.spans() if span[0] == 5]
+        expect = [(5, 0, 5), (5, 15, 20)]
+        msg = f"Expect spans '{expect}' found '{found}'"
+        self.assertEqual(expect, found, msg=msg)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+utils/trace.py
+
+A timeline of the drawing methods, SPI writes and delays in the Chrome
+trace event format, open the saved file in https://ui.perfetto.dev or
+chrome://tracing.
+
+Nothing is changed until tracing is turned on with the trace property of
+the display object, so there is no cost when it is off.
+"""
+
+from .common import ticks_us, ticks_diff
+from .draw_stats import DrawStats
+
+
+class Tracer:
+    """
+    Record a span for each call of the drawing methods and of the bus
+    methods of the platform class.
+
+    .. code-block:: python
+
+        tft.trace = True
+        tft.begin()
+        tft.draw_text(10, 10, "Hello")
+        tft.trace.save('begin.json')
+        tft.trace = False
+    """
+    DRAW_METHODS = DrawStats.METHODS
+    BUS_METHODS = ('spi_start_transaction', 'spi_end_transaction',
+                   'spi_write', 'spi_write_segments', 'spi_flush')
+    DELAY_METHODS = ('delay',)
+    # Events past this number are counted in dropped but not kept.
+    DEF_MAX_EVENTS = 100000
+
+    def __init__(self, max_events=DEF_MAX_EVENTS):
+        """
+        Constructor
+
+        :param max_events: The most events to keep.
+        :type max_events: int
+        """
+        self.max_events = max_events
+        self._saved = {}
+        self.clear()
+
+    def attach(self, tft):
+        """
+        Replace the methods of the display object with traced versions.
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        """
+        for names, cat in ((self.DRAW_METHODS, 'draw'),
+                           (self.BUS_METHODS, 'bus'),
+                           (self.DELAY_METHODS, 'delay')):
+            for name in names:
+                if hasattr(tft, name) and name not in self._saved:
+                    self._saved[name] = tft.__dict__.get(name)
+                    setattr(tft, name, self.wrap(tft, name, cat))
+
+    def detach(self, tft):
+        """
+        Put back the methods replaced by attach().
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        """
+        for name, method in self._saved.items():
+            if method is None:
+                tft.__dict__.pop(name, None)
+            else:
+                setattr(tft, name, method)
+
+        self._saved = {}
+
+    def wrap(self, tft, name, cat):
+        """
+        Get a version of a method that is traced.
+
+        :param tft: The display object.
+        :type tft: CommonMethods
+        :param name: The name of the method.
+        :type name: str
+        :param cat: The category of the events.
+        :type cat: str
+        :return: The traced method.
+        :rtype: function
+        """
+        method = getattr(tft, name)
+
+        def traced(*args, **kwargs):
+            start = ticks_us()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(name, cat, start, ticks_us(),
+                         self.__args(name, args))
+
+        return traced
+
+    def add(self, name, cat, start, end, args=None):
+        """
+        Add a span.
+
+        :param name: The name of the span.
+        :type name: str
+        :param cat: The category of the span.
+        :type cat: str
+        :param start: The start time from ticks_us().
+        :type start: int
+        :param end: The end time from ticks_us().
+        :type end: int
+        :param args: Values shown with the span.
+        :type args: dict
+        """
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': 1, 'tid': 1,
+                 'ts': ticks_diff(start, self._origin),
+                 'dur': ticks_diff(end, start)}
+        if args: event['args'] = args
+        self.events.append(event)
+
+    def clear(self):
+        """
+        Remove all the events, times start again from now.
+        """
+        self.events = []
+        self.dropped = 0
+        self._origin = ticks_us()
+
+    def as_dict(self):
+        """
+        Get the trace in the Chrome trace event format.
+
+        :return: The trace.
+        :rtype: dict
+        """
+        # Spans are added when they end, the viewers want parents first.
+        events = sorted(self.events, key=lambda e: (e['ts'], -e['dur']))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'dropped': self.dropped}}
+
+    def save(self, path):
+        """
+        Write the trace to a JSON file.
+
+        :param path: The path of the file.
+        :type path: str
+        """
+        import json
+
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f)
+
+    def __args(self, name, args):
+        if not args:
+            return None
+        elif name == 'spi_write':
+            return {'bytes': DrawStats.size(args[0])}
+        elif name == 'spi_write_segments':
+            segments = args[-1]
+            return {'bytes': sum([len(values) for _, values in segments]),
+                    'segments': len(segments)}
+        elif name == 'delay':
+            return {'ms': args[0]}
+
+        return None